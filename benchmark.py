@@ -0,0 +1,61 @@
+import argparse
+
+from techmarket.backends import BACKENDS, create_backend
+from techmarket.harness import (
+    access_from_args,
+    add_access_arguments,
+    add_benchmark_arguments,
+    add_plans_argument,
+    print_report,
+    run_benchmark,
+)
+from techmarket.planos import print_plans_report, save_plans
+
+
+def run_all(backends, consultas, aquecimento, iteracoes, acesso=None, arquivo_planos=None):
+    """Executa Q1–Q6 em cada banco e imprime um relatório único."""
+    resumos = []
+    planos = [] if arquivo_planos else None
+    for nome in backends:
+        backend = create_backend(nome)
+        if not backend.connect():
+            print(f"Não foi possível conectar ao banco '{nome}'. Pulando.")
+            continue
+        try:
+            resumos.extend(
+                run_benchmark(
+                    backend, consultas, aquecimento, iteracoes, acesso=acesso, planos=planos
+                )
+            )
+        finally:
+            backend.close()
+    print_report(resumos)
+    if planos is not None:
+        print_plans_report(planos)
+        save_plans(planos, arquivo_planos)
+    return resumos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Executa Q1–Q6 em PostgreSQL, MongoDB e Cassandra com o mesmo harness."
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=list(BACKENDS),
+        help="Bancos a comparar.",
+    )
+    add_benchmark_arguments(parser)
+    add_access_arguments(parser)
+    add_plans_argument(parser)
+    args = parser.parse_args()
+    run_all(
+        args.backends,
+        args.consultas,
+        args.aquecimento,
+        args.iteracoes,
+        access_from_args(args),
+        args.planos,
+    )
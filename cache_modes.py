@@ -0,0 +1,179 @@
+"""Q1–Q6 com cache frio e em regime, lado a lado, para cada banco.
+
+A medição fria executa cada consulta `--frios` vezes, sem aquecimento, cada
+vez com parâmetros que nenhuma execução anterior do script usou. Com
+`--descartar sessao`, antes de cada execução o backend descarta os caches
+que a sessão alcança (`DISCARD ALL` no PostgreSQL, `planCacheClear` no
+MongoDB); com `--descartar container`, o contêiner do banco é reiniciado,
+esvaziando também os buffers do servidor. A medição em regime é a do
+harness: `--aquecimento` execuções descartadas e `--iteracoes` medidas.
+"""
+
+import argparse
+import subprocess
+import time
+from functools import partial
+
+from techmarket.backends import BACKENDS, create_backend
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    access_from_args,
+    add_access_arguments,
+    add_benchmark_arguments,
+    benchmark_cold,
+    benchmark_query,
+    format_summary,
+)
+
+FRIOS_PADRAO = 10
+DESCARTES = ("nenhum", "sessao", "container")
+DESCARTE_PADRAO = "sessao"
+# Contêineres do docker-compose.yml.
+CONTAINERS = {
+    "postgres": "tech-market-postgres",
+    "mongo": "tech-market-mongo",
+    "cassandra": "tech-market-cassandra",
+}
+# Tempo máximo, em segundos, para o banco voltar a aceitar conexões.
+TEMPO_REINICIO = 180
+
+
+def restart_container(backend, container, limite=TEMPO_REINICIO):
+    """Reinicia o contêiner do banco e reconecta `backend` quando ele voltar."""
+    backend.close()
+    subprocess.run(["docker", "restart", container], check=True, capture_output=True)
+    prazo = time.monotonic() + limite
+    while time.monotonic() < prazo:
+        if backend.connect():
+            return
+        time.sleep(2)
+    raise ConnectionError(f"{backend.nome} não voltou em {limite} s após reiniciar {container}.")
+
+
+def cache_resetter(backend, descarte):
+    """Função chamada antes de cada execução fria, ou None se não há o que descartar."""
+    if descarte == "container":
+        return partial(restart_container, backend, CONTAINERS[backend.nome])
+    if descarte == "sessao":
+        if backend.reset_cache():
+            return backend.reset_cache
+        print(f"{backend.nome} não tem cache de sessão a descartar; só os parâmetros serão novos.")
+    return None
+
+
+def measure_backend(nome, consultas, frios, descarte, aquecimento, iteracoes, acesso=None):
+    """`{consulta: (frio, quente)}` com os resumos das duas medições num banco."""
+    backend = create_backend(nome)
+    if not backend.connect():
+        print(f"Não foi possível conectar ao banco '{nome}'. Pulando.")
+        return None
+
+    resultados = {}
+    vistos = set()
+    try:
+        descartar = cache_resetter(backend, descarte)
+        for consulta in consultas:
+            print(f"\n--- {consulta}: {CONSULTAS[consulta]} ({nome}) ---")
+            try:
+                frio = benchmark_cold(backend, consulta, frios, vistos, descartar)
+                quente = benchmark_query(
+                    backend, consulta, aquecimento, iteracoes, acesso=acesso
+                )
+            except ConnectionError:
+                raise
+            except Exception as e:
+                print(f"Erro ao executar {consulta} ({nome}): {e}")
+                continue
+            if frio is None or quente is None:
+                print(f"Sem dados para testar {consulta}.")
+                continue
+            print(f"frio   ({frio['novos']} parâmetros novos): {format_summary(frio)}")
+            print(f"quente: {format_summary(quente)}")
+            resultados[consulta] = (frio, quente)
+    finally:
+        backend.close()
+    return resultados
+
+
+def compare_cache_modes(
+    backends,
+    consultas=tuple(CONSULTAS),
+    frios=FRIOS_PADRAO,
+    descarte=DESCARTE_PADRAO,
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    acesso=None,
+):
+    resultados = {}
+    for nome in backends:
+        print(f"\n=== {nome} (descarte: {descarte}) ===")
+        try:
+            medidas = measure_backend(
+                nome, consultas, frios, descarte, aquecimento, iteracoes, acesso
+            )
+        except ConnectionError as e:
+            print(e)
+            continue
+        if medidas:
+            resultados[nome] = medidas
+    print_cache_report(resultados)
+    return resultados
+
+
+def print_cache_report(resultados):
+    """p50 e p95 frios e em regime, e quantas vezes o p50 frio excede o quente."""
+    cabecalho = (
+        f"{'Consulta':<34} {'Banco':<10} {'novos':>5} {'frio p50':>9} {'frio p95':>9} "
+        f"{'quente p50':>11} {'quente p95':>11} {'frio/quente':>12}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    linhas = sorted(
+        (consulta, nome, frio, quente)
+        for nome, medidas in resultados.items()
+        for consulta, (frio, quente) in medidas.items()
+    )
+    for consulta, nome, frio, quente in linhas:
+        razao = f"{frio['p50'] / quente['p50']:.1f}x" if quente["p50"] else "-"
+        print(
+            f"{f'{consulta}: {CONSULTAS[consulta]}':<34} {nome:<10} {frio['novos']:>5} "
+            f"{frio['p50']:>9.3f} {frio['p95']:>9.3f} "
+            f"{quente['p50']:>11.3f} {quente['p95']:>11.3f} {razao:>12}"
+        )
+    print("(latências em ms; novos = parâmetros inéditos usados nas execuções frias)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara Q1–Q6 com cache frio e em regime em cada banco."
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--frios",
+        type=int,
+        default=FRIOS_PADRAO,
+        help="Execuções frias por consulta, cada uma com parâmetros novos.",
+    )
+    parser.add_argument(
+        "--descartar",
+        choices=DESCARTES,
+        default=DESCARTE_PADRAO,
+        help="O que descartar antes de cada execução fria: nada, os caches da "
+        "sessão (DISCARD ALL, planCacheClear) ou o contêiner inteiro (docker restart).",
+    )
+    add_benchmark_arguments(parser)
+    add_access_arguments(parser)
+    args = parser.parse_args()
+    compare_cache_modes(
+        args.backends,
+        args.consultas,
+        args.frios,
+        args.descartar,
+        args.aquecimento,
+        args.iteracoes,
+        access_from_args(args),
+    )
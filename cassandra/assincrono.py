@@ -0,0 +1,282 @@
+"""Q1–Q6 e população do Cassandra a partir de corrotinas asyncio.
+
+O driver usa o reator `AsyncioConnection` (I/O num laço asyncio próprio,
+numa thread do driver); cada `execute_async` devolve um `ResponseFuture`,
+ligado a um `asyncio.Future` do laço do chamador por `_aguardar`. As
+consultas são preparadas uma vez na conexão.
+"""
+
+from cassandra.cluster import Cluster, NoHostAvailable
+from cassandra.io.asyncioreactor import AsyncioConnection
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.assincrono import (
+    CONCORRENCIA_PADRAO,
+    AsyncBackend,
+    drain,
+    run_benchmark_async,
+)
+from techmarket.backends import load_module
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    add_benchmark_arguments,
+    print_report,
+)
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+queries = load_module("cassandra", "queries")
+populate = load_module("cassandra", "populate")
+buckets = load_module("cassandra", "buckets")
+
+
+def connect_to_cassandra_async():
+    try:
+        cluster = Cluster(
+            queries.CASSANDRA_HOSTS,
+            port=queries.CASSANDRA_PORT,
+            connection_class=AsyncioConnection,
+            connect_timeout=30,
+        )
+        session = cluster.connect(queries.KEYSPACE)
+        # As consultas já limitam o resultado: uma página só, sem paginação.
+        session.default_fetch_size = None
+        print("Conexão ao Cassandra estabelecida (reator asyncio).")
+        return session
+    except NoHostAvailable as e:
+        print(f"Erro ao conectar ao Cassandra: {e}")
+        return None
+    except Exception as e:
+        print(f"Ocorreu um erro inesperado ao conectar ao Cassandra: {e}")
+        return None
+
+
+def _aguardar(response_future):
+    """Converte o `ResponseFuture` do driver num `asyncio.Future` do laço atual.
+
+    Os callbacks rodam na thread do reator, então o resultado é entregue via
+    `call_soon_threadsafe`.
+    """
+    loop = asyncio.get_running_loop()
+    futuro = loop.create_future()
+
+    def entregar(resultado):
+        if not futuro.done():
+            futuro.set_result(resultado)
+
+    def falhar(erro):
+        if not futuro.done():
+            futuro.set_exception(erro)
+
+    response_future.add_callbacks(
+        lambda rows: loop.call_soon_threadsafe(entregar, list(rows)),
+        lambda erro: loop.call_soon_threadsafe(falhar, erro),
+    )
+    return futuro
+
+
+class CassandraAsyncBackend(AsyncBackend):
+    nome = "cassandra"
+
+    def __init__(self):
+        self.session = None
+        self.bucket = buckets.BUCKET_PADRAO
+        self._preparadas = None
+
+    async def connect(self):
+        # A conexão e o PREPARE são síncronos: rodam numa thread para não
+        # travar o laço enquanto o driver espera o reator.
+        self.session = await asyncio.to_thread(connect_to_cassandra_async)
+        if self.session is None:
+            return False
+        self.bucket = await asyncio.to_thread(
+            buckets.detect_buckets, self.session, queries.KEYSPACE
+        )
+        cql = dict(queries.CQL)
+        if self.bucket != buckets.BUCKET_PADRAO:
+            cql.update(queries.bucketed_cql(self.bucket))
+        self._preparadas = await asyncio.to_thread(
+            lambda: {
+                nome: self.session.prepare(texto.replace("%s", "?"))
+                for nome, texto in cql.items()
+            }
+        )
+        return True
+
+    async def close(self):
+        if self.session:
+            await asyncio.to_thread(self.session.cluster.shutdown)
+
+    async def _execute(self, nome, params=()):
+        return await _aguardar(self.session.execute_async(self._preparadas[nome], params))
+
+    async def sample_params(self, consulta):
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta}")
+        if consulta not in queries.AMOSTRAS:
+            return queries.params_from_row(consulta, None)
+        cql = queries.sample_cql(consulta, self.bucket)
+        for token in (queries.random_token(), queries.MENOR_TOKEN):
+            rows = await _aguardar(self.session.execute_async(cql, (token,)))
+            row = queries.sample_row(consulta, rows)
+            if row is not None:
+                return queries.params_from_row(consulta, row)
+        return None
+
+    async def _newest_first(self, nome, id_cliente, limite):
+        """Equivalente a `queries.read_newest_first`, um bucket por vez."""
+        linhas = []
+        for valor in buckets.recent_buckets(self.bucket):
+            linhas.extend(await self._execute(nome, (id_cliente, valor, limite - len(linhas))))
+            if len(linhas) >= limite:
+                break
+        return linhas
+
+    async def q1(self, email):
+        client_info = await self._execute("q1_cliente", (email,))
+        if not client_info:
+            return []
+        id_cliente = client_info[0].id_cliente
+        if self.bucket != buckets.BUCKET_PADRAO:
+            recent_orders = await self._newest_first("q1_pedidos", id_cliente, queries.LIMITE_Q1)
+        else:
+            recent_orders = await self._execute("q1_pedidos", (id_cliente,))
+        return [(client_info[0], pedido) for pedido in recent_orders]
+
+    async def q2(self, categoria):
+        return await self._execute("q2", (categoria,))
+
+    async def q3(self, id_cliente):
+        if self.bucket != buckets.BUCKET_PADRAO:
+            return await self._newest_first("q3", id_cliente, queries.LIMITE_Q3)
+        return await self._execute("q3", (id_cliente,))
+
+    async def q4(self):
+        return await self._execute("q4")
+
+    async def q5(self, inicio, fim):
+        partes = await asyncio.gather(
+            *(self._execute("q5", params) for params in queries.q5_params(inicio, fim))
+        )
+        return queries.merge_by_payment_date(partes)
+
+    async def q6(self, id_cliente, inicio, fim):
+        if self.bucket == buckets.BUCKET_PADRAO:
+            return queries.total_from_rows(await self._execute("q6", (id_cliente, inicio, fim)))
+        partes = await asyncio.gather(
+            *(
+                self._execute("q6", (id_cliente, valor, inicio, fim))
+                for valor in buckets.buckets_between(inicio, fim, self.bucket)
+            )
+        )
+        return queries.total_from_rows([row for parte in partes for row in parte])
+
+
+def create_backend(**opcoes):
+    return CassandraAsyncBackend(**opcoes)
+
+
+async def populate_cassandra_async(ds, concorrencia=CONCORRENCIA_PADRAO):
+    """Equivalente assíncrono do modo `concorrente` de `populate.py`: INSERTs
+    preparados, com até `concorrencia` escritas em voo por tabela."""
+    session = await asyncio.to_thread(connect_to_cassandra_async)
+    if not session:
+        print("Não foi possível conectar ao Cassandra. Encerrando população.")
+        return
+
+    start_time = time.time()
+    total_writes = 0
+    try:
+        bucket = await asyncio.to_thread(buckets.detect_buckets, session, queries.KEYSPACE)
+        for table in populate.TABELAS:
+            print(f"Populando {table} no Cassandra...")
+            table_start = time.time()
+            prepared = await asyncio.to_thread(
+                session.prepare, populate.insert_cql(table, marcador="?", bucket=bucket)
+            )
+
+            async def inserir(row, prepared=prepared):
+                await _aguardar(session.execute_async(prepared, row))
+
+            count = await drain(populate.table_rows(ds, table, bucket), inserir, concorrencia)
+            elapsed = time.time() - table_start
+            total_writes += count
+            print(
+                f"{count} linhas inseridas em {elapsed:.2f} segundos "
+                f"({count / elapsed:.0f} escritas/s)."
+            )
+
+        print("Populando vendas_por_produto no Cassandra...")
+        table_start = time.time()
+        await asyncio.to_thread(session.execute, populate.TRUNCATE_VENDAS_CQL)
+        prepared = await asyncio.to_thread(
+            session.prepare, populate.INCREMENTO_VENDAS_CQL.format(marcador="?")
+        )
+
+        async def incrementar(row):
+            await _aguardar(session.execute_async(prepared, row))
+
+        count = await drain(populate.linhas_vendas_por_produto(ds), incrementar, concorrencia)
+        total_writes += count
+        print(f"{count} contadores incrementados em {time.time() - table_start:.2f} segundos.")
+        await asyncio.to_thread(
+            load_module("cassandra", "ranking_vendas").rollup_ranking_vendas, session
+        )
+
+        elapsed = time.time() - start_time
+        print(
+            f"\nPopulação assíncrona do Cassandra concluída em {elapsed:.2f} segundos "
+            f"({total_writes} escritas, {total_writes / elapsed:.0f} escritas/s sustentadas)."
+        )
+    except NoHostAvailable as e:
+        print(f"Erro ao popular Cassandra: Nenhum host disponível. Detalhes: {e}")
+    finally:
+        await asyncio.to_thread(session.cluster.shutdown)
+
+
+async def run_cassandra_queries_async(
+    consultas=tuple(CONSULTAS), aquecimento=AQUECIMENTO_PADRAO, iteracoes=ITERACOES_PADRAO
+):
+    backend = CassandraAsyncBackend()
+    if not await backend.connect():
+        print("Não foi possível conectar ao Cassandra. Encerrando consultas.")
+        return []
+    try:
+        resumos = await run_benchmark_async(backend, consultas, aquecimento, iteracoes)
+        print_report(resumos)
+        return resumos
+    finally:
+        await backend.close()
+        print("\nConexão ao Cassandra fechada.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Executa Q1–Q6 (ou a população, com --popular) no Cassandra com o reator asyncio."
+    )
+    parser.add_argument(
+        "--popular",
+        action="store_true",
+        help="Popula as tabelas com escritas assíncronas em vez de executar as consultas.",
+    )
+    parser.add_argument(
+        "--concorrencia",
+        type=int,
+        default=CONCORRENCIA_PADRAO,
+        help="Escritas em voo durante a população.",
+    )
+    add_benchmark_arguments(parser)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    if args.popular:
+        asyncio.run(populate_cassandra_async(dataset_from_args(args), args.concorrencia))
+    else:
+        asyncio.run(run_cassandra_queries_async(args.consultas, args.aquecimento, args.iteracoes))
@@ -0,0 +1,93 @@
+"""Buckets de tempo na chave de partição das tabelas de pedidos por cliente.
+
+Sem buckets, todo o histórico de um cliente fica numa única partição de
+`pedidos_por_cliente` (e de `pedidos_por_cliente_status`, por status), que
+cresce sem limite para quem compra muito. Com `--bucket mes` ou `--bucket
+ano` (`init_db.py`), a chave de partição ganha a coluna `ano_mes` ('2025-05')
+ou `ano` ('2025'): cada partição guarda um mês ou um ano de pedidos.
+
+As leituras percorrem os buckets do mais recente ao mais antigo e param
+assim que o limite da consulta é atingido (Q1, Q3) ou a faixa de datas
+termina (Q6). O esquema em uso é detectado pelas colunas da tabela.
+"""
+
+from datetime import datetime, timedelta
+
+MODOS_BUCKET = ("nenhum", "mes", "ano")
+BUCKET_PADRAO = "nenhum"
+COLUNAS_BUCKET = {"mes": "ano_mes", "ano": "ano"}
+
+# Colunas da chave de partição de cada tabela de pedidos por cliente, antes do bucket.
+TABELAS_CLIENTE = {
+    "pedidos_por_cliente": ("id_cliente",),
+    "pedidos_por_cliente_status": ("id_cliente", "status"),
+}
+
+# Até onde as leituras sem faixa de datas (Q1, Q3) voltam procurando
+# pedidos: cobre o período de pedidos do conjunto de dados com folga.
+HORIZONTE_DIAS = 3 * 365
+
+
+def bucket_column(bucket):
+    """Coluna de bucket da chave de partição, ou None sem buckets."""
+    if bucket not in MODOS_BUCKET:
+        raise ValueError(f"Bucket inválido: {bucket}. Use um de {MODOS_BUCKET}.")
+    return COLUNAS_BUCKET.get(bucket)
+
+
+def bucket_value(data, bucket):
+    if bucket == "mes":
+        return f"{data.year:04d}-{data.month:02d}"
+    return f"{data.year:04d}"
+
+
+def buckets_between(inicio, fim, bucket):
+    """Buckets que a janela [inicio, fim] toca, do mais recente ao mais antigo."""
+    if bucket == "ano":
+        return [f"{ano:04d}" for ano in range(fim.year, inicio.year - 1, -1)]
+    ano, mes = fim.year, fim.month
+    valores = []
+    while (ano, mes) >= (inicio.year, inicio.month):
+        valores.append(f"{ano:04d}-{mes:02d}")
+        ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+    return valores
+
+
+def recent_buckets(bucket, agora=None):
+    """Buckets do horizonte de leitura, do mais recente ao mais antigo."""
+    agora = agora or datetime.now()
+    return buckets_between(agora - timedelta(days=HORIZONTE_DIAS), agora, bucket)
+
+
+def with_bucket(rows, indice_data, bucket):
+    """Acrescenta a cada linha o bucket da data na posição `indice_data`."""
+    if bucket_column(bucket) is None:
+        yield from rows
+        return
+    for row in rows:
+        yield (*row, bucket_value(row[indice_data], bucket))
+
+
+def detect_buckets(session, keyspace, tabela="pedidos_por_cliente"):
+    """Esquema de buckets de `tabela`, lido de `system_schema.columns`."""
+    colunas = {
+        row.column_name
+        for row in session.execute(
+            "SELECT column_name FROM system_schema.columns "
+            "WHERE keyspace_name = %s AND table_name = %s;",
+            (keyspace, tabela),
+        )
+    }
+    for bucket, coluna in COLUNAS_BUCKET.items():
+        if coluna in colunas:
+            return bucket
+    return BUCKET_PADRAO
+
+
+def add_bucket_argument(parser):
+    parser.add_argument(
+        "--bucket",
+        choices=MODOS_BUCKET,
+        default=BUCKET_PADRAO,
+        help="Bucket de tempo na chave de partição das tabelas de pedidos por cliente.",
+    )
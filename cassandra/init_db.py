@@ -2,11 +2,49 @@ from cassandra.cluster import Cluster, NoHostAvailable
 from cassandra.io.geventreactor import (
     GeventConnection,
 )
+import argparse
+import os
+import sys
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.chaves import CHAVES_PADRAO, add_key_argument
+
+buckets = load_module("cassandra", "buckets")
+
 KEYSPACE = "techmarket_ks"
+TIPOS_CHAVE = {"uuid4": "uuid", "uuid7": "uuid", "sequencial": "bigint"}
+
+
+def customer_orders_ddl(tabela, tipo, particao=None, bucket=buckets.BUCKET_PADRAO):
+    """CREATE TABLE de uma tabela de pedidos por cliente, mais recentes primeiro.
+
+    A chave de partição é `particao` (por padrão, a de `tabela` em
+    `buckets.TABELAS_CLIENTE`) mais a coluna de bucket, se houver.
+    """
+    particao = particao or buckets.TABELAS_CLIENTE[tabela]
+    coluna = buckets.bucket_column(bucket)
+    chave = ", ".join(particao + ((coluna,) if coluna else ()))
+    coluna_bucket = f"{coluna} text," if coluna else ""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {tabela} (
+            id_cliente {tipo},
+            status text,
+            data_pedido timestamp,
+            id_pedido {tipo},
+            valor_total decimal,
+            {coluna_bucket}
+            PRIMARY KEY (({chave}), data_pedido, id_pedido)
+        ) WITH CLUSTERING ORDER BY (data_pedido DESC, id_pedido ASC);
+    """
 
-def create_keyspace_and_tables_cassandra(session):
+
+def create_keyspace_and_tables_cassandra(
+    session, chaves=CHAVES_PADRAO, bucket=buckets.BUCKET_PADRAO
+):
+    tipo = TIPOS_CHAVE[chaves]
     try:
 
         session.execute(
@@ -19,10 +57,10 @@ def create_keyspace_and_tables_cassandra(session):
         session.set_keyspace(KEYSPACE)
 
         session.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS clientes_por_email (
                 email text PRIMARY KEY,
-                id_cliente uuid,
+                id_cliente {tipo},
                 nome text,
                 telefone text,
                 data_cadastro timestamp,
@@ -36,11 +74,11 @@ def create_keyspace_and_tables_cassandra(session):
         print("Tabela 'clientes_por_email' criada ou já existente.")
 
         session.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS produtos_por_categoria (
                 categoria text,
                 preco decimal,
-                id_produto uuid,
+                id_produto {tipo},
                 nome text,
                 estoque int,
                 PRIMARY KEY ((categoria), preco, id_produto) -- preco como clustering key para ordenação
@@ -49,28 +87,18 @@ def create_keyspace_and_tables_cassandra(session):
         )
         print("Tabela 'produtos_por_categoria' criada ou já existente.")
 
-        session.execute(
-            """
-            CREATE TABLE IF NOT EXISTS pedidos_por_cliente_status (
-                id_cliente uuid,
-                status text,
-                data_pedido timestamp,
-                id_pedido uuid,
-                valor_total decimal,
-                PRIMARY KEY ((id_cliente, status), data_pedido, id_pedido) -- data_pedido para ordenação
-            ) WITH CLUSTERING ORDER BY (data_pedido DESC);
-        """
-        )
-        print("Tabela 'pedidos_por_cliente_status' criada ou já existente.")
+        for tabela in buckets.TABELAS_CLIENTE:
+            session.execute(customer_orders_ddl(tabela, tipo, bucket=bucket))
+            print(f"Tabela '{tabela}' criada ou já existente.")
 
         session.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS pagamentos_por_tipo_mes (
                 tipo text,
                 ano_mes text, -- Ex: '2025-05' - Chave de partição composta para o tipo e mês/ano
                 data_pagamento timestamp,
-                id_pagamento uuid,
-                id_pedido uuid,
+                id_pagamento {tipo},
+                id_pedido {tipo},
                 status text,
                 PRIMARY KEY ((tipo, ano_mes), data_pagamento, id_pagamento)
             ) WITH CLUSTERING ORDER BY (data_pagamento DESC);
@@ -79,10 +107,10 @@ def create_keyspace_and_tables_cassandra(session):
         print("Tabela 'pagamentos_por_tipo_mes' criada ou já existente.")
 
         session.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS pedidos_base (
-                id_pedido uuid PRIMARY KEY,
-                id_cliente uuid,
+                id_pedido {tipo} PRIMARY KEY,
+                id_cliente {tipo},
                 data_pedido timestamp,
                 status text,
                 valor_total decimal
@@ -94,10 +122,10 @@ def create_keyspace_and_tables_cassandra(session):
         print("Tabela 'pedidos_base' criada ou já existente.")
 
         session.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS pagamentos_base (
-                id_pagamento uuid PRIMARY KEY,
-                id_pedido uuid,
+                id_pagamento {tipo} PRIMARY KEY,
+                id_pedido {tipo},
                 tipo text,
                 status text,
                 data_pagamento timestamp
@@ -106,6 +134,45 @@ def create_keyspace_and_tables_cassandra(session):
         )
         print("Tabela 'pagamentos_base' criada ou já existente.")
 
+        session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS itens_por_pedido (
+                id_pedido {tipo},
+                id_produto {tipo},
+                quantidade int,
+                preco_unitario decimal,
+                PRIMARY KEY ((id_pedido), id_produto)
+            );
+        """
+        )
+        print("Tabela 'itens_por_pedido' criada ou já existente.")
+
+        session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS vendas_por_produto (
+                id_produto {tipo} PRIMARY KEY,
+                total_vendido counter -- Incrementado a cada item de pedido gravado
+            );
+        """
+        )
+        print("Tabela 'vendas_por_produto' criada ou já existente.")
+
+        session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS ranking_vendas (
+                ranking text,
+                total_vendido bigint,
+                id_produto {tipo},
+                nome text,
+                categoria text,
+                -- Uma partição por ranking, regravada pelo rollup de vendas_por_produto;
+                -- a Q4 lê as primeiras linhas já ordenadas.
+                PRIMARY KEY ((ranking), total_vendido, id_produto)
+            ) WITH CLUSTERING ORDER BY (total_vendido DESC, id_produto ASC);
+        """
+        )
+        print("Tabela 'ranking_vendas' criada ou já existente.")
+
         print("Todas as tabelas do Cassandra criadas com sucesso no keyspace!")
 
     except NoHostAvailable as e:
@@ -116,6 +183,31 @@ def create_keyspace_and_tables_cassandra(session):
         print(f"Erro inesperado ao criar chaves e tabelas no Cassandra: {e}")
 
 
+def drop_keyspace_cassandra(session):
+    session.execute(f"DROP KEYSPACE IF EXISTS {KEYSPACE};")
+    print(f"Keyspace '{KEYSPACE}' removido.")
+
+
+def init_database(recriar=False, chaves=CHAVES_PADRAO, bucket=buckets.BUCKET_PADRAO):
+    """Cria o keyspace e as tabelas; com `recriar`, remove antes o keyspace.
+
+    `chaves` define o tipo das colunas de id (uuid ou bigint) e `bucket`, o
+    bucket de tempo das tabelas de pedidos por cliente.
+    Retorna False se não for possível conectar.
+    """
+    session = connect_to_cassandra()
+    if not session:
+        return False
+    try:
+        if recriar:
+            drop_keyspace_cassandra(session)
+        create_keyspace_and_tables_cassandra(session, chaves, bucket)
+    finally:
+        session.shutdown()
+        session.cluster.shutdown()
+    return True
+
+
 def connect_to_cassandra():
     cluster = None
     session = None
@@ -133,6 +225,16 @@ def connect_to_cassandra():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria o keyspace e as tabelas do Cassandra.")
+    parser.add_argument(
+        "--recriar",
+        action="store_true",
+        help="Remove o keyspace existente (e seus dados) antes de criá-lo.",
+    )
+    add_key_argument(parser)
+    buckets.add_bucket_argument(parser)
+    args = parser.parse_args()
+
     max_retries = 10
     retry_delay = 10
 
@@ -140,7 +242,9 @@ if __name__ == "__main__":
         print(f"Tentando conectar ao Cassandra... Tentativa {i + 1}/{max_retries}")
         session = connect_to_cassandra()
         if session:
-            create_keyspace_and_tables_cassandra(session)
+            if args.recriar:
+                drop_keyspace_cassandra(session)
+            create_keyspace_and_tables_cassandra(session, args.chaves, args.bucket)
             session.shutdown()
             session.cluster.shutdown()
             print("Conexão ao Cassandra fechada.")
@@ -0,0 +1,254 @@
+"""Pedidos por cliente sem bucket, com bucket mensal e com bucket anual.
+
+Cada layout é uma tabela de teste com o formato de `pedidos_por_cliente`
+(`pedidos_cliente_nenhum`, `pedidos_cliente_mes`, `pedidos_cliente_ano`),
+carregada com os pedidos do conjunto de dados mais um histórico enviesado:
+`--pedidos-quentes` pedidos extras divididos entre os `--clientes-quentes`
+primeiros clientes com pesos de Zipf (o k-ésimo recebe ∝ 1/k^s), espalhados
+por dois anos. O script informa a distribuição de linhas por partição e o
+p50 da Q1 e da Q6 para o cliente mais quente e para um cliente comum.
+"""
+
+from cassandra.concurrent import execute_concurrent_with_args
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.chaves import nova_chave
+from techmarket.dataset import STATUS_PEDIDO
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    ITERACOES_PADRAO,
+    percentile,
+    summarize,
+    time_call,
+)
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+CLIENTES_QUENTES_PADRAO = 10
+PEDIDOS_QUENTES_PADRAO = 50000
+EXPOENTE_PADRAO = 1.1
+# Histórico dos clientes quentes, dentro do horizonte de leitura dos buckets.
+DIAS_HISTORICO = 2 * 365
+
+queries = load_module("cassandra", "queries")
+init_db = load_module("cassandra", "init_db")
+populate = load_module("cassandra", "populate")
+buckets = load_module("cassandra", "buckets")
+
+
+def _tabela(bucket):
+    return f"pedidos_cliente_{bucket}"
+
+
+def hot_orders(ds, clientes, pedidos, expoente, seed):
+    """`pedidos` pedidos extras para os `clientes` primeiros clientes, com pesos de Zipf."""
+    rng = random.Random(seed)
+    ids = ds.lote("clientes", 0, clientes)["id"]
+    pesos = [1 / (k + 1) ** expoente for k in range(len(ids))]
+    segundos = DIAS_HISTORICO * 86400
+    for id_cliente in rng.choices(ids, weights=pesos, k=pedidos):
+        yield (
+            id_cliente,
+            ds.referencia - timedelta(seconds=rng.uniform(0, segundos)),
+            nova_chave(ds.chaves),
+            rng.choice(STATUS_PEDIDO),
+            Decimal(f"{rng.uniform(10, 5000):.2f}"),
+        )
+
+
+def _contar(rows, contagem, bucket):
+    """Repassa as linhas contando quantas caem em cada partição."""
+    com_bucket = buckets.bucket_column(bucket) is not None
+    for row in rows:
+        contagem[(row[0], row[-1]) if com_bucket else row[0]] += 1
+        yield row
+
+
+def load_layout(session, ds, bucket, hot):
+    """Recria e carrega a tabela do layout; retorna `(segundos, linhas por partição)`."""
+    tabela = _tabela(bucket)
+    session.execute(f"DROP TABLE IF EXISTS {tabela};")
+    session.execute(
+        init_db.customer_orders_ddl(
+            tabela, init_db.TIPOS_CHAVE[ds.chaves], ("id_cliente",), bucket
+        )
+    )
+    # Mesmas colunas, na mesma ordem, de `pedidos_por_cliente`.
+    prepared = session.prepare(
+        populate.insert_cql("pedidos_por_cliente", marcador="?", bucket=bucket).replace(
+            "pedidos_por_cliente", tabela
+        )
+    )
+    indice_data = populate.table_columns("pedidos_por_cliente").index("data_pedido")
+
+    def rows():
+        yield from populate.linhas_pedidos_por_cliente(ds)
+        yield from hot_orders(ds, *hot)
+
+    contagem = Counter()
+    escritas = _contar(buckets.with_bucket(rows(), indice_data, bucket), contagem, bucket)
+    carga, _ = time_call(
+        lambda: list(
+            execute_concurrent_with_args(
+                session,
+                prepared,
+                escritas,
+                concurrency=populate.CONCORRENCIA_PADRAO,
+                raise_on_first_error=True,
+                results_generator=True,
+            )
+        )
+    )
+    return carga / 1e9, sorted(contagem.values())
+
+
+def layout_queries(session, bucket):
+    """Q1 e Q6 sobre a tabela do layout, com a mesma leitura do backend."""
+    tabela = _tabela(bucket)
+    if buckets.bucket_column(bucket) is None:
+        q1_cql = queries.CQL["q1_pedidos"].replace("pedidos_por_cliente", tabela)
+        q6_cql = queries.CQL["q6"].replace("pedidos_por_cliente", tabela)
+
+        def q1(id_cliente):
+            return list(session.execute(q1_cql, (id_cliente,)))
+
+        def q6(id_cliente, inicio, fim):
+            rows = list(session.execute(q6_cql, (id_cliente, inicio, fim)))
+            return queries.total_from_rows(rows)
+
+        return q1, q6
+
+    cql = {
+        nome: texto.replace("pedidos_por_cliente", tabela)
+        for nome, texto in queries.bucketed_cql(bucket).items()
+    }
+
+    def q1(id_cliente):
+        return queries.read_newest_first(
+            session, cql["q1_pedidos"], (id_cliente,), bucket, queries.LIMITE_Q1
+        )
+
+    def q6(id_cliente, inicio, fim):
+        return queries.total_from_rows(
+            queries.read_range(session, cql["q6"], (id_cliente,), inicio, fim, bucket)
+        )
+
+    return q1, q6
+
+
+def _medir(funcao, params, aquecimento, iteracoes):
+    for _ in range(aquecimento):
+        funcao(*params)
+    return summarize([time_call(funcao, *params)[0] for _ in range(iteracoes)])
+
+
+def compare_bucketing(
+    ds,
+    clientes_quentes=CLIENTES_QUENTES_PADRAO,
+    pedidos_quentes=PEDIDOS_QUENTES_PADRAO,
+    expoente=EXPOENTE_PADRAO,
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+):
+    session = queries.connect_to_cassandra()
+    if not session:
+        print("Não foi possível conectar ao Cassandra. Encerrando.")
+        return None
+
+    hot = (clientes_quentes, pedidos_quentes, expoente, ds.seed)
+    clientes = {
+        "quente": ds.lote("clientes", 0, 1)["id"][0],
+        "comum": ds.lote("clientes", clientes_quentes, clientes_quentes + 1)["id"][0],
+    }
+    janela = (ds.referencia - timedelta(days=90), ds.referencia)
+    resultados = []
+    try:
+        for bucket in buckets.MODOS_BUCKET:
+            print(f"\n--- {_tabela(bucket)}: carregando ---")
+            carga, tamanhos = load_layout(session, ds, bucket, hot)
+            q1, q6 = layout_queries(session, bucket)
+            resultado = {
+                "bucket": bucket,
+                "carga": carga,
+                "linhas": sum(tamanhos),
+                "particoes": (
+                    len(tamanhos),
+                    percentile(tamanhos, 50),
+                    percentile(tamanhos, 99),
+                    tamanhos[-1],
+                ),
+            }
+            for perfil, id_cliente in clientes.items():
+                resultado[f"q1_{perfil}"] = _medir(q1, (id_cliente,), aquecimento, iteracoes)
+                resultado[f"q6_{perfil}"] = _medir(
+                    q6, (id_cliente, *janela), aquecimento, iteracoes
+                )
+            resultados.append(resultado)
+            session.execute(f"DROP TABLE {_tabela(bucket)};")
+    finally:
+        session.shutdown()
+        session.cluster.shutdown()
+
+    print_bucketing_report(resultados)
+    return resultados
+
+
+def print_bucketing_report(resultados):
+    cabecalho = (
+        f"{'Bucket':<7} {'Partições':>10} {'p50 lin.':>9} {'p99 lin.':>9} {'máx lin.':>9} "
+        f"{'Q1 quente':>10} {'Q1 comum':>9} {'Q6 quente':>10} {'Q6 comum':>9}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for r in resultados:
+        particoes, p50, p99, maximo = r["particoes"]
+        print(
+            f"{r['bucket']:<7} {particoes:>10} {p50:>9.0f} {p99:>9.0f} {maximo:>9} "
+            f"{r['q1_quente']['p50']:>10.3f} {r['q1_comum']['p50']:>9.3f} "
+            f"{r['q6_quente']['p50']:>10.3f} {r['q6_comum']['p50']:>9.3f}"
+        )
+    print("(linhas por partição; latências p50 em ms; Q6 sobre os 90 dias até a referência)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara pedidos por cliente sem bucket e com buckets mensais e anuais, com clientes quentes."
+    )
+    parser.add_argument(
+        "--clientes-quentes",
+        type=int,
+        default=CLIENTES_QUENTES_PADRAO,
+        help="Clientes que recebem os pedidos extras.",
+    )
+    parser.add_argument(
+        "--pedidos-quentes",
+        type=int,
+        default=PEDIDOS_QUENTES_PADRAO,
+        help="Pedidos extras divididos entre os clientes quentes.",
+    )
+    parser.add_argument(
+        "--expoente",
+        type=float,
+        default=EXPOENTE_PADRAO,
+        help="Expoente s da distribuição de Zipf entre os clientes quentes.",
+    )
+    parser.add_argument("--aquecimento", type=int, default=AQUECIMENTO_PADRAO)
+    parser.add_argument("--iteracoes", type=int, default=ITERACOES_PADRAO)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+    compare_bucketing(
+        dataset_from_args(args),
+        args.clientes_quentes,
+        args.pedidos_quentes,
+        args.expoente,
+        args.aquecimento,
+        args.iteracoes,
+    )
@@ -1,19 +1,23 @@
 from cassandra.cluster import Cluster, NoHostAvailable
+from cassandra.concurrent import execute_concurrent_with_args
 from cassandra.io.geventreactor import GeventConnection
-from faker import Faker
-import random
+from decimal import Decimal
+import argparse
+import os
+import sys
 import time
-from datetime import datetime, timedelta
-import uuid
 
-fake = Faker("pt_BR")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-KEYSPACE = "techmarket_ks"
-NUM_CLIENTES = 20000
-NUM_PRODUTOS = 5000
-NUM_PEDIDOS = 30000
+from techmarket.backends import load_module
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+buckets = load_module("cassandra", "buckets")
 
+KEYSPACE = "techmarket_ks"
 
+MODOS_CARGA = ("sequencial", "concorrente")
+CONCORRENCIA_PADRAO = 100
 
 
 def connect_to_cassandra():
@@ -37,154 +41,256 @@ def connect_to_cassandra():
         return None
 
 
-def populate_cassandra():
-    session = connect_to_cassandra()
-    if not session:
-        print("Não foi possível conectar ao Cassandra. Encerrando população.")
-        return
+def _decimal(valor):
+    # Evita que o float vire a expansão binária exata ao ser serializado
+    # como decimal pelos statements preparados.
+    return Decimal(f"{valor:.2f}")
 
-    start_time = time.time()
 
-    try:
-        
-        print(f"Populando {NUM_CLIENTES} clientes no Cassandra (clientes_por_email)...")
-        client_ids = []
-        for _ in range(NUM_CLIENTES):
-            client_id = uuid.uuid4()
-            client_ids.append(client_id)
-            email = fake.unique.email()
-            session.execute(
-                """
-                INSERT INTO clientes_por_email (email, id_cliente, nome, telefone, data_cadastro, cpf)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    email,
-                    client_id,
-                    fake.name(),
-                    fake.phone_number(),
-                    fake.date_time_between(start_date="-2y", end_date="now"),
-                    fake.unique.cpf(),
-                ),
-            )
-        print("Clientes inseridos.")
+def linhas_clientes_por_email(ds):
+    for _, _, c in ds.lotes("clientes"):
+        yield from zip(
+            c["email"], c["id"], c["nome"], c["telefone"], c["data_cadastro"], c["cpf"]
+        )
 
-        
-        print(
-            f"Populando {NUM_PRODUTOS} produtos no Cassandra (produtos_por_categoria)..."
+
+def linhas_produtos_por_categoria(ds):
+    for _, _, p in ds.lotes("produtos"):
+        for categoria, preco, id_produto, nome, estoque in zip(
+            p["categoria"], p["preco"], p["id"], p["nome"], p["estoque"]
+        ):
+            yield categoria, _decimal(preco), id_produto, nome, estoque
+
+
+def linhas_pedidos_base(ds):
+    for _, _, p in ds.lotes("pedidos"):
+        for id_pedido, id_cliente, data_pedido, status, valor_total in zip(
+            p["id"], p["id_cliente"], p["data_pedido"], p["status"], p["valor_total"]
+        ):
+            yield id_pedido, id_cliente, data_pedido, status, _decimal(valor_total)
+
+
+def linhas_pedidos_por_cliente_status(ds):
+    for id_pedido, id_cliente, data_pedido, status, valor_total in linhas_pedidos_base(ds):
+        yield id_cliente, status, data_pedido, id_pedido, valor_total
+
+
+def linhas_pedidos_por_cliente(ds):
+    for id_pedido, id_cliente, data_pedido, status, valor_total in linhas_pedidos_base(ds):
+        yield id_cliente, data_pedido, id_pedido, status, valor_total
+
+
+def linhas_pagamentos_base(ds):
+    for _, _, pg in ds.lotes("pagamentos"):
+        yield from zip(
+            pg["id"], pg["id_pedido"], pg["tipo"], pg["status"], pg["data_pagamento"]
         )
-        product_ids = []
-        categories = [
-            "Eletrônicos",
-            "Informática",
-            "Games",
-            "Celulares",
-            "Periféricos",
-            "Acessórios",
-            "Eletrodomésticos",
-            "Casa Inteligente",
-        ]
-        for _ in range(NUM_PRODUTOS):
-            product_id = uuid.uuid4()
-            product_ids.append(product_id)
-            categoria = random.choice(categories)
-            preco = round(random.uniform(10.0, 5000.0), 2)
-            session.execute(
-                """
-                INSERT INTO produtos_por_categoria (categoria, preco, id_produto, nome, estoque)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (
-                    categoria,
-                    preco,
-                    product_id,
-                    fake.word().capitalize() + " " + fake.word() + " " + fake.word(),
-                    random.randint(0, 1000),
-                ),
-            )
-        print("Produtos inseridos.")
 
-        
-        print(
-            f"Populando {NUM_PEDIDOS} pedidos e {NUM_PEDIDOS} pagamentos no Cassandra..."
+
+def linhas_pagamentos_por_tipo_mes(ds):
+    for id_pagamento, id_pedido, tipo, status, data_pagamento in linhas_pagamentos_base(ds):
+        yield (
+            tipo,
+            data_pagamento.strftime("%Y-%m"),
+            data_pagamento,
+            id_pagamento,
+            id_pedido,
+            status,
         )
-        order_ids = []
-        payment_types = ["cartão", "pix", "boleto"]
-        payment_status_options = ["aprovado", "pendente", "recusado"]
-        order_status_options = ["pendente", "processando", "entregue", "cancelado"]
-
-        for _ in range(NUM_PEDIDOS):
-            order_id = uuid.uuid4()
-            order_ids.append(order_id)
-            client_id = random.choice(client_ids)
-            order_date = fake.date_time_between(start_date="-1y", end_date="now")
-            order_status = random.choice(order_status_options)
-
-            num_items = random.randint(1, 5)
-            valor_total = 0
-
-            selected_product_ids = random.sample(
-                product_ids, min(num_items, len(product_ids))
-            )
 
-            
-            valor_total = round(random.uniform(50.0, 5000.0), 2)
 
-            
-            session.execute(
-                """
-                INSERT INTO pedidos_base (id_pedido, id_cliente, data_pedido, status, valor_total)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (order_id, client_id, order_date, order_status, valor_total),
-            )
+def linhas_itens_por_pedido(ds):
+    for _, _, it in ds.lotes("itens"):
+        for id_pedido, id_produto, quantidade, preco_unitario in zip(
+            it["id_pedido"], it["id_produto"], it["quantidade"], it["preco_unitario"]
+        ):
+            yield id_pedido, id_produto, quantidade, _decimal(preco_unitario)
 
-            
-            session.execute(
-                """
-                INSERT INTO pedidos_por_cliente_status (id_cliente, status, data_pedido, id_pedido, valor_total)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (client_id, order_status, order_date, order_id, valor_total),
-            )
 
-            
-            payment_id = uuid.uuid4()
-            payment_type = random.choice(payment_types)
-            payment_status = random.choice(payment_status_options)
-            payment_date = fake.date_time_between(start_date="-6m", end_date="now")
-            ano_mes = payment_date.strftime("%Y-%m")
-
-            
-            session.execute(
-                """
-                INSERT INTO pagamentos_base (id_pagamento, id_pedido, tipo, status, data_pagamento)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (payment_id, order_id, payment_type, payment_status, payment_date),
-            )
+def linhas_vendas_por_produto(ds):
+    """`(quantidade, id_produto)` com o total de cada produto, já somado no cliente."""
+    totais = ds.vendas_por_produto()
+    for inicio, fim, p in ds.lotes("produtos"):
+        for id_produto, total in zip(p["id"], totais[inicio:fim].tolist()):
+            if total:
+                yield total, id_produto
+
 
-            
-            session.execute(
-                """
-                INSERT INTO pagamentos_por_tipo_mes (tipo, ano_mes, data_pagamento, id_pagamento, id_pedido, status)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    payment_type,
-                    ano_mes,
-                    payment_date,
-                    payment_id,
-                    order_id,
-                    payment_status,
-                ),
+TABELAS = {
+    "clientes_por_email": (
+        ("email", "id_cliente", "nome", "telefone", "data_cadastro", "cpf"),
+        linhas_clientes_por_email,
+    ),
+    "produtos_por_categoria": (
+        ("categoria", "preco", "id_produto", "nome", "estoque"),
+        linhas_produtos_por_categoria,
+    ),
+    "pedidos_base": (
+        ("id_pedido", "id_cliente", "data_pedido", "status", "valor_total"),
+        linhas_pedidos_base,
+    ),
+    "pedidos_por_cliente_status": (
+        ("id_cliente", "status", "data_pedido", "id_pedido", "valor_total"),
+        linhas_pedidos_por_cliente_status,
+    ),
+    "pedidos_por_cliente": (
+        ("id_cliente", "data_pedido", "id_pedido", "status", "valor_total"),
+        linhas_pedidos_por_cliente,
+    ),
+    "pagamentos_base": (
+        ("id_pagamento", "id_pedido", "tipo", "status", "data_pagamento"),
+        linhas_pagamentos_base,
+    ),
+    "pagamentos_por_tipo_mes": (
+        ("tipo", "ano_mes", "data_pagamento", "id_pagamento", "id_pedido", "status"),
+        linhas_pagamentos_por_tipo_mes,
+    ),
+    "itens_por_pedido": (
+        ("id_pedido", "id_produto", "quantidade", "preco_unitario"),
+        linhas_itens_por_pedido,
+    ),
+}
+
+# Tabelas de contadores não aceitam INSERT, só UPDATE com incremento. Como o
+# incremento não é idempotente, a tabela é esvaziada antes de cada carga.
+INCREMENTO_VENDAS_CQL = (
+    "UPDATE vendas_por_produto SET total_vendido = total_vendido + {marcador} "
+    "WHERE id_produto = {marcador}"
+)
+TRUNCATE_VENDAS_CQL = "TRUNCATE vendas_por_produto;"
+
+
+def table_columns(table, bucket=buckets.BUCKET_PADRAO):
+    """Colunas gravadas em `table`, com a coluna de bucket no fim, se houver."""
+    columns, _ = TABELAS[table]
+    if table not in buckets.TABELAS_CLIENTE or buckets.bucket_column(bucket) is None:
+        return columns
+    return columns + (buckets.bucket_column(bucket),)
+
+
+def table_rows(ds, table, bucket=buckets.BUCKET_PADRAO):
+    """Linhas de `table` na ordem de `table_columns`."""
+    columns, linhas = TABELAS[table]
+    if table not in buckets.TABELAS_CLIENTE:
+        return linhas(ds)
+    return buckets.with_bucket(linhas(ds), columns.index("data_pedido"), bucket)
+
+
+def insert_cql(table, marcador="%s", bucket=buckets.BUCKET_PADRAO):
+    columns = table_columns(table, bucket)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([marcador] * len(columns))})"
+    )
+
+
+def load_sequential(session, table, rows, bucket=buckets.BUCKET_PADRAO):
+    """Um `session.execute` síncrono, com CQL não preparado, por linha."""
+    query_cql = insert_cql(table, bucket=bucket)
+    count = 0
+    for row in rows:
+        session.execute(query_cql, row)
+        count += 1
+    return count
+
+
+def load_concurrent(
+    session, table, rows, concorrencia=CONCORRENCIA_PADRAO, bucket=buckets.BUCKET_PADRAO
+):
+    """Prepara o INSERT uma vez e mantém até `concorrencia` escritas em voo."""
+    prepared = session.prepare(insert_cql(table, marcador="?", bucket=bucket))
+    count = 0
+    for success, result in execute_concurrent_with_args(
+        session,
+        prepared,
+        rows,
+        concurrency=concorrencia,
+        raise_on_first_error=True,
+        results_generator=True,
+    ):
+        count += 1
+    return count
+
+
+def load_vendas_por_produto(session, ds, modo="sequencial", concorrencia=CONCORRENCIA_PADRAO):
+    """Incrementa `vendas_por_produto` com uma escrita por produto vendido.
+
+    A tabela é truncada antes: repetir a carga somaria os totais de novo.
+    """
+    session.execute(TRUNCATE_VENDAS_CQL)
+    rows = linhas_vendas_por_produto(ds)
+    if modo == "concorrente":
+        prepared = session.prepare(INCREMENTO_VENDAS_CQL.format(marcador="?"))
+        count = 0
+        for success, result in execute_concurrent_with_args(
+            session,
+            prepared,
+            rows,
+            concurrency=concorrencia,
+            raise_on_first_error=True,
+            results_generator=True,
+        ):
+            count += 1
+        return count
+
+    query_cql = INCREMENTO_VENDAS_CQL.format(marcador="%s")
+    count = 0
+    for row in rows:
+        session.execute(query_cql, row)
+        count += 1
+    return count
+
+
+def populate_cassandra(ds, modo="sequencial", concorrencia=CONCORRENCIA_PADRAO):
+    """Popula as tabelas; retorna o total de escritas, ou None se a carga falhou."""
+    if modo not in MODOS_CARGA:
+        raise ValueError(f"Modo de carga inválido: {modo}. Use um de {MODOS_CARGA}.")
+
+    session = connect_to_cassandra()
+    if not session:
+        print("Não foi possível conectar ao Cassandra. Encerrando população.")
+        return None
+
+    if modo == "concorrente":
+        print(f"Modo de carga: {modo} (concorrência {concorrencia})")
+    else:
+        print(f"Modo de carga: {modo}")
+    bucket = buckets.detect_buckets(session, KEYSPACE)
+    if bucket != buckets.BUCKET_PADRAO:
+        print(f"Pedidos por cliente com bucket por {bucket}.")
+    start_time = time.time()
+    total_writes = 0
+
+    try:
+        for table in TABELAS:
+            print(f"Populando {table} no Cassandra...")
+            table_start = time.time()
+            rows = table_rows(ds, table, bucket)
+            if modo == "concorrente":
+                count = load_concurrent(session, table, rows, concorrencia, bucket)
+            else:
+                count = load_sequential(session, table, rows, bucket)
+            elapsed = time.time() - table_start
+            total_writes += count
+            print(
+                f"{count} linhas inseridas em {elapsed:.2f} segundos "
+                f"({count / elapsed:.0f} escritas/s)."
             )
-        print("Pedidos e Pagamentos inseridos.")
+
+        print("Populando vendas_por_produto no Cassandra...")
+        table_start = time.time()
+        count = load_vendas_por_produto(session, ds, modo, concorrencia)
+        total_writes += count
+        print(f"{count} contadores incrementados em {time.time() - table_start:.2f} segundos.")
+        load_module("cassandra", "ranking_vendas").rollup_ranking_vendas(session)
 
         end_time = time.time()
+        elapsed = end_time - start_time
         print(
-            f"\nPopulação do Cassandra concluída em {end_time - start_time:.2f} segundos."
+            f"\nPopulação do Cassandra concluída em {elapsed:.2f} segundos "
+            f"({total_writes} escritas, {total_writes / elapsed:.0f} escritas/s sustentadas)."
         )
+        return total_writes
 
     except NoHostAvailable as e:
         print(f"Erro ao popular Cassandra: Nenhum host disponível. Detalhes: {e}")
@@ -196,4 +302,21 @@ def populate_cassandra():
 
 
 if __name__ == "__main__":
-    populate_cassandra()
+    parser = argparse.ArgumentParser(description="Popula o Cassandra da TechMarket.")
+    parser.add_argument(
+        "--modo",
+        choices=MODOS_CARGA,
+        default="sequencial",
+        help="sequencial (um execute síncrono por linha) ou concorrente (statements preparados e execute_concurrent).",
+    )
+    parser.add_argument(
+        "--concorrencia",
+        type=int,
+        default=CONCORRENCIA_PADRAO,
+        help="Número máximo de escritas em voo no modo concorrente.",
+    )
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    ds = dataset_from_args(args)
+    populate_cassandra(ds, args.modo, args.concorrencia)
@@ -1,23 +1,236 @@
 from cassandra.cluster import Cluster, NoHostAvailable
+from cassandra.query import BatchStatement, BatchType, TraceUnavailable
 from cassandra.io.geventreactor import GeventConnection
-import time
-from datetime import datetime, timedelta
-import uuid
+import argparse
+import os
+import random
+import sys
+from datetime import timedelta
+from itertools import islice
+from operator import attrgetter
+import heapq
+import re
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.datas import days_before
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    Backend,
+    access_from_args,
+    add_access_arguments,
+    add_benchmark_arguments,
+    add_plans_argument,
+    print_report,
+    run_benchmark,
+)
+from techmarket.planos import print_plans_report, save_plans
 
 CASSANDRA_HOSTS = ["localhost"]
 CASSANDRA_PORT = 9042
 KEYSPACE = "techmarket_ks"
-NUM_RUNS = 10
+buckets = load_module("cassandra", "buckets")
+
+PEDIDO_TABELAS = (
+    "pedidos_base",
+    "pedidos_por_cliente_status",
+    "pedidos_por_cliente",
+    "pagamentos_base",
+    "pagamentos_por_tipo_mes",
+    "itens_por_pedido",
+)
+
+# Q1–Q6 em CQL, compartilhadas pelo backend síncrono e pelo assíncrono
+# (cassandra/assincrono.py). A Q1 são duas leituras: o cliente pelo email e
+# os pedidos dele, ambas de uma única partição.
+CQL = {
+    "q1_cliente": "SELECT id_cliente, nome, email FROM clientes_por_email WHERE email = %s;",
+    "q1_pedidos": """
+        SELECT id_pedido, data_pedido, status, valor_total
+        FROM pedidos_por_cliente
+        WHERE id_cliente = %s
+        LIMIT 3; -- Os 3 mais recentes, pela ordem de clustering
+    """,
+    "q2": """
+        SELECT nome, categoria, preco, estoque
+        FROM produtos_por_categoria
+        WHERE categoria = %s
+        LIMIT 100; -- Limitar para não puxar todos os produtos se a categoria for grande
+    """,
+    "q3": """
+        SELECT id_pedido, data_pedido, valor_total
+        FROM pedidos_por_cliente_status
+        WHERE id_cliente = %s AND status = 'entregue'
+        LIMIT 100; -- Limitar para não puxar todos os pedidos
+    """,
+    "q4": """
+        SELECT nome, categoria, total_vendido
+        FROM ranking_vendas
+        WHERE ranking = 'geral'
+        LIMIT 5;
+    """,
+    # Lida uma vez por mês que a janela toca (ver `month_buckets`).
+    "q5": """
+        SELECT id_pagamento, id_pedido, status, data_pagamento
+        FROM pagamentos_por_tipo_mes
+        WHERE tipo = 'pix' AND ano_mes = %s
+          AND data_pagamento >= %s AND data_pagamento <= %s
+        LIMIT %s;
+    """,
+    # Faixa de clustering numa única partição; a soma é feita no cliente.
+    "q6": """
+        SELECT valor_total
+        FROM pedidos_por_cliente
+        WHERE id_cliente = %s AND data_pedido >= %s AND data_pedido <= %s;
+    """,
+}
+
+# Q1, Q3 e Q6 com bucket de tempo na partição (ver cassandra/buckets.py):
+# uma leitura por bucket, com o limite que ainda falta preencher.
+CQL_BUCKET = {
+    "q1_pedidos": """
+        SELECT id_pedido, data_pedido, status, valor_total
+        FROM pedidos_por_cliente
+        WHERE id_cliente = %s AND {coluna} = %s
+        LIMIT %s;
+    """,
+    "q3": """
+        SELECT id_pedido, data_pedido, valor_total
+        FROM pedidos_por_cliente_status
+        WHERE id_cliente = %s AND status = 'entregue' AND {coluna} = %s
+        LIMIT %s;
+    """,
+    "q6": """
+        SELECT valor_total
+        FROM pedidos_por_cliente
+        WHERE id_cliente = %s AND {coluna} = %s AND data_pedido >= %s AND data_pedido <= %s;
+    """,
+}
+
+LIMITE_Q1 = 3
+LIMITE_Q3 = 100
+LIMITE_Q5 = 100
+
+# Sorteio de uma linha que fornece os parâmetros de cada consulta: a primeira
+# partição a partir de um token aleatório do anel (Murmur3), voltando ao
+# início do anel quando o token cai depois da última partição. Como no
+# PostgreSQL e no MongoDB, a Q5 usa os 30 dias até um pagamento pix existente e a Q6
+# o cliente e a data de um pedido existente (`{particao}` é a chave de
+# partição de `pedidos_por_cliente`, com o bucket quando houver).
+AMOSTRAS = {
+    "Q1": "SELECT email FROM clientes_por_email WHERE token(email) >= %s LIMIT 1;",
+    "Q2": "SELECT categoria FROM produtos_por_categoria WHERE token(categoria) >= %s LIMIT 1;",
+    "Q3": "SELECT id_cliente FROM clientes_por_email WHERE token(email) >= %s LIMIT 1;",
+    # Lê algumas linhas para achar um pix entre os tipos de pagamento.
+    "Q5": "SELECT tipo, data_pagamento FROM pagamentos_base WHERE token(id_pagamento) >= %s LIMIT 30;",
+    "Q6": "SELECT id_cliente, data_pedido FROM pedidos_por_cliente WHERE token({particao}) >= %s LIMIT 1;",
+}
+MENOR_TOKEN = -(2**63)
+
+
+def random_token():
+    return random.randint(MENOR_TOKEN, 2**63 - 1)
+
+
+def sample_cql(consulta, bucket=buckets.BUCKET_PADRAO):
+    """`AMOSTRAS[consulta]` para o esquema de buckets em uso."""
+    colunas = (*buckets.TABELAS_CLIENTE["pedidos_por_cliente"], buckets.bucket_column(bucket))
+    particao = ", ".join(coluna for coluna in colunas if coluna)
+    return AMOSTRAS[consulta].format(particao=particao)
+
+
+def sample_row(consulta, rows):
+    """Primeira linha lida por `AMOSTRAS[consulta]` que serve à consulta."""
+    for row in rows:
+        if consulta != "Q5" or row.tipo == "pix":
+            return row
+    return None
+
+
+def params_from_row(consulta, row):
+    """Converte a linha lida por `AMOSTRAS[consulta]` nos parâmetros da consulta."""
+    if consulta == "Q4":
+        return ()
+    if not row:
+        return None
+    if consulta == "Q1":
+        return (row.email,)
+    if consulta == "Q2":
+        return (row.categoria,)
+    if consulta == "Q3":
+        return (row.id_cliente,)
+    if consulta == "Q5":
+        return days_before(row.data_pagamento)
+    return row.id_cliente, row.data_pedido - timedelta(days=90), row.data_pedido
+
+
+def q5_params(inicio, fim):
+    """Parâmetros de `CQL["q5"]` para cada partição mensal da janela."""
+    return [
+        (ano_mes, inicio, fim, LIMITE_Q5)
+        for ano_mes in buckets.buckets_between(inicio, fim, "mes")
+    ]
+
+
+def bucketed_cql(bucket):
+    """`CQL_BUCKET` com a coluna de bucket do esquema `bucket`."""
+    coluna = buckets.bucket_column(bucket)
+    return {nome: cql.format(coluna=coluna) for nome, cql in CQL_BUCKET.items()}
+
 
-def connect_to_cassandra():
+def read_newest_first(session, cql, chave, bucket, limite):
+    """Lê os buckets do mais recente ao mais antigo até juntar `limite` linhas.
+
+    `cql` recebe a chave de partição sem o bucket (`chave`), o bucket e o
+    limite restante.
+    """
+    linhas = []
+    for valor in buckets.recent_buckets(bucket):
+        linhas.extend(session.execute(cql, (*chave, valor, limite - len(linhas))))
+        if len(linhas) >= limite:
+            break
+    return linhas
+
+
+def read_range(session, cql, chave, inicio, fim, bucket):
+    """Lê, em paralelo, os buckets que a faixa [inicio, fim] toca."""
+    futures = [
+        session.execute_async(cql, (*chave, valor, inicio, fim))
+        for valor in buckets.buckets_between(inicio, fim, bucket)
+    ]
+    return [row for future in futures for row in future.result()]
+
+
+def merge_by_payment_date(partes, limite=LIMITE_Q5):
+    """Intercala os resultados das partições em `data_pagamento DESC`.
+
+    Cada partição já vem ordenada pela chave de clustering, então o merge
+    consome as linhas sob demanda e para ao atingir `limite`, sem buscar as
+    páginas seguintes.
+    """
+    return list(
+        islice(heapq.merge(*partes, key=attrgetter("data_pagamento"), reverse=True), limite)
+    )
+
+
+def total_from_rows(rows):
+    return [sum(row.valor_total for row in rows) if rows else 0]
+
+
+def connect_to_cassandra(connection_class=GeventConnection):
+    """Abre a sessão no keyspace; `connection_class=None` usa o reator padrão do driver."""
     cluster = None
     session = None
+    opcoes = {"connection_class": connection_class} if connection_class else {}
     try:
         cluster = Cluster(
             CASSANDRA_HOSTS,
             port=CASSANDRA_PORT,
-            connection_class=GeventConnection,
             connect_timeout=30,
+            **opcoes,
         )
         session = cluster.connect()
         session.set_keyspace(KEYSPACE)
@@ -32,198 +245,320 @@ def connect_to_cassandra():
 
 
 def execute_cql_query(session, query_cql, params=None):
-    start_time = time.time()
     if params:
         rows = session.execute(query_cql, params)
     else:
         rows = session.execute(query_cql)
-    results = list(rows)
-    end_time = time.time()
-    return (end_time - start_time) * 1000, results
+    return list(rows)
 
 
-def run_cassandra_queries():
-    session = connect_to_cassandra()
-    if not session:
-        print("Não foi possível conectar ao Cassandra. Encerrando consultas.")
-        return
+# Eventos do trace de uma leitura que informam linhas lidas e o caminho de acesso.
+LINHAS_LIDAS = re.compile(r"Read (\d+) live rows and (\d+) tombstone cells")
+LINHAS_VARRIDAS = re.compile(r"Scanned (\d+) rows and matched \d+")
+LEITURA_PARTICAO = re.compile(r"Executing single-partition query on (\w+)")
+LEITURA_INDICE = re.compile(r"using index (\w+)")
 
-    try:
 
-        print(
-            "\n--- Executando Q1: Buscar cliente por email e listar seus últimos 3 pedidos ---"
-        )
+class _SessaoRastreada:
+    """Repassa tudo à sessão do driver, pedindo tracing em cada requisição."""
+
+    def __init__(self, session):
+        self._session = session
+        self.requisicoes = []
+
+    def execute(self, query, parameters=None):
+        return self.execute_async(query, parameters).result()
 
-        rows = session.execute(
-            "SELECT email, id_cliente FROM clientes_por_email LIMIT 1;"
+    def execute_async(self, query, parameters=None):
+        future = self._session.execute_async(query, parameters, trace=True)
+        self.requisicoes.append(future)
+        return future
+
+    def __getattr__(self, nome):
+        return getattr(self._session, nome)
+
+
+def summarize_traces(requisicoes):
+    """Registro de techmarket.planos a partir dos traces das requisições de uma consulta."""
+    registro = {"servidor_ms": 0.0, "examinados": 0, "retornados": 0, "particoes": 0}
+    indices = set()
+    plano = []
+    for future in requisicoes:
+        registro["retornados"] += len(future.result().current_rows)
+        try:
+            trace = future.get_query_trace()
+        except TraceUnavailable:
+            plano.append(None)
+            continue
+        registro["servidor_ms"] += trace.duration.total_seconds() * 1000
+        for evento in trace.events:
+            descricao = evento.description
+            lidas = LINHAS_LIDAS.search(descricao)
+            varridas = LINHAS_VARRIDAS.search(descricao)
+            particao = LEITURA_PARTICAO.search(descricao)
+            indice = LEITURA_INDICE.search(descricao)
+            if lidas:
+                registro["examinados"] += int(lidas[1]) + int(lidas[2])
+            if varridas:
+                registro["examinados"] += int(varridas[1])
+            if particao:
+                registro["particoes"] += 1
+                indices.add(particao[1])
+            if indice:
+                indices.add(indice[1])
+        plano.append(
+            {
+                "requisicao": trace.parameters,
+                "coordenador": trace.coordinator,
+                "duracao_ms": trace.duration.total_seconds() * 1000,
+                "eventos": [
+                    (evento.source_elapsed, evento.source, evento.description)
+                    for evento in trace.events
+                ],
+            }
         )
-        sample_client = rows.one()
-        if sample_client:
-            client_email = sample_client.email
-            client_id = sample_client.id_cliente
-
-            q1_times = []
-            for _ in range(NUM_RUNS):
-
-                query_cliente = """
-                    SELECT nome, email FROM clientes_por_email WHERE email = %s;
-                """
-
-                query_pedidos = """
-                    SELECT id_pedido, data_pedido, status, valor_total
-                    FROM pedidos_por_cliente_status
-                    WHERE id_cliente = %s
-                    LIMIT 3; -- Limitar a 3 pedidos
-                """
-
-                time_taken_cliente, client_info = execute_cql_query(
-                    session, query_cliente, (client_email,)
-                )
-                time_taken_pedidos, recent_orders = execute_cql_query(
-                    session, query_pedidos, (client_id,)
-                )
-                q1_times.append(time_taken_cliente + time_taken_pedidos)
+    registro.update(indices=sorted(indices), plano=plano)
+    return registro
 
-            avg_time = sum(q1_times) / NUM_RUNS
-            print(f"Média de tempo (Q1): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q1 - cliente {client_email}): Cliente: {client_info[0] if client_info else 'N/A'}, Pedidos: {recent_orders[0] if recent_orders else 'Nenhum pedido.'}"
+
+class CassandraBackend(Backend):
+    nome = "cassandra"
+
+    def __init__(self, connection_class=GeventConnection):
+        self.connection_class = connection_class
+        self.session = None
+        self.bucket = buckets.BUCKET_PADRAO
+        self._cql_bucket = None
+        self._inserts = None
+
+    def connect(self):
+        self.session = connect_to_cassandra(self.connection_class)
+        if self.session is None:
+            return False
+        self.bucket = buckets.detect_buckets(self.session, KEYSPACE)
+        if self.bucket != buckets.BUCKET_PADRAO:
+            self._cql_bucket = bucketed_cql(self.bucket)
+        return True
+
+    def close(self):
+        if self.session:
+            self.session.shutdown()
+            self.session.cluster.shutdown()
+
+    def sample_params(self, consulta):
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta}")
+        if consulta not in AMOSTRAS:
+            return params_from_row(consulta, None)
+        cql = sample_cql(consulta, self.bucket)
+        row = sample_row(consulta, self.session.execute(cql, (random_token(),)))
+        if row is None:
+            row = sample_row(consulta, self.session.execute(cql, (MENOR_TOKEN,)))
+        return params_from_row(consulta, row)
+
+    def q1(self, email):
+        client_info = execute_cql_query(self.session, CQL["q1_cliente"], (email,))
+        if not client_info:
+            return []
+        id_cliente = client_info[0].id_cliente
+        if self._cql_bucket:
+            recent_orders = read_newest_first(
+                self.session, self._cql_bucket["q1_pedidos"], (id_cliente,), self.bucket, LIMITE_Q1
             )
         else:
-            print("Nenhum cliente encontrado para testar Q1.")
+            recent_orders = execute_cql_query(self.session, CQL["q1_pedidos"], (id_cliente,))
+        return [(client_info[0], pedido) for pedido in recent_orders]
 
-        print(
-            "\n--- Executando Q2: Listar produtos de uma categoria ordenados por preço ---"
-        )
+    def q2(self, categoria):
+        return execute_cql_query(self.session, CQL["q2"], (categoria,))
 
-        rows = session.execute("SELECT categoria FROM produtos_por_categoria LIMIT 1;")
-        sample_product = rows.one()
-        if sample_product:
-            product_category = sample_product.categoria
-            q2_times = []
-            for _ in range(NUM_RUNS):
-                query_cql = """
-                    SELECT nome, categoria, preco, estoque
-                    FROM produtos_por_categoria
-                    WHERE categoria = %s
-                    LIMIT 100; -- Limitar para não puxar todos os produtos se a categoria for grande
-                """
-                time_taken, results = execute_cql_query(
-                    session, query_cql, (product_category,)
-                )
-                q2_times.append(time_taken)
-            avg_time = sum(q2_times) / NUM_RUNS
-            print(f"Média de tempo (Q2): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q2 - categoria {product_category}): {results[0] if results else 'Nenhum produto encontrado.'}"
+    def q3(self, id_cliente):
+        if self._cql_bucket:
+            return read_newest_first(
+                self.session, self._cql_bucket["q3"], (id_cliente,), self.bucket, LIMITE_Q3
+            )
+        return execute_cql_query(self.session, CQL["q3"], (id_cliente,))
+
+    def q4(self):
+        # Lê o ranking regravado a partir dos contadores de vendas_por_produto
+        # (cassandra/ranking_vendas.py); fica defasado até o próximo rollup.
+        return execute_cql_query(self.session, CQL["q4"])
+
+    def q5(self, inicio, fim):
+        # Uma leitura por mês, todas em voo ao mesmo tempo.
+        futures = [
+            self.session.execute_async(CQL["q5"], params) for params in q5_params(inicio, fim)
+        ]
+        return merge_by_payment_date([future.result() for future in futures])
+
+    def q6(self, id_cliente, inicio, fim):
+        if self._cql_bucket:
+            results = read_range(
+                self.session, self._cql_bucket["q6"], (id_cliente,), inicio, fim, self.bucket
             )
         else:
-            print("Nenhuma categoria encontrada para testar Q2.")
+            results = execute_cql_query(self.session, CQL["q6"], (id_cliente, inicio, fim))
+        return total_from_rows(results)
 
-        print(
-            "\n--- Executando Q3: Listar pedidos de um cliente com status 'entregue' ---"
-        )
+    def explain(self, consulta, params):
+        """Executa a consulta com tracing em todas as requisições que ela faz.
+
+        O tempo no servidor é a soma das durações no coordenador, inclusive
+        das leituras que a Q5 e a Q6 com buckets disparam em paralelo.
+        """
+        sessao = self.session
+        rastreada = _SessaoRastreada(sessao)
+        self.session = rastreada
+        try:
+            self.run(consulta, params)
+        finally:
+            self.session = sessao
+        return summarize_traces(rastreada.requisicoes)
 
-        rows = session.execute("SELECT id_cliente FROM clientes_por_email LIMIT 1;")
-        sample_client_q3 = rows.one()
-        if sample_client_q3:
-            client_id_q3 = sample_client_q3.id_cliente
-            q3_times = []
-            for _ in range(NUM_RUNS):
-                query_cql = """
-                    SELECT id_pedido, data_pedido, valor_total
-                    FROM pedidos_por_cliente_status
-                    WHERE id_cliente = %s AND status = 'entregue'
-                    LIMIT 100; -- Limitar para não puxar todos os pedidos
-                """
-                time_taken, results = execute_cql_query(
-                    session, query_cql, (client_id_q3,)
+    def sample_refs(self, n):
+        client_ids = [
+            row.id_cliente
+            for row in self.session.execute(
+                "SELECT id_cliente FROM clientes_por_email LIMIT %s;", (n,)
+            )
+        ]
+        produtos = [
+            (row.id_produto, row.preco)
+            for row in self.session.execute(
+                "SELECT id_produto, preco FROM produtos_por_categoria LIMIT %s;", (n,)
+            )
+        ]
+        return client_ids, produtos
+
+    def _prepared_inserts(self):
+        if self._inserts is None:
+            populate = load_module("cassandra", "populate")
+            self._inserts = {
+                table: self.session.prepare(
+                    populate.insert_cql(table, marcador="?", bucket=self.bucket)
                 )
-                q3_times.append(time_taken)
-            avg_time = sum(q3_times) / NUM_RUNS
-            print(f"Média de tempo (Q3): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q3 - cliente {client_id_q3}): {results[0] if results else 'Nenhum pedido entregue encontrado.'}"
+                for table in PEDIDO_TABELAS
+            }
+            self._inserts["vendas_por_produto"] = self.session.prepare(
+                populate.INCREMENTO_VENDAS_CQL.format(marcador="?")
             )
-        else:
-            print("Nenhum cliente encontrado para testar Q3.")
-
-        print("\n--- Executando Q4: Obter os 5 produtos mais vendidos ---")
-
-        q4_times = []
-        for _ in range(NUM_RUNS):
-            query_cql = """
-                SELECT nome, categoria, preco
-                FROM produtos_por_categoria
-                LIMIT 5; -- Apenas um exemplo, não os "mais vendidos" agregados.
-            """
-            time_taken, results = execute_cql_query(session, query_cql)
-            q4_times.append(time_taken)
-        avg_time = sum(q4_times) / NUM_RUNS
-        print(f"Média de tempo (Q4 - Simulado): {avg_time:.2f} ms")
-        print(
-            f"Exemplo de resultado (Q4 - Simulado): {results[0] if results else 'Nenhum produto encontrado.'}"
-        )
+        return self._inserts
 
-        print(
-            "\n--- Executando Q5: Consultar pagamentos feitos via PIX no último mês ---"
+    def place_order(self, pedido):
+        """Grava o pedido, os itens e o pagamento em todas as tabelas denormalizadas.
+
+        Um batch LOGGED garante que as escritas acabem aplicadas juntas. Os
+        contadores de `vendas_por_produto` não podem entrar nele e vão num
+        batch COUNTER separado, depois que o pedido foi gravado.
+        """
+        inserts = self._prepared_inserts()
+        pagamento = pedido["pagamento"]
+        id_pedido = pedido["id_pedido"]
+        data_pagamento = pagamento["data_pagamento"]
+        # Coluna de bucket, no fim das linhas das tabelas de pedidos por cliente.
+        bucket = (
+            (buckets.bucket_value(pedido["data_pedido"], self.bucket),) if self._cql_bucket else ()
         )
-        end_date_q5 = datetime.now()
-        start_date_q5 = end_date_q5 - timedelta(days=30)
-
-        current_year_month = datetime.now().strftime("%Y-%m")
-
-        q5_times = []
-        for _ in range(NUM_RUNS):
-            query_cql = """
-                SELECT id_pagamento, id_pedido, status, data_pagamento
-                FROM pagamentos_por_tipo_mes
-                WHERE tipo = 'pix' AND ano_mes = %s AND data_pagamento BETWEEN %s AND %s
-                LIMIT 100;
-            """
-            time_taken, results = execute_cql_query(
-                session, query_cql, (current_year_month, start_date_q5, end_date_q5)
-            )
-            q5_times.append(time_taken)
-        avg_time = sum(q5_times) / NUM_RUNS
-        print(f"Média de tempo (Q5): {avg_time:.2f} ms")
-        print(
-            f"Exemplo de resultado (Q5 - PIX no mês {current_year_month}): {results[0] if results else 'Nenhum pagamento PIX encontrado.'}"
+        batch = BatchStatement(batch_type=BatchType.LOGGED)
+        batch.add(
+            inserts["pedidos_base"],
+            (
+                id_pedido,
+                pedido["id_cliente"],
+                pedido["data_pedido"],
+                pedido["status"],
+                pedido["valor_total"],
+            ),
         )
-
-        print(
-            "\n--- Executando Q6: Obter o valor total gasto por um cliente em pedidos em um período ---"
+        batch.add(
+            inserts["pedidos_por_cliente_status"],
+            (
+                pedido["id_cliente"],
+                pedido["status"],
+                pedido["data_pedido"],
+                id_pedido,
+                pedido["valor_total"],
+                *bucket,
+            ),
+        )
+        batch.add(
+            inserts["pedidos_por_cliente"],
+            (
+                pedido["id_cliente"],
+                pedido["data_pedido"],
+                id_pedido,
+                pedido["status"],
+                pedido["valor_total"],
+                *bucket,
+            ),
+        )
+        batch.add(
+            inserts["pagamentos_base"],
+            (
+                pagamento["id_pagamento"],
+                id_pedido,
+                pagamento["tipo"],
+                pagamento["status"],
+                data_pagamento,
+            ),
+        )
+        batch.add(
+            inserts["pagamentos_por_tipo_mes"],
+            (
+                pagamento["tipo"],
+                data_pagamento.strftime("%Y-%m"),
+                data_pagamento,
+                pagamento["id_pagamento"],
+                id_pedido,
+                pagamento["status"],
+            ),
         )
+        for item in pedido["itens"]:
+            batch.add(
+                inserts["itens_por_pedido"],
+                (
+                    id_pedido,
+                    item["id_produto"],
+                    item["quantidade"],
+                    item["preco_unitario"],
+                ),
+            )
+        self.session.execute(batch)
 
-        rows = session.execute("SELECT id_cliente FROM clientes_por_email LIMIT 1;")
-        sample_client_q6 = rows.one()
-        if sample_client_q6:
-            client_id_q6 = sample_client_q6.id_cliente
-            end_date_q6 = datetime.now()
-            start_date_q6 = end_date_q6 - timedelta(days=90)
-
-            q6_times = []
-            for _ in range(NUM_RUNS):
-
-                query_cql = """
-                    SELECT valor_total
-                    FROM pedidos_por_cliente_status
-                    WHERE id_cliente = %s AND data_pedido BETWEEN %s AND %s
-                    LIMIT 10000; -- Limitar para evitar trazer dados demais na simulação
-                """
-                time_taken, results = execute_cql_query(
-                    session, query_cql, (client_id_q6, start_date_q6, end_date_q6)
-                )
-                total_gasto = sum(row.valor_total for row in results) if results else 0
-                q6_times.append(time_taken)
-            avg_time = sum(q6_times) / NUM_RUNS
-            print(f"Média de tempo (Q6 - Simulado): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q6 - cliente {client_id_q6}): Total gasto (estimado): {total_gasto:.2f}"
+        contadores = BatchStatement(batch_type=BatchType.COUNTER)
+        for item in pedido["itens"]:
+            contadores.add(
+                inserts["vendas_por_produto"], (item["quantidade"], item["id_produto"])
             )
-        else:
-            print("Nenhum cliente encontrado para testar Q6.")
+        self.session.execute(contadores)
+
+
+def create_backend(**opcoes):
+    return CassandraBackend(**opcoes)
 
+
+def run_cassandra_queries(
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    acesso=None,
+    arquivo_planos=None,
+):
+    backend = CassandraBackend()
+    if not backend.connect():
+        print("Não foi possível conectar ao Cassandra. Encerrando consultas.")
+        return []
+
+    planos = [] if arquivo_planos else None
+    try:
+        resumos = run_benchmark(
+            backend, consultas, aquecimento, iteracoes, acesso=acesso, planos=planos
+        )
+        print_report(resumos)
+        if planos is not None:
+            print_plans_report(planos)
+            save_plans(planos, arquivo_planos)
+        return resumos
     except NoHostAvailable as e:
         print(
             f"Erro ao executar consultas no Cassandra: Nenhum host disponível. Detalhes: {e}"
@@ -231,10 +566,21 @@ def run_cassandra_queries():
     except Exception as e:
         print(f"Erro inesperado ao executar consultas no Cassandra: {e}")
     finally:
-        session.shutdown()
-        session.cluster.shutdown()
+        backend.close()
         print("\nConexão ao Cassandra fechada.")
+    return []
 
 
 if __name__ == "__main__":
-    run_cassandra_queries()
+    parser = argparse.ArgumentParser(description="Executa Q1–Q6 no Cassandra.")
+    add_benchmark_arguments(parser)
+    add_access_arguments(parser)
+    add_plans_argument(parser)
+    args = parser.parse_args()
+    run_cassandra_queries(
+        args.consultas,
+        args.aquecimento,
+        args.iteracoes,
+        access_from_args(args),
+        args.planos,
+    )
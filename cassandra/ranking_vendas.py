@@ -0,0 +1,104 @@
+"""Rollup de `vendas_por_produto` para a tabela `ranking_vendas` (Q4).
+
+Os contadores de `vendas_por_produto` são incrementados a cada item gravado,
+mas o Cassandra não ordena partições por valor. O rollup lê os contadores,
+guarda os `top` maiores e regrava a partição do ranking num batch de partição
+única: o DELETE da partição antiga e os INSERTs novos, com timestamps
+consecutivos, são aplicados de forma atômica e isolada, então a Q4 nunca vê o
+ranking pela metade. Pode ser agendado com `--intervalo`.
+"""
+
+from cassandra.query import BatchStatement, BatchType, SimpleStatement
+import argparse
+import heapq
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+
+RANKING = "geral"
+TOP_PADRAO = 100
+TAMANHO_PAGINA = 5000
+
+
+def rollup_ranking_vendas(session, top=TOP_PADRAO):
+    """Regrava o ranking com os `top` produtos mais vendidos; retorna quantos."""
+    inicio = time.time()
+    contadores = session.execute(
+        SimpleStatement(
+            "SELECT id_produto, total_vendido FROM vendas_por_produto;",
+            fetch_size=TAMANHO_PAGINA,
+        )
+    )
+    maiores = heapq.nlargest(
+        top, ((row.total_vendido, row.id_produto) for row in contadores)
+    )
+    ids = {id_produto for _, id_produto in maiores}
+
+    # produtos_por_categoria é particionada por categoria, então o nome e a
+    # categoria dos produtos do ranking vêm de uma varredura completa.
+    info = {}
+    produtos = session.execute(
+        SimpleStatement(
+            "SELECT id_produto, nome, categoria FROM produtos_por_categoria;",
+            fetch_size=TAMANHO_PAGINA,
+        )
+    )
+    for row in produtos:
+        if row.id_produto in ids:
+            info[row.id_produto] = (row.nome, row.categoria)
+
+    timestamp = int(time.time() * 1e6)
+    batch = BatchStatement(batch_type=BatchType.LOGGED)
+    batch.add(
+        "DELETE FROM ranking_vendas USING TIMESTAMP %s WHERE ranking = %s;",
+        (timestamp, RANKING),
+    )
+    for total_vendido, id_produto in maiores:
+        nome, categoria = info.get(id_produto, (None, None))
+        batch.add(
+            "INSERT INTO ranking_vendas (ranking, total_vendido, id_produto, nome, categoria) "
+            "VALUES (%s, %s, %s, %s, %s) USING TIMESTAMP %s;",
+            (RANKING, total_vendido, id_produto, nome, categoria, timestamp + 1),
+        )
+    session.execute(batch)
+    print(
+        f"Ranking de vendas regravado com {len(maiores)} produtos em "
+        f"{time.time() - inicio:.2f} segundos."
+    )
+    return len(maiores)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recalcula a tabela ranking_vendas a partir de vendas_por_produto."
+    )
+    parser.add_argument(
+        "--top", type=int, default=TOP_PADRAO, help="Produtos mantidos no ranking."
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=None,
+        help="Repete o rollup a cada N segundos, até ser interrompido.",
+    )
+    args = parser.parse_args()
+
+    session = load_module("cassandra", "populate").connect_to_cassandra()
+    if not session:
+        print("Não foi possível conectar ao Cassandra. Encerrando.")
+        sys.exit(1)
+    try:
+        while True:
+            rollup_ranking_vendas(session, args.top)
+            if args.intervalo is None:
+                break
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.shutdown()
+        session.cluster.shutdown()
@@ -0,0 +1,267 @@
+"""Compara threads, gevent e asyncio com o mesmo número de clientes concorrentes.
+
+Cada modelo roda num subprocesso próprio: o gevent precisa aplicar o
+monkey-patch antes de qualquer outro import, e o processo das threads não
+deve herdar esse patch. O processo principal só dispara os três e junta os
+resultados.
+"""
+
+import sys
+
+if "--executar" in sys.argv[:-1] and sys.argv[sys.argv.index("--executar") + 1] == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+from functools import partial
+
+from techmarket.assincrono import async_closed_loop
+from techmarket.backends import BACKENDS, load_module
+from techmarket.harness import CONSULTAS, access_from_args, add_access_arguments
+from techmarket.loadgen import closed_loop, format_step
+
+MODELOS = ("threads", "gevent", "asyncio")
+CLIENTES_PADRAO = 100
+DURACAO_PADRAO = 5
+# Cada execução escolhe os parâmetros entre candidatos sorteados antes da
+# medição, iguais nos três modelos.
+ACESSO_MODELOS = "uniforme"
+
+
+class _ClienteCompartilhado:
+    """Cliente virtual do `closed_loop` que delega a um executor compartilhado."""
+
+    def __init__(self, nome, executar, amostrador):
+        self.nome = nome
+        self.executar = executar
+        self.amostrador = amostrador
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    def sample_params(self, consulta):
+        return self.amostrador.sample_params(consulta)
+
+    def run(self, consulta, params):
+        return self.executar(consulta, params)
+
+
+def _sync_executor(nome, modelo, clientes):
+    """Retorna `(executar, amostrador, fechar)` para os modelos síncronos.
+
+    O PostgreSQL atende uma consulta por conexão, então cada execução pega uma
+    conexão de um pool do mesmo tamanho do usado pelo asyncpg, com todas as
+    conexões abertas de antemão nos dois lados. O amostrador usa uma conexão
+    própria, fora do pool. MongoDB e Cassandra compartilham um único
+    cliente, que já multiplexa as requisições.
+    """
+    queries = load_module(nome, "queries")
+    if nome == "postgres":
+        conexoes = load_module("postgres", "conexoes")
+        if modelo == "gevent":
+            conexoes.enable_gevent()
+        maximo = min(clientes, conexoes.MAX_CONEXOES)
+        pool = conexoes.create_pool(maximo)
+        if pool is None:
+            return None
+
+        def executar(consulta, params):
+            backend = queries.PostgresBackend(conexoes=pool)
+            backend.connect()
+            try:
+                return backend.run(consulta, params)
+            finally:
+                backend.close()
+
+        amostrador = queries.PostgresBackend()
+        if not amostrador.connect():
+            pool.close()
+            return None
+
+        def fechar():
+            amostrador.close()
+            pool.close()
+
+        return executar, amostrador, fechar
+
+    opcoes = {}
+    if nome == "cassandra":
+        # Nas threads, o reator padrão do driver; no gevent, o reator de greenlets.
+        opcoes["connection_class"] = (
+            load_module("cassandra", "queries").GeventConnection if modelo == "gevent" else None
+        )
+    backend = queries.create_backend(**opcoes)
+    if not backend.connect():
+        return None
+    return backend.run, backend, backend.close
+
+
+def run_sync_model(modelo, backends, consultas, clientes, duracao, acesso):
+    resultados = []
+    for nome in backends:
+        executor = _sync_executor(nome, modelo, clientes)
+        if executor is None:
+            print(f"Não foi possível conectar ao banco '{nome}'.")
+            continue
+        executar, amostrador, fechar = executor
+        try:
+            for consulta in consultas:
+                print(f"\n=== {consulta}: {CONSULTAS[consulta]} ({nome}, {modelo}) ===")
+                resultado = closed_loop(
+                    partial(_ClienteCompartilhado, nome, executar, amostrador),
+                    consulta,
+                    clientes,
+                    duracao,
+                    acesso,
+                )
+                print(format_step(resultado))
+                resultado.update(banco=nome, consulta=consulta, modelo=modelo)
+                resultados.append(resultado)
+        finally:
+            fechar()
+    return resultados
+
+
+async def run_async_model(backends, consultas, clientes, duracao, acesso):
+    resultados = []
+    for nome in backends:
+        modulo = load_module(nome, "assincrono")
+        opcoes = {}
+        if nome == "postgres":
+            opcoes["conexoes"] = min(clientes, load_module("postgres", "conexoes").MAX_CONEXOES)
+        backend = modulo.create_backend(**opcoes)
+        if not await backend.connect():
+            print(f"Não foi possível conectar ao banco '{nome}'.")
+            continue
+        try:
+            for consulta in consultas:
+                print(f"\n=== {consulta}: {CONSULTAS[consulta]} ({nome}, asyncio) ===")
+                resultado = await async_closed_loop(
+                    backend, consulta, clientes, duracao, acesso
+                )
+                print(format_step(resultado))
+                resultado.update(banco=nome, consulta=consulta, modelo="asyncio")
+                resultados.append(resultado)
+        finally:
+            await backend.close()
+    return resultados
+
+
+def run_model(modelo, backends, consultas, clientes, duracao, acesso):
+    if modelo == "asyncio":
+        return asyncio.run(run_async_model(backends, consultas, clientes, duracao, acesso))
+    return run_sync_model(modelo, backends, consultas, clientes, duracao, acesso)
+
+
+def compare_models(modelos, backends, consultas, clientes, duracao, acesso):
+    """Roda cada modelo num subprocesso e imprime a comparação."""
+    resultados = []
+    for modelo in modelos:
+        print(f"\n##### Modelo {modelo} ({clientes} clientes) #####")
+        with tempfile.TemporaryDirectory() as pasta:
+            saida = os.path.join(pasta, "resultados.json")
+            comando = [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--executar", modelo,
+                "--saida", saida,
+                "--backends", *backends,
+                "--consultas", *consultas,
+                "--clientes", str(clientes),
+                "--duracao", str(duracao),
+                "--acesso", acesso.distribuicao,
+                "--expoente-acesso", str(acesso.expoente),
+                "--candidatos", str(acesso.candidatos),
+            ]
+            processo = subprocess.run(comando)
+            if processo.returncode != 0 or not os.path.exists(saida):
+                print(f"O modelo {modelo} terminou com erro (código {processo.returncode}).")
+                continue
+            with open(saida) as arquivo:
+                resultados.extend(json.load(arquivo))
+    print_models_report(resultados, clientes)
+    return resultados
+
+
+def print_models_report(resultados, clientes):
+    cabecalho = (
+        f"{'Banco':<10} {'Consulta':<34} {'Modelo':<8} {'ops/s':>9} "
+        f"{'p50':>9} {'p99':>9} {'erros':>6}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    ordem = {modelo: i for i, modelo in enumerate(MODELOS)}
+    for r in sorted(
+        resultados, key=lambda r: (r["banco"], r["consulta"], ordem[r["modelo"]])
+    ):
+        rotulo = f"{r['consulta']}: {CONSULTAS[r['consulta']]}"
+        prefixo = f"{r['banco']:<10} {rotulo:<34} {r['modelo']:<8}"
+        if not r["n"]:
+            print(f"{prefixo} {'-':>9} {'-':>9} {'-':>9} {r['erros']:>6}")
+            continue
+        print(
+            f"{prefixo} {r['vazao']:>9.1f} {r['p50']:>9.3f} {r['p99']:>9.3f} {r['erros']:>6}"
+        )
+    print(f"(latências em ms; {clientes} clientes concorrentes em laço fechado)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara threads, gevent e asyncio sobre Q1–Q6 com a mesma concorrência."
+    )
+    parser.add_argument(
+        "--modelos", nargs="+", choices=MODELOS, default=list(MODELOS)
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--consultas", nargs="+", choices=list(CONSULTAS), default=list(CONSULTAS)
+    )
+    parser.add_argument(
+        "--clientes",
+        type=int,
+        default=CLIENTES_PADRAO,
+        help="Clientes concorrentes em laço fechado, iguais para os três modelos.",
+    )
+    parser.add_argument(
+        "--duracao",
+        type=float,
+        default=DURACAO_PADRAO,
+        help="Duração de cada medição, em segundos.",
+    )
+    add_access_arguments(parser, padrao=ACESSO_MODELOS)
+    # Usados pelo processo principal ao disparar cada modelo.
+    parser.add_argument("--executar", choices=MODELOS, help=argparse.SUPPRESS)
+    parser.add_argument("--saida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar:
+        resultados = run_model(
+            args.executar,
+            args.backends,
+            args.consultas,
+            args.clientes,
+            args.duracao,
+            access_from_args(args),
+        )
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultados, arquivo)
+    else:
+        compare_models(
+            args.modelos,
+            args.backends,
+            args.consultas,
+            args.clientes,
+            args.duracao,
+            access_from_args(args),
+        )
@@ -0,0 +1,97 @@
+import argparse
+
+from scaling import run_scale
+from techmarket.backends import BACKENDS
+from techmarket.chaves import ESTRATEGIAS
+from techmarket.dataset import DEFAULT_SEED, ESCALA_PADRAO
+from techmarket.harness import add_benchmark_arguments
+from techmarket.snapshot import load_or_generate
+
+
+def run_key_strategies(
+    backends, estrategias, seed, escala, consultas, aquecimento, iteracoes, usar_snapshot=True
+):
+    """Recria, popula e mede cada banco com cada estratégia de chave primária."""
+    ds = load_or_generate(seed, escala, usar_snapshot)
+    linhas = sum(
+        ds.tamanho(tabela)
+        for tabela in ("clientes", "produtos", "pedidos", "itens", "pagamentos")
+    )
+    resultados = {}
+    for estrategia in estrategias:
+        ds.chaves = estrategia
+        for nome in backends:
+            print(f"\n=== {nome}, chaves {estrategia} ===")
+            resultado = run_scale(nome, ds, consultas, aquecimento, iteracoes)
+            if resultado is not None:
+                resultados[(nome, estrategia)] = resultado
+    print_key_report(resultados, backends, estrategias, consultas, linhas)
+    return resultados
+
+
+def print_key_report(resultados, backends, estrategias, consultas, linhas):
+    """Vazão de carga, tamanho total dos índices e p50 das consultas por estratégia."""
+    colunas_consultas = "".join(f"{f'{c} p50':>11}" for c in consultas)
+    cabecalho = (
+        f"{'Banco':<10} {'Chaves':<11} {'Carga (s)':>10} {'linhas/s':>10} "
+        f"{'Índices MB':>11}{colunas_consultas}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for nome in backends:
+        for estrategia in estrategias:
+            resultado = resultados.get((nome, estrategia))
+            if resultado is None:
+                continue
+            indices = resultado["indices"]
+            tamanho = f"{sum(indices.values()) / 2**20:>11.1f}" if indices else f"{'-':>11}"
+            celulas = "".join(
+                f"{resultado['consultas'][c]['p50']:>11.3f}"
+                if c in resultado["consultas"]
+                else f"{'-':>11}"
+                for c in consultas
+            )
+            print(
+                f"{nome:<10} {estrategia:<11} {resultado['carga']:>10.2f} "
+                f"{linhas / resultado['carga']:>10.0f} {tamanho}{celulas}"
+            )
+    print("(latências em ms; linhas/s conta as linhas do conjunto de dados, não as escritas denormalizadas)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara estratégias de chave primária (uuid4, uuid7, sequencial) em cada banco."
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--estrategias", nargs="+", choices=ESTRATEGIAS, default=list(ESTRATEGIAS)
+    )
+    parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED, help="Semente do gerador de dados."
+    )
+    parser.add_argument(
+        "--escala",
+        type=float,
+        default=ESCALA_PADRAO,
+        help="Fator de escala do conjunto de dados.",
+    )
+    parser.add_argument(
+        "--sem-snapshot",
+        action="store_true",
+        help="Regenera o conjunto de dados sem ler nem gravar snapshots em disco.",
+    )
+    add_benchmark_arguments(parser)
+    parser.set_defaults(consultas=["Q1", "Q3"])
+    args = parser.parse_args()
+    run_key_strategies(
+        args.backends,
+        args.estrategias,
+        args.seed,
+        args.escala,
+        args.consultas,
+        args.aquecimento,
+        args.iteracoes,
+        not args.sem_snapshot,
+    )
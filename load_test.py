@@ -0,0 +1,90 @@
+import argparse
+from functools import partial
+
+from techmarket.backends import BACKENDS, create_backend
+from techmarket.harness import CONSULTAS, access_from_args, add_access_arguments
+from techmarket.loadgen import (
+    CLIENTES_PADRAO,
+    DURACAO_PADRAO,
+    TAXAS_PADRAO,
+    WORKERS_PADRAO,
+    ramp_closed_loop,
+    ramp_open_loop,
+)
+
+
+def run_load_test(backends, consultas, modo, clientes, taxas, duracao, workers, acesso=None):
+    """Aumenta a carga de cada consulta em cada banco até a saturação."""
+    resultados = {}
+    for nome in backends:
+        for consulta in consultas:
+            print(f"\n=== {consulta}: {CONSULTAS[consulta]} ({nome}, laço {modo}) ===")
+            fabrica = partial(create_backend, nome)
+            try:
+                if modo == "fechado":
+                    degraus = ramp_closed_loop(fabrica, consulta, clientes, duracao, acesso)
+                else:
+                    degraus = ramp_open_loop(
+                        fabrica, consulta, taxas, duracao, workers, acesso
+                    )
+            except ConnectionError as e:
+                print(e)
+                break
+            resultados[(nome, consulta)] = degraus
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Gera carga concorrente sobre Q1–Q6 até a saturação de cada banco."
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--consultas", nargs="+", choices=list(CONSULTAS), default=list(CONSULTAS)
+    )
+    parser.add_argument(
+        "--modo",
+        choices=("fechado", "aberto"),
+        default="fechado",
+        help="fechado: N clientes virtuais; aberto: taxa de chegada alvo.",
+    )
+    parser.add_argument(
+        "--clientes",
+        nargs="+",
+        type=int,
+        default=list(CLIENTES_PADRAO),
+        help="Degraus de clientes virtuais no laço fechado.",
+    )
+    parser.add_argument(
+        "--taxas",
+        nargs="+",
+        type=float,
+        default=list(TAXAS_PADRAO),
+        help="Degraus de taxa de chegada (consultas/s) no laço aberto.",
+    )
+    parser.add_argument(
+        "--duracao",
+        type=float,
+        default=DURACAO_PADRAO,
+        help="Duração de cada degrau, em segundos.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS_PADRAO,
+        help="Conexões disponíveis para atender as chegadas no laço aberto.",
+    )
+    add_access_arguments(parser)
+    args = parser.parse_args()
+    run_load_test(
+        args.backends,
+        args.consultas,
+        args.modo,
+        args.clientes,
+        args.taxas,
+        args.duracao,
+        args.workers,
+        access_from_args(args),
+    )
@@ -0,0 +1,63 @@
+import argparse
+from functools import partial
+
+from techmarket.backends import BACKENDS, create_backend
+from techmarket.harness import access_from_args, add_access_arguments
+from techmarket.workload import (
+    ACESSO_CARGA,
+    CLIENTES_PADRAO,
+    DURACAO_PADRAO,
+    MIX_PADRAO,
+    parse_mix,
+    print_workload_report,
+    run_mixed_workload,
+)
+
+
+def run_all(backends, mix, clientes, duracao, seed=None, acesso=None):
+    """Executa a mesma carga mista em cada banco e imprime um relatório por banco."""
+    resultados = {}
+    for nome in backends:
+        try:
+            resumos, geral = run_mixed_workload(
+                partial(create_backend, nome), mix, clientes, duracao, seed, acesso
+            )
+        except ConnectionError as e:
+            print(f"{e} Pulando.")
+            continue
+        print_workload_report(nome, resumos, geral)
+        resultados[nome] = (resumos, geral)
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Carga mista de leitura (Q1–Q6) e escrita (novos pedidos) em cada banco."
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=MIX_PADRAO,
+        help="Pesos das operações, por exemplo 'place_order=20,Q1=30,Q3=30,Q6=20'.",
+    )
+    parser.add_argument(
+        "--clientes",
+        type=int,
+        default=CLIENTES_PADRAO,
+        help="Clientes virtuais simultâneos, cada um com a própria conexão.",
+    )
+    parser.add_argument(
+        "--duracao",
+        type=float,
+        default=DURACAO_PADRAO,
+        help="Duração da medição, em segundos.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Semente do sorteio das operações.")
+    add_access_arguments(parser, padrao=ACESSO_CARGA)
+    args = parser.parse_args()
+    run_all(
+        args.backends, args.mix, args.clientes, args.duracao, args.seed, access_from_args(args)
+    )
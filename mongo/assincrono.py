@@ -0,0 +1,195 @@
+"""Q1–Q6 e população do MongoDB com a API assíncrona do PyMongo.
+
+Usa `pymongo.AsyncMongoClient` (PyMongo 4.10+), que substitui o Motor. O
+cliente mantém um pool de conexões compartilhado por todas as tarefas.
+"""
+
+from pymongo import AsyncMongoClient
+from pymongo.errors import ConnectionFailure
+from bson.codec_options import CodecOptions, UuidRepresentation
+from itertools import islice
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.assincrono import (
+    CONCORRENCIA_PADRAO,
+    AsyncBackend,
+    drain,
+    run_benchmark_async,
+)
+from techmarket.backends import load_module
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    add_benchmark_arguments,
+    print_report,
+)
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+queries = load_module("mongo", "queries")
+populate = load_module("mongo", "populate")
+
+
+async def connect_to_mongodb_async():
+    client = AsyncMongoClient(queries.MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        await client.admin.command("ping")
+        print("Conexão ao MongoDB estabelecida.")
+        return client
+    except ConnectionFailure as e:
+        print(f"Erro ao conectar ao MongoDB: {e}")
+        await client.close()
+        return None
+
+
+def get_database(client):
+    return client.get_database(
+        queries.DB_NAME,
+        codec_options=CodecOptions(uuid_representation=UuidRepresentation.STANDARD),
+    )
+
+
+class MongoAsyncBackend(AsyncBackend):
+    nome = "mongo"
+
+    def __init__(self, variante_q4="pipeline"):
+        if variante_q4 not in queries.VARIANTES_Q4:
+            raise ValueError(
+                f"Variante da Q4 inválida: {variante_q4}. Use uma de {queries.VARIANTES_Q4}."
+            )
+        self.variante_q4 = variante_q4
+        self.client = None
+        self.db = None
+
+    async def connect(self):
+        self.client = await connect_to_mongodb_async()
+        if not self.client:
+            return False
+        self.db = get_database(self.client)
+        return True
+
+    async def close(self):
+        if self.client:
+            await self.client.close()
+
+    async def _aggregate(self, colecao, pipeline):
+        return await (await self.db[colecao].aggregate(pipeline)).to_list()
+
+    async def sample_params(self, consulta):
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta}")
+        if consulta not in queries.AMOSTRAS:
+            return queries.params_from_sample(consulta, None)
+        documentos = await self._aggregate(*queries.AMOSTRAS[consulta])
+        return queries.params_from_sample(consulta, documentos[0] if documentos else None)
+
+    async def q1(self, email):
+        return await self._aggregate("clientes", queries.q1_pipeline(email))
+
+    async def q2(self, categoria):
+        return await self.db.produtos.find(**queries.q2_find(categoria)).to_list()
+
+    async def q3(self, id_cliente):
+        return await self.db.pedidos.find(**queries.q3_find(id_cliente)).to_list()
+
+    async def q4(self):
+        if self.variante_q4 == "incremental":
+            return await self.db.produtos.find(**queries.Q4_INCREMENTAL_FIND).to_list()
+        if self.variante_q4 == "rollup":
+            return await self.db.vendas_produto.find(**queries.Q4_ROLLUP_FIND).to_list()
+        return await self._aggregate("pedidos", queries.q4_pipeline())
+
+    async def q5(self, inicio, fim):
+        return await self.db.pedidos.find(**queries.q5_find(inicio, fim)).to_list()
+
+    async def q6(self, id_cliente, inicio, fim):
+        return await self._aggregate("pedidos", queries.q6_pipeline(id_cliente, inicio, fim))
+
+
+def create_backend(**opcoes):
+    return MongoAsyncBackend(**opcoes)
+
+
+async def populate_mongodb_async(
+    ds, concorrencia=CONCORRENCIA_PADRAO, tamanho_lote=populate.TAMANHO_LOTE_PADRAO
+):
+    """Insere cada coleção em blocos de `tamanho_lote`, com até `concorrencia`
+    `insert_many` em voo."""
+    client = await connect_to_mongodb_async()
+    if not client:
+        print("Não foi possível conectar ao MongoDB. Encerrando população.")
+        return
+    db = get_database(client)
+
+    start_time = time.time()
+    try:
+        for nome, (colecao, gerar) in populate.COLECOES.items():
+            documentos = gerar(ds)
+            blocos = iter(lambda: list(islice(documentos, tamanho_lote)), [])
+            colecao_inicio = time.time()
+
+            async def inserir(bloco, colecao=colecao):
+                await db[colecao].insert_many(bloco, ordered=False)
+
+            lotes = await drain(blocos, inserir, concorrencia)
+            print(
+                f"{nome}: {lotes} lotes inseridos em {time.time() - colecao_inicio:.2f} segundos."
+            )
+        print(
+            f"\nPopulação assíncrona do MongoDB concluída em "
+            f"{time.time() - start_time:.2f} segundos."
+        )
+    finally:
+        await client.close()
+
+
+async def run_mongodb_queries_async(
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    variante_q4="pipeline",
+):
+    backend = MongoAsyncBackend(variante_q4)
+    if not await backend.connect():
+        print("Não foi possível conectar ao MongoDB. Encerrando consultas.")
+        return []
+    try:
+        resumos = await run_benchmark_async(backend, consultas, aquecimento, iteracoes)
+        print_report(resumos)
+        return resumos
+    finally:
+        await backend.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Executa Q1–Q6 (ou a população, com --popular) no MongoDB via PyMongo assíncrono."
+    )
+    parser.add_argument(
+        "--popular",
+        action="store_true",
+        help="Popula as coleções com insert_many assíncronos em vez de executar as consultas.",
+    )
+    parser.add_argument(
+        "--concorrencia",
+        type=int,
+        default=CONCORRENCIA_PADRAO,
+        help="Lotes de insert_many em voo durante a população.",
+    )
+    parser.add_argument("--q4", choices=queries.VARIANTES_Q4, default="pipeline")
+    add_benchmark_arguments(parser)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    if args.popular:
+        asyncio.run(populate_mongodb_async(dataset_from_args(args), args.concorrencia))
+    else:
+        asyncio.run(
+            run_mongodb_queries_async(args.consultas, args.aquecimento, args.iteracoes, args.q4)
+        )
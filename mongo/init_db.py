@@ -1,5 +1,6 @@
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
+import argparse
 import time
 
 def create_indexes_mongodb(client):
@@ -17,6 +18,12 @@ def create_indexes_mongodb(client):
             "Índices 'categoria', 'preco' e composto em 'produtos' criados ou já existentes."
         )
 
+        db.produtos.create_index([("total_vendido", -1)])
+        db.vendas_produto.create_index([("total_vendido", -1)])
+        print(
+            "Índices 'total_vendido' em 'produtos' e 'vendas_produto' criados ou já existentes."
+        )
+
         db.pedidos.create_index([("id_cliente", 1)])
         db.pedidos.create_index([("id_cliente", 1), ("status", 1)])
         db.pedidos.create_index([("id_cliente", 1), ("data_pedido", 1)])
@@ -33,6 +40,30 @@ def create_indexes_mongodb(client):
         print(f"Erro inesperado ao criar índices no MongoDB: {e}")
 
 
+def drop_database_mongodb(client):
+    client.drop_database("techmarket_db")
+    print("Banco 'techmarket_db' do MongoDB removido.")
+
+
+def init_database(recriar=False, chaves=None):
+    """Cria os índices; com `recriar`, remove antes o banco e seus dados.
+
+    `chaves` existe só para manter a mesma assinatura dos outros bancos: sem
+    esquema, a estratégia de chaves só muda o tipo gravado em `_id`.
+    Retorna False se não for possível conectar.
+    """
+    client = connect_to_mongodb()
+    if not client:
+        return False
+    try:
+        if recriar:
+            drop_database_mongodb(client)
+        create_indexes_mongodb(client)
+    finally:
+        client.close()
+    return True
+
+
 def connect_to_mongodb():
     client = None
     try:
@@ -48,6 +79,14 @@ def connect_to_mongodb():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria os índices do MongoDB.")
+    parser.add_argument(
+        "--recriar",
+        action="store_true",
+        help="Remove o banco existente (e seus dados) antes de criar os índices.",
+    )
+    args = parser.parse_args()
+
     max_retries = 10
     retry_delay = 5
 
@@ -55,6 +94,8 @@ if __name__ == "__main__":
         print(f"Tentando conectar ao MongoDB... Tentativa {i + 1}/{max_retries}")
         client = connect_to_mongodb()
         if client:
+            if args.recriar:
+                drop_database_mongodb(client)
             create_indexes_mongodb(client)
             client.close()
             print("Conexão ao MongoDB fechada.")
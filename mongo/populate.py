@@ -1,32 +1,30 @@
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 from bson.codec_options import CodecOptions, UuidRepresentation
-from faker import Faker
-from datetime import datetime
-import random
-import uuid
+from bson.objectid import ObjectId
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
 import time
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-fake = Faker("pt_BR")
-NUM_CLIENTES = 20000
-NUM_PRODUTOS = 5000
-NUM_PEDIDOS = 30000
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from techmarket.dataset import generate_dataset
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args, load_snapshot
 
-CATEGORIAS = [
-    "Eletrônicos",
-    "Informática",
-    "Games",
-    "Celulares",
-    "Periféricos",
-    "Acessórios",
-    "Eletrodomésticos",
-    "Casa Inteligente",
-]
-TIPOS_PAGAMENTO = ["cartão", "pix", "boleto"]
-STATUS_PAGAMENTO = ["aprovado", "pendente", "recusado"]
-STATUS_PEDIDO = ["pendente", "processando", "entregue", "cancelado"]
+TAMANHO_LOTE_PADRAO = 1000
+MODOS_PARALELISMO = ("threads", "processos")
+# Intervalo, em segundos, entre as leituras de memória durante a carga.
+INTERVALO_MEMORIA = 0.05
 
 
 def connect_to_mongodb():
@@ -41,127 +39,310 @@ def connect_to_mongodb():
         return None
 
 
-def gerar_clientes(n):
-    clientes = []
-    ids = []
-    for _ in range(n):
-        _id = uuid.uuid4()
-        ids.append(_id)
-        clientes.append(
-            {
-                "_id": _id,
-                "nome": fake.name(),
-                "email": fake.unique.email(),
-                "telefone": fake.phone_number(),
-                "data_cadastro": fake.date_time_between(
-                    start_date="-2y", end_date="now"
-                ),
-                "cpf": fake.unique.cpf(),
+def chave_mongo(valor):
+    """Chaves sequenciais (inteiros) viram ObjectIds crescentes; UUIDs passam direto."""
+    if isinstance(valor, int):
+        return ObjectId(valor.to_bytes(12, "big"))
+    return valor
+
+
+def gerar_clientes(ds, inicio=0, fim=None):
+    for _, _, c in ds.lotes("clientes", inicio=inicio, fim=fim):
+        for _id, nome, email, telefone, data_cadastro, cpf in zip(
+            c["id"], c["nome"], c["email"], c["telefone"], c["data_cadastro"], c["cpf"]
+        ):
+            yield {
+                "_id": chave_mongo(_id),
+                "nome": nome,
+                "email": email,
+                "telefone": telefone,
+                "data_cadastro": data_cadastro,
+                "cpf": cpf,
             }
-        )
-    return clientes, ids
-
-
-def gerar_produtos(n):
-    produtos = []
-    ids = []
-    for _ in range(n):
-        _id = uuid.uuid4()
-        ids.append(_id)
-        produtos.append(
-            {
-                "_id": _id,
-                "nome": f"{fake.word().capitalize()} {fake.word()} {fake.word()}",
-                "categoria": random.choice(CATEGORIAS),
-                "preco": round(random.uniform(10.0, 5000.0), 2),
-                "estoque": random.randint(0, 1000),
+
+
+def gerar_produtos(ds, inicio=0, fim=None):
+    # total_vendido parte da soma dos itens do conjunto e é mantido com $inc
+    # pelos pedidos novos (MongoBackend.place_order).
+    totais = ds.vendas_por_produto()
+    for bloco, bloco_fim, p in ds.lotes("produtos", inicio=inicio, fim=fim):
+        for _id, nome, categoria, preco, estoque, total_vendido in zip(
+            p["id"],
+            p["nome"],
+            p["categoria"],
+            p["preco"],
+            p["estoque"],
+            totais[bloco:bloco_fim].tolist(),
+        ):
+            yield {
+                "_id": chave_mongo(_id),
+                "nome": nome,
+                "categoria": categoria,
+                "preco": preco,
+                "estoque": estoque,
+                "total_vendido": total_vendido,
             }
-        )
-    return produtos, ids
-
-
-def gerar_pedidos(n, client_ids, product_ids):
-    pedidos = []
-    for _ in range(n):
-        order_id = uuid.uuid4()
-        client_id = random.choice(client_ids)
-        data_pedido = fake.date_time_between(start_date="-1y", end_date="now")
-        status = random.choice(STATUS_PEDIDO)
-
-        num_items = random.randint(1, 5)
-        selected_ids = random.sample(product_ids, num_items)
-        itens = []
-        total = 0.0
-
-        for pid in selected_ids:
-            qtd = random.randint(1, 3)
-            preco = round(random.uniform(10.0, 1000.0), 2)
-            total += qtd * preco
-            itens.append(
+
+
+def gerar_pedidos(ds, inicio=0, fim=None):
+    itens_inicio = ds.itens_inicio
+    for bloco, bloco_fim, p in ds.lotes("pedidos", inicio=inicio, fim=fim):
+        base = int(itens_inicio[bloco])
+        it = ds.lote("itens", base, int(itens_inicio[bloco_fim]))
+        pg = ds.lote("pagamentos", bloco, bloco_fim)
+        for k in range(bloco_fim - bloco):
+            itens = [
                 {
-                    "id_produto": pid,
-                    "quantidade": qtd,
-                    "preco_unitario": preco,
+                    "id_produto": chave_mongo(it["id_produto"][j]),
+                    "quantidade": it["quantidade"][j],
+                    "preco_unitario": it["preco_unitario"][j],
                 }
-            )
+                for j in range(
+                    itens_inicio[bloco + k] - base, itens_inicio[bloco + k + 1] - base
+                )
+            ]
+
+            pagamento = {
+                "tipo": pg["tipo"][k],
+                "status": pg["status"][k],
+                "data_pagamento": pg["data_pagamento"][k],
+            }
 
-        pagamento = {
-            "tipo": random.choice(TIPOS_PAGAMENTO),
-            "status": random.choice(STATUS_PAGAMENTO),
-            "data_pagamento": fake.date_time_between(start_date="-6m", end_date="now"),
-        }
-
-        pedidos.append(
-            {
-                "_id": order_id,
-                "id_cliente": client_id,
-                "data_pedido": data_pedido,
-                "status": status,
+            yield {
+                "_id": chave_mongo(p["id"][k]),
+                "id_cliente": chave_mongo(p["id_cliente"][k]),
+                "data_pedido": p["data_pedido"][k],
+                "status": p["status"][k],
                 "itens": itens,
-                "valor_total": round(total, 2),
+                "valor_total": p["valor_total"][k],
                 "pagamento": pagamento,
             }
-        )
 
-    return pedidos
 
+COLECOES = {
+    "clientes": ("clientes", gerar_clientes),
+    "produtos": ("produtos", gerar_produtos),
+    "pedidos": ("pedidos", gerar_pedidos),
+}
 
-def populate_mongodb():
-    client = connect_to_mongodb()
-    if not client:
-        print("Conexão falhou. Encerrando.")
-        return
 
-    db = client.get_database(
+def get_database(client):
+    return client.get_database(
         "techmarket_db",
         codec_options=CodecOptions(uuid_representation=UuidRepresentation.STANDARD),
     )
-    start = time.time()
 
+
+def peak_memory_mb(children=False):
+    """Pico de memória residente do processo (ou dos filhos) desde o início, em MB."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss é reportado em KB no Linux e em bytes no macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def resident_memory_mb(pids):
+    """Memória residente somada dos processos `pids`, lida de /proc, em MB."""
+    paginas = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                paginas += int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            # O escritor pode ter terminado entre a listagem e a leitura.
+            continue
+    return paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def measure_peak_memory(funcao, *args, intervalo=INTERVALO_MEMORIA):
+    """Executa `funcao(*args)` e retorna `(resultado, pico_mb)`.
+
+    Uma thread lê, a cada `intervalo` segundos, a memória residente do
+    processo somada à dos processos escritores, e `pico_mb` é a maior
+    leitura feita durante essa chamada. Sem /proc (fora do Linux), `pico_mb`
+    é None.
+    """
+    if not os.path.exists("/proc/self/statm"):
+        return funcao(*args), None
+    pico = [0.0]
+    fim = threading.Event()
+
+    def amostrar():
+        while True:
+            pids = [os.getpid(), *(p.pid for p in multiprocessing.active_children())]
+            pico[0] = max(pico[0], resident_memory_mb(pids))
+            if fim.wait(intervalo):
+                break
+
+    amostrador = threading.Thread(target=amostrar, daemon=True)
+    amostrador.start()
+    try:
+        resultado = funcao(*args)
+    finally:
+        fim.set()
+        amostrador.join()
+    return resultado, pico[0]
+
+
+def insert_chunks(collection, documents, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """Insere os documentos em blocos de `tamanho_lote` com `ordered=False`."""
+    count = 0
+    for chunk in iter(lambda: list(islice(documents, tamanho_lote)), []):
+        collection.insert_many(chunk, ordered=False)
+        count += len(chunk)
+    return count
+
+
+def split_range(total, partes):
+    """Divide `[0, total)` em até `partes` intervalos contíguos."""
+    passo = -(-total // partes)
+    return [(inicio, min(inicio + passo, total)) for inicio in range(0, total, passo)]
+
+
+def _writer_process(
+    seed, escala, distribuicao, referencia, chaves, nome, inicio, fim, tamanho_lote
+):
+    # Cada processo abre o próprio cliente (MongoClient não sobrevive a fork) e
+    # mapeia o mesmo snapshot, gerando os documentos do seu intervalo.
+    ds = load_snapshot(
+        seed,
+        escala,
+        distribuicao=distribuicao[0],
+        expoente=distribuicao[1],
+        referencia=referencia,
+    )
+    if ds is None:
+        ds = generate_dataset(
+            seed=seed,
+            escala=escala,
+            referencia=referencia,
+            distribuicao=distribuicao[0],
+            expoente=distribuicao[1],
+        )
+    ds.chaves = chaves
+    client = connect_to_mongodb()
+    if not client:
+        raise ConnectionFailure("Processo escritor não conseguiu conectar ao MongoDB.")
     try:
+        _, gerar = COLECOES[nome]
+        return insert_chunks(
+            get_database(client)[nome], gerar(ds, inicio, fim), tamanho_lote
+        )
+    finally:
+        client.close()
+
 
-        print(f"Gerando {NUM_CLIENTES} clientes...")
-        clientes, client_ids = gerar_clientes(NUM_CLIENTES)
-        db.clientes.insert_many(clientes)
-        print("Clientes inseridos.")
+def load_collection(db, ds, nome, tamanho_lote, escritores, paralelismo):
+    tabela, gerar = COLECOES[nome]
+    if escritores <= 1:
+        return insert_chunks(db[nome], gerar(ds), tamanho_lote)
+
+    intervalos = split_range(ds.tamanho(tabela), escritores)
+    if paralelismo == "processos":
+        executor = ProcessPoolExecutor(
+            max_workers=escritores, mp_context=multiprocessing.get_context("spawn")
+        )
+        futures = [
+            executor.submit(
+                _writer_process,
+                ds.seed,
+                ds.escala,
+                (ds.distribuicao, ds.expoente),
+                ds.referencia,
+                ds.chaves,
+                nome,
+                inicio,
+                fim,
+                tamanho_lote,
+            )
+            for inicio, fim in intervalos
+        ]
+    else:
+        executor = ThreadPoolExecutor(max_workers=escritores)
+        futures = [
+            executor.submit(insert_chunks, db[nome], gerar(ds, inicio, fim), tamanho_lote)
+            for inicio, fim in intervalos
+        ]
+    with executor:
+        return sum(future.result() for future in futures)
 
-        print(f"Gerando {NUM_PRODUTOS} produtos...")
-        produtos, product_ids = gerar_produtos(NUM_PRODUTOS)
-        db.produtos.insert_many(produtos)
-        print("Produtos inseridos.")
 
-        print(f"Gerando {NUM_PEDIDOS} pedidos com pagamentos aninhados...")
-        pedidos = gerar_pedidos(NUM_PEDIDOS, client_ids, product_ids)
-        db.pedidos.insert_many(pedidos)
-        print("Pedidos inseridos.")
+def populate_mongodb(
+    ds, tamanho_lote=TAMANHO_LOTE_PADRAO, escritores=1, paralelismo="threads"
+):
+    """Insere as coleções; retorna o total de documentos inseridos, ou None se a carga falhou."""
+    if paralelismo not in MODOS_PARALELISMO:
+        raise ValueError(
+            f"Paralelismo inválido: {paralelismo}. Use um de {MODOS_PARALELISMO}."
+        )
+
+    client = connect_to_mongodb()
+    if not client:
+        print("Conexão falhou. Encerrando.")
+        return None
+
+    db = get_database(client)
+    print(
+        f"Lotes de {tamanho_lote} documentos, {escritores} escritor(es)"
+        + (f" ({paralelismo})." if escritores > 1 else ".")
+    )
+    start = time.time()
+    total = 0
+
+    try:
+        for nome in COLECOES:
+            print(f"Inserindo {nome}...")
+            collection_start = time.time()
+            count, pico = measure_peak_memory(
+                load_collection, db, ds, nome, tamanho_lote, escritores, paralelismo
+            )
+            elapsed = time.time() - collection_start
+            total += count
+            if pico:
+                memoria = f", pico de memória do cliente {pico:.0f} MB"
+            else:
+                # Sem /proc, só o pico do processo inteiro, acumulado desde o início.
+                pico = peak_memory_mb(children=escritores > 1 and paralelismo == "processos")
+                memoria = f", pico acumulado de memória do processo {pico:.0f} MB" if pico else ""
+            print(
+                f"{count} documentos em {nome} em {elapsed:.2f} segundos "
+                f"({count / elapsed:.0f} docs/s{memoria})."
+            )
 
         elapsed = time.time() - start
         print(f"\nPopulação concluída em {elapsed:.2f} segundos.")
+        return total
     except Exception as e:
         print(f"Erro ao popular MongoDB: {e}")
+        return None
     finally:
         client.close()
 
 
 if __name__ == "__main__":
-    populate_mongodb()
+    parser = argparse.ArgumentParser(description="Popula o MongoDB da TechMarket.")
+    parser.add_argument(
+        "--lote",
+        type=int,
+        default=TAMANHO_LOTE_PADRAO,
+        help="Quantidade de documentos por insert_many.",
+    )
+    parser.add_argument(
+        "--escritores",
+        type=int,
+        default=1,
+        help="Número de escritores em paralelo por coleção.",
+    )
+    parser.add_argument(
+        "--paralelismo",
+        choices=MODOS_PARALELISMO,
+        default="threads",
+        help="Executa os escritores como threads ou como processos.",
+    )
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    ds = dataset_from_args(args)
+    populate_mongodb(ds, args.lote, args.escritores, args.paralelismo)
@@ -1,15 +1,226 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.errors import ConnectionFailure
-import time
-from datetime import datetime, timedelta
-import uuid
-from bson.codec_options import UuidRepresentation
-import random
+from bson.codec_options import CodecOptions, UuidRepresentation
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.datas import days_before
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    Backend,
+    access_from_args,
+    add_access_arguments,
+    add_benchmark_arguments,
+    add_plans_argument,
+    print_report,
+    run_benchmark,
+)
+from techmarket.planos import print_plans_report, save_plans, walk
 
 
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "techmarket_db"
-NUM_RUNS = 10
+
+# "pipeline" agrega pedidos.itens a cada execução; "incremental" ordena
+# produtos pelo total_vendido mantido com $inc; "rollup" lê a coleção
+# vendas_produto gravada com $merge (mongo/vendas_produto.py --rollup).
+VARIANTES_Q4 = ("pipeline", "incremental", "rollup")
+
+
+# Sorteio de um documento que fornece os parâmetros de cada consulta (a Q4
+# não tem parâmetros). Na Q6, sorteia um pedido, garantindo que o cliente
+# tenha pedidos no período.
+AMOSTRAS = {
+    "Q1": ("clientes", [{"$sample": {"size": 1}}, {"$project": {"email": 1}}]),
+    "Q2": ("produtos", [{"$sample": {"size": 1}}, {"$project": {"categoria": 1}}]),
+    "Q3": ("clientes", [{"$sample": {"size": 1}}, {"$project": {"_id": 1}}]),
+    "Q5": (
+        "pedidos",
+        [
+            {"$match": {"pagamento.tipo": "pix"}},
+            {"$sample": {"size": 1}},
+            {"$project": {"pagamento.data_pagamento": 1}},
+        ],
+    ),
+    "Q6": (
+        "pedidos",
+        [
+            {"$sample": {"size": 1}},
+            {"$project": {"id_cliente": 1, "data_pedido": 1}},
+        ],
+    ),
+}
+
+
+def params_from_sample(consulta, sample):
+    """Converte o documento sorteado por `AMOSTRAS[consulta]` nos parâmetros da consulta."""
+    if consulta == "Q4":
+        return ()
+    if not sample:
+        return None
+    if consulta == "Q1":
+        return (sample["email"],)
+    if consulta == "Q2":
+        return (sample["categoria"],)
+    if consulta == "Q3":
+        return (sample["_id"],)
+    if consulta == "Q5":
+        if "data_pagamento" not in sample.get("pagamento", {}):
+            return None
+        return days_before(sample["pagamento"]["data_pagamento"])
+    reference_date = sample["data_pedido"]
+    return (
+        sample["id_cliente"],
+        reference_date - timedelta(days=90),
+        reference_date,
+    )
+
+
+# Q1–Q6 como pipelines de agregação ou argumentos de `find`, compartilhados
+# pelo backend síncrono e pelo assíncrono (mongo/assincrono.py).
+
+
+def q1_pipeline(email):
+    return [
+        {"$match": {"email": email}},
+        {
+            "$lookup": {
+                "from": "pedidos",
+                "localField": "_id",
+                "foreignField": "id_cliente",
+                "as": "pedidos_do_cliente",
+            }
+        },
+        {"$unwind": "$pedidos_do_cliente"},
+        {"$sort": {"pedidos_do_cliente.data_pedido": -1}},
+        {"$limit": 3},
+        {
+            "$project": {
+                "nome_cliente": "$nome",
+                "email_cliente": "$email",
+                "pedido_id": "$pedidos_do_cliente._id",
+                "pedido_data": "$pedidos_do_cliente.data_pedido",
+                "pedido_status": "$pedidos_do_cliente.status",
+                "pedido_valor_total": "$pedidos_do_cliente.valor_total",
+            }
+        },
+    ]
+
+
+def q2_find(categoria):
+    return {
+        "filter": {"categoria": categoria},
+        "projection": {"nome": 1, "categoria": 1, "preco": 1, "estoque": 1, "_id": 0},
+        "sort": [("preco", 1)],
+    }
+
+
+def q3_find(id_cliente):
+    return {
+        "filter": {"id_cliente": id_cliente, "status": "entregue"},
+        "projection": {"data_pedido": 1, "status": 1, "valor_total": 1, "_id": 1},
+        "sort": [("data_pedido", -1)],
+    }
+
+
+def q4_pipeline():
+    return [
+        {"$unwind": "$itens"},
+        {
+            "$group": {
+                "_id": "$itens.id_produto",
+                "total_vendido": {"$sum": "$itens.quantidade"},
+            }
+        },
+        {"$sort": {"total_vendido": -1}},
+        {"$limit": 5},
+        {
+            "$lookup": {
+                "from": "produtos",
+                "localField": "_id",
+                "foreignField": "_id",
+                "as": "produto_info",
+            }
+        },
+        {"$unwind": "$produto_info"},
+        {
+            "$project": {
+                "nome_produto": "$produto_info.nome",
+                "categoria": "$produto_info.categoria",
+                "total_vendido": 1,
+                "_id": 0,
+            }
+        },
+    ]
+
+
+Q4_INCREMENTAL_FIND = {
+    "filter": {},
+    "projection": {"nome": 1, "categoria": 1, "total_vendido": 1, "_id": 0},
+    "sort": [("total_vendido", -1)],
+    "limit": 5,
+}
+
+Q4_ROLLUP_FIND = {
+    "filter": {},
+    "projection": {"nome_produto": 1, "categoria": 1, "total_vendido": 1, "_id": 0},
+    "sort": [("total_vendido", -1)],
+    "limit": 5,
+}
+
+
+def q5_find(inicio, fim):
+    return {
+        "filter": {
+            "pagamento.tipo": "pix",
+            "pagamento.data_pagamento": {"$gte": inicio, "$lte": fim},
+        },
+        "projection": {"pagamento": 1, "_id": 1, "id_cliente": 1},
+        "sort": [("pagamento.data_pagamento", -1)],
+    }
+
+
+def q6_pipeline(id_cliente, inicio, fim):
+    return [
+        {
+            "$match": {
+                "id_cliente": id_cliente,
+                "data_pedido": {"$gte": inicio, "$lte": fim},
+            }
+        },
+        {
+            "$group": {
+                "_id": "$id_cliente",
+                "total_gasto": {"$sum": "$valor_total"},
+            }
+        },
+    ]
+
+
+# Coleção e montagem do pipeline (lista) ou dos argumentos de `find` (dicionário).
+COMANDOS = {
+    "Q1": ("clientes", q1_pipeline),
+    "Q2": ("produtos", q2_find),
+    "Q3": ("pedidos", q3_find),
+    "Q4": ("pedidos", q4_pipeline),
+    "Q5": ("pedidos", q5_find),
+    "Q6": ("pedidos", q6_pipeline),
+}
+
+
+def find_command(colecao, argumentos):
+    """Comando `find` equivalente a `colecao.find(**argumentos)`."""
+    comando = {"find": colecao, **argumentos}
+    if "sort" in comando:
+        comando["sort"] = dict(comando["sort"])
+    return comando
 
 
 def connect_to_mongodb():
@@ -27,294 +238,238 @@ def connect_to_mongodb():
         return None
 
 
-def measure_execution_time(mongo_cursor_or_pipeline_result):
-    start_time = time.time()
-    results = list(mongo_cursor_or_pipeline_result)
-    end_time = time.time()
-    return (end_time - start_time) * 1000, results
+class MongoBackend(Backend):
+    nome = "mongo"
+
+    def __init__(self, variante_q4="pipeline", manter_total_vendido=True):
+        """`manter_total_vendido` liga o `$inc` em `place_order`, qualquer que
+        seja a variante da Q4, como o trigger de VendasProduto no PostgreSQL:
+        pedidos gravados com uma variante não deixam o contador da
+        "incremental" para trás. Só `vendas_produto.py` o desliga, para medir
+        o custo do `$inc`."""
+        if variante_q4 not in VARIANTES_Q4:
+            raise ValueError(f"Variante da Q4 inválida: {variante_q4}. Use uma de {VARIANTES_Q4}.")
+        self.variante_q4 = variante_q4
+        self.manter_total_vendido = manter_total_vendido
+        self.client = None
+        self.db = None
+
+    def connect(self):
+        self.client = connect_to_mongodb()
+        if not self.client:
+            return False
+        self.db = self.client.get_database(
+            DB_NAME,
+            codec_options=CodecOptions(uuid_representation=UuidRepresentation.STANDARD),
+        )
+        return True
 
+    def close(self):
+        if self.client:
+            self.client.close()
 
-def run_mongodb_queries():
-    client = connect_to_mongodb()
-    if not client:
-        print("Não foi possível conectar ao MongoDB. Encerrando consultas.")
-        return
+    def sample_params(self, consulta):
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta}")
+        if consulta not in AMOSTRAS:
+            return params_from_sample(consulta, None)
+        colecao, pipeline = AMOSTRAS[consulta]
+        return params_from_sample(consulta, next(self.db[colecao].aggregate(pipeline), None))
 
-    db = client[DB_NAME]
+    def q1(self, email):
+        return list(self.db.clientes.aggregate(q1_pipeline(email)))
 
-    try:
+    def q2(self, categoria):
+        return list(self.db.produtos.find(**q2_find(categoria)))
 
-        print(
-            "\n--- Executando Q1: Buscar cliente por email e listar seus últimos 3 pedidos ---"
-        )
+    def q3(self, id_cliente):
+        return list(self.db.pedidos.find(**q3_find(id_cliente)))
 
-        sample_client = db.clientes.aggregate(
-            [{"$sample": {"size": 1}}, {"$project": {"email": 1, "_id": 1}}]
-        ).next()
-        if sample_client:
-            client_email = sample_client["email"]
-            client_id = sample_client["_id"]
-            q1_times = []
-            for _ in range(NUM_RUNS):
-                pipeline = [
-                    {"$match": {"_id": client_id}},
-                    {
-                        "$lookup": {
-                            "from": "pedidos",
-                            "localField": "_id",
-                            "foreignField": "id_cliente",
-                            "as": "pedidos_do_cliente",
-                        }
-                    },
-                    {"$unwind": "$pedidos_do_cliente"},
-                    {"$sort": {"pedidos_do_cliente.data_pedido": -1}},
-                    {"$limit": 3},
-                    {
-                        "$project": {
-                            "nome_cliente": "$nome",
-                            "email_cliente": "$email",
-                            "pedido_id": "$pedidos_do_cliente._id",
-                            "pedido_data": "$pedidos_do_cliente.data_pedido",
-                            "pedido_status": "$pedidos_do_cliente.status",
-                            "pedido_valor_total": "$pedidos_do_cliente.valor_total",
-                        }
-                    },
-                ]
-
-                time_taken, results = measure_execution_time(
-                    db.clientes.aggregate(pipeline)
-                )
-                q1_times.append(time_taken)
-            avg_time = sum(q1_times) / NUM_RUNS
-            print(f"Média de tempo (Q1): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q1 - cliente {client_email}): {results[0] if results else 'Nenhum pedido encontrado.'}"
-            )
-        else:
-            print("Nenhum cliente encontrado para testar Q1.")
+    def q4(self):
+        if self.variante_q4 == "incremental":
+            return self.q4_incremental()
+        if self.variante_q4 == "rollup":
+            return self.q4_rollup()
+        return list(self.db.pedidos.aggregate(q4_pipeline()))
 
-        print(
-            "\n--- Executando Q2: Listar produtos de uma categoria ordenados por preço ---"
-        )
+    def q4_incremental(self):
+        return list(self.db.produtos.find(**Q4_INCREMENTAL_FIND))
 
-        sample_product = db.produtos.aggregate(
-            [{"$sample": {"size": 1}}, {"$project": {"categoria": 1}}]
-        ).next()
-        if sample_product:
-            product_category = sample_product["categoria"]
-            q2_times = []
-            for _ in range(NUM_RUNS):
-                query_filter = {"categoria": product_category}
-
-                cursor = db.produtos.find(
-                    query_filter,
-                    {"nome": 1, "categoria": 1, "preco": 1, "estoque": 1, "_id": 0},
-                ).sort("preco", 1)
-                time_taken, results = measure_execution_time(cursor)
-                q2_times.append(time_taken)
-            avg_time = sum(q2_times) / NUM_RUNS
-            print(f"Média de tempo (Q2): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q2 - categoria {product_category}): {results[0] if results else 'Nenhum produto encontrado.'}"
-            )
-        else:
-            print("Nenhuma categoria encontrada para testar Q2.")
+    def q4_rollup(self):
+        return list(self.db.vendas_produto.find(**Q4_ROLLUP_FIND))
 
-        print(
-            "\n--- Executando Q3: Listar pedidos de um cliente com status 'entregue' ---"
-        )
+    def q5(self, inicio, fim):
+        return list(self.db.pedidos.find(**q5_find(inicio, fim)))
 
-        sample_client_q3 = db.clientes.aggregate(
-            [{"$sample": {"size": 1}}, {"$project": {"_id": 1}}]
-        ).next()
-        if sample_client_q3:
-            client_id_q3 = sample_client_q3["_id"]
-            q3_times = []
-            for _ in range(NUM_RUNS):
-                query_filter = {"id_cliente": client_id_q3, "status": "entregue"}
-
-                cursor = db.pedidos.find(
-                    query_filter,
-                    {"data_pedido": 1, "status": 1, "valor_total": 1, "_id": 1},
-                ).sort("data_pedido", -1)
-                time_taken, results = measure_execution_time(cursor)
-                q3_times.append(time_taken)
-            avg_time = sum(q3_times) / NUM_RUNS
-            print(f"Média de tempo (Q3): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q3 - cliente {client_id_q3}): {results[0] if results else 'Nenhum pedido entregue encontrado.'}"
+    def q6(self, id_cliente, inicio, fim):
+        return list(self.db.pedidos.aggregate(q6_pipeline(id_cliente, inicio, fim)))
+
+    def sample_refs(self, n):
+        client_ids = [
+            doc["_id"]
+            for doc in self.db.clientes.aggregate(
+                [{"$sample": {"size": n}}, {"$project": {"_id": 1}}]
             )
-        else:
-            print("Nenhum cliente encontrado para testar Q3.")
-
-        print("\n--- Executando Q4: Obter os 5 produtos mais vendidos ---")
-        q4_times = []
-        for _ in range(NUM_RUNS):
-            pipeline = [
-                {"$unwind": "$itens"},
-                {
-                    "$group": {
-                        "_id": "$itens.id_produto",
-                        "total_vendido": {"$sum": "$itens.quantidade"},
-                    }
-                },
-                {"$sort": {"total_vendido": -1}},
-                {"$limit": 5},
-                {
-                    "$lookup": {
-                        "from": "produtos",
-                        "localField": "_id",
-                        "foreignField": "_id",
-                        "as": "produto_info",
-                    }
-                },
-                {"$unwind": "$produto_info"},
-                {
-                    "$project": {
-                        "nome_produto": "$produto_info.nome",
-                        "categoria": "$produto_info.categoria",
-                        "total_vendido": 1,
-                        "_id": 0,
-                    }
+        ]
+        produtos = [
+            (doc["_id"], doc["preco"])
+            for doc in self.db.produtos.aggregate(
+                [{"$sample": {"size": n}}, {"$project": {"preco": 1}}]
+            )
+        ]
+        return client_ids, produtos
+
+    def index_sizes(self):
+        tamanhos = {}
+        for colecao in ("clientes", "produtos", "pedidos"):
+            stats = next(
+                self.db[colecao].aggregate([{"$collStats": {"storageStats": {}}}]), None
+            )
+            if stats:
+                for indice, tamanho in stats["storageStats"]["indexSizes"].items():
+                    tamanhos[f"{colecao}.{indice}"] = tamanho
+        return tamanhos
+
+    def query_command(self, consulta, params):
+        """Comando `find` ou `aggregate` que a consulta envia ao servidor."""
+        if consulta == "Q4" and self.variante_q4 == "incremental":
+            return find_command("produtos", Q4_INCREMENTAL_FIND)
+        if consulta == "Q4" and self.variante_q4 == "rollup":
+            return find_command("vendas_produto", Q4_ROLLUP_FIND)
+        colecao, montar = COMANDOS[consulta]
+        argumentos = montar(*params)
+        if isinstance(argumentos, list):
+            return {"aggregate": colecao, "pipeline": argumentos, "cursor": {}}
+        return find_command(colecao, argumentos)
+
+    def explain(self, consulta, params):
+        """explain("executionStats") do comando da consulta."""
+        plano = self.db.command(
+            "explain",
+            self.query_command(consulta, params),
+            verbosity="executionStats",
+            codec_options=self.db.codec_options,
+        )
+        estatisticas = [no for no in walk(plano) if "totalDocsExamined" in no]
+        tempos = [
+            no.get("executionTimeMillis", no.get("executionTimeMillisEstimate", 0))
+            for no in walk(plano)
+            if "executionTimeMillis" in no or "executionTimeMillisEstimate" in no
+        ]
+        # Num pipeline, o último estágio informa quantos documentos saíram.
+        final = plano["stages"][-1] if "stages" in plano else plano["executionStats"]
+        return {
+            "servidor_ms": float(max(tempos, default=0)),
+            "examinados": sum(no["totalDocsExamined"] for no in estatisticas),
+            "chaves_examinadas": sum(no.get("totalKeysExamined", 0) for no in estatisticas),
+            "retornados": final.get("nReturned", 0),
+            "indices": sorted({no["indexName"] for no in walk(plano) if "indexName" in no}),
+            "plano": plano,
+        }
+
+    def reset_cache(self):
+        """planCacheClear nas coleções lidas por Q1–Q6.
+
+        O cache do WiredTiger continua quente; só reiniciar o servidor o esvazia.
+        """
+        existentes = set(self.db.list_collection_names())
+        for colecao in ("clientes", "produtos", "pedidos", "vendas_produto"):
+            if colecao in existentes:
+                self.db.command("planCacheClear", colecao)
+        return True
+
+    def place_order(self, pedido):
+        """Um único documento, com itens e pagamento embutidos, como em populate.py.
+
+        Com `manter_total_vendido`, também incrementa `produtos.total_vendido`
+        de cada item num segundo `bulk_write`. A inserção do pedido e o `$inc`
+        não formam uma transação: o contador pode ficar para trás se o
+        processo cair entre as duas escritas.
+        """
+        chave_mongo = load_module("mongo", "populate").chave_mongo
+        pagamento = pedido["pagamento"]
+        self.db.pedidos.insert_one(
+            {
+                "_id": chave_mongo(pedido["id_pedido"]),
+                "id_cliente": pedido["id_cliente"],
+                "data_pedido": pedido["data_pedido"],
+                "status": pedido["status"],
+                "itens": pedido["itens"],
+                "valor_total": pedido["valor_total"],
+                "pagamento": {
+                    "tipo": pagamento["tipo"],
+                    "status": pagamento["status"],
+                    "data_pagamento": pagamento["data_pagamento"],
                 },
-            ]
-            time_taken, results = measure_execution_time(db.pedidos.aggregate(pipeline))
-            q4_times.append(time_taken)
-        avg_time = sum(q4_times) / NUM_RUNS
-        print(f"Média de tempo (Q4): {avg_time:.2f} ms")
-        print(
-            f"Exemplo de resultado (Q4): {results[0] if results else 'Nenhum produto vendido encontrado.'}"
+            }
         )
+        if self.manter_total_vendido:
+            self.db.produtos.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": item["id_produto"]},
+                        {"$inc": {"total_vendido": item["quantidade"]}},
+                    )
+                    for item in pedido["itens"]
+                ],
+                ordered=False,
+            )
 
-        print(
-            "\n--- Executando Q5: Consultar pagamentos feitos via PIX no último mês ---"
-        )
 
-        sample_payment = db.pedidos.aggregate(
-            [
-                {"$match": {"pagamento.tipo": "pix"}},
-                {"$sample": {"size": 1}},
-                {"$project": {"pagamento.data_pagamento": 1}},
-            ]
-        ).next()
-        if (
-            sample_payment
-            and "pagamento" in sample_payment
-            and "data_pagamento" in sample_payment["pagamento"]
-        ):
-            reference_date = sample_payment["pagamento"]["data_pagamento"]
-
-            start_date_q5 = reference_date.replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
-            )
-            if reference_date.month == 12:
-                end_date_q5 = reference_date.replace(
-                    year=reference_date.year + 1,
-                    month=1,
-                    day=1,
-                    hour=0,
-                    minute=0,
-                    second=0,
-                    microsecond=0,
-                ) - timedelta(microseconds=1)
-            else:
-                end_date_q5 = reference_date.replace(
-                    month=reference_date.month + 1,
-                    day=1,
-                    hour=0,
-                    minute=0,
-                    second=0,
-                    microsecond=0,
-                ) - timedelta(microseconds=1)
-
-            q5_times = []
-            for _ in range(NUM_RUNS):
-                query_filter = {
-                    "pagamento.tipo": "pix",
-                    "pagamento.data_pagamento": {
-                        "$gte": start_date_q5,
-                        "$lte": end_date_q5,
-                    },
-                }
-
-                cursor = db.pedidos.find(
-                    query_filter, {"pagamento": 1, "_id": 1, "id_cliente": 1}
-                ).sort("pagamento.data_pagamento", -1)
-                time_taken, results = measure_execution_time(cursor)
-                q5_times.append(time_taken)
-            avg_time = sum(q5_times) / NUM_RUNS
-            print(f"Média de tempo (Q5): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q5 - PIX no período {start_date_q5.strftime('%Y-%m')}): {results[0] if results else 'Nenhum pagamento PIX encontrado neste período.'}"
-            )
-        else:
-            print("Nenhum pagamento PIX encontrado para testar Q5.")
+def create_backend(**opcoes):
+    return MongoBackend(**opcoes)
 
-        # --- Q6: Obter o valor total gasto por um cliente em pedidos em um período ---
-        # This section is now correctly dedented
-        print(
-            "\n--- Executando Q6: Obter o valor total gasto por um cliente em pedidos em um período ---"
-        )
 
-        # Q6: Obter o valor total gasto por um cliente em pedidos em um período
-        # Modificação: Selecionar um pedido aleatório para garantir que o cliente tem pedidos
-        sample_order_for_q6 = db.pedidos.aggregate(
-            [
-                {"$sample": {"size": 1}},
-                {"$project": {"id_cliente": 1, "data_pedido": 1}},
-            ]
-        ).next()
-
-        if sample_order_for_q6:
-            client_id_q6 = sample_order_for_q6["id_cliente"]
-            reference_date_q6 = sample_order_for_q6["data_pedido"]
-
-            # Define o período: 90 dias antes da data do pedido de referência até a data do pedido de referência
-            end_date_q6 = reference_date_q6
-            start_date_q6 = end_date_q6 - timedelta(days=90)
-
-            q6_times = []
-            for _ in range(NUM_RUNS):
-                pipeline = [
-                    {
-                        "$match": {
-                            "id_cliente": client_id_q6,
-                            "data_pedido": {
-                                "$gte": start_date_q6,
-                                "$lte": end_date_q6,
-                            },
-                        }
-                    },
-                    {
-                        "$group": {
-                            "_id": "$id_cliente",
-                            "total_gasto": {"$sum": "$valor_total"},
-                        }
-                    },
-                ]
-                time_taken, results = measure_execution_time(
-                    db.pedidos.aggregate(pipeline)
-                )
-                q6_times.append(time_taken)
-
-            avg_time = sum(q6_times) / NUM_RUNS
-            print(f"Média de tempo (Q6): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q6 - cliente {client_id_q6} no período {start_date_q6.strftime('%Y-%m-%d')} a {end_date_q6.strftime('%Y-%m-%d')}): {results[0] if results else 'Nenhum gasto encontrado para o cliente no período.'}"
-            )
-        else:
-            print(
-                "Nenhum pedido encontrado para testar Q6. Certifique-se de que há dados na coleção 'pedidos'."
-            )
+def run_mongodb_queries(
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    variante_q4="pipeline",
+    acesso=None,
+    arquivo_planos=None,
+):
+    backend = MongoBackend(variante_q4)
+    if not backend.connect():
+        print("Não foi possível conectar ao MongoDB. Encerrando consultas.")
+        return []
 
+    planos = [] if arquivo_planos else None
+    try:
+        resumos = run_benchmark(
+            backend, consultas, aquecimento, iteracoes, acesso=acesso, planos=planos
+        )
+        print_report(resumos)
+        if planos is not None:
+            print_plans_report(planos)
+            save_plans(planos, arquivo_planos)
+        return resumos
     except ConnectionFailure as e:
         print(f"Erro de conexão ao executar consultas no MongoDB: {e}")
     except Exception as e:
         print(f"Erro inesperado ao executar consultas no MongoDB: {e}")
     finally:
-        client.close()
+        backend.close()
         print("\nConexão ao MongoDB fechada.")
+    return []
 
 
 if __name__ == "__main__":
-    run_mongodb_queries()
+    parser = argparse.ArgumentParser(description="Executa Q1–Q6 no MongoDB.")
+    parser.add_argument(
+        "--q4",
+        choices=VARIANTES_Q4,
+        default="pipeline",
+        help="pipeline ($unwind/$group), incremental (produtos.total_vendido) ou rollup (vendas_produto).",
+    )
+    add_benchmark_arguments(parser)
+    add_access_arguments(parser)
+    add_plans_argument(parser)
+    args = parser.parse_args()
+    run_mongodb_queries(
+        args.consultas,
+        args.aquecimento,
+        args.iteracoes,
+        args.q4,
+        access_from_args(args),
+        args.planos,
+    )
@@ -0,0 +1,140 @@
+from pymongo import UpdateOne
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.harness import AQUECIMENTO_PADRAO, ITERACOES_PADRAO
+from techmarket.workload import PEDIDOS_PADRAO, compare_q4_strategies
+
+queries = load_module("mongo", "queries")
+
+
+def rollup_vendas_produto(db):
+    """Recalcula a coleção vendas_produto a partir de pedidos.itens com $merge."""
+    inicio = time.time()
+    db.pedidos.aggregate(
+        [
+            {"$unwind": "$itens"},
+            {
+                "$group": {
+                    "_id": "$itens.id_produto",
+                    "total_vendido": {"$sum": "$itens.quantidade"},
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "produtos",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "produto_info",
+                }
+            },
+            {"$unwind": "$produto_info"},
+            {
+                "$project": {
+                    "nome_produto": "$produto_info.nome",
+                    "categoria": "$produto_info.categoria",
+                    "total_vendido": 1,
+                }
+            },
+            {
+                "$merge": {
+                    "into": "vendas_produto",
+                    "on": "_id",
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+    )
+    print(f"Rollup de vendas_produto concluído em {time.time() - inicio:.2f} segundos.")
+
+
+def compare_q4(aquecimento=AQUECIMENTO_PADRAO, iteracoes=ITERACOES_PADRAO, pedidos=PEDIDOS_PADRAO):
+    """Compara as três variantes da Q4 e o custo do $inc por pedido."""
+    backend = queries.MongoBackend()
+    if not backend.connect():
+        print("Não foi possível conectar ao MongoDB. Encerrando.")
+        return None
+
+    def desativar():
+        backend.manter_total_vendido = False
+
+    def reativar(itens):
+        backend.manter_total_vendido = True
+        if not itens:
+            return
+        # Aplica fora da medição os incrementos que os pedidos sem $inc não fizeram.
+        backend.db.produtos.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": item["id_produto"]},
+                    {"$inc": {"total_vendido": item["quantidade"]}},
+                )
+                for item in itens
+            ],
+            ordered=False,
+        )
+
+    try:
+        rollup_vendas_produto(backend.db)
+        return compare_q4_strategies(
+            backend,
+            queries.VARIANTES_Q4,
+            aquecimento,
+            iteracoes,
+            pedidos,
+            desativar,
+            reativar,
+            "$inc",
+        )
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara as estratégias da Q4 no MongoDB, ou executa o rollup de vendas_produto."
+    )
+    parser.add_argument(
+        "--rollup",
+        action="store_true",
+        help="Apenas recalcula vendas_produto com $merge (use --intervalo para repetir).",
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=None,
+        help="Com --rollup, repete o rollup a cada N segundos até ser interrompido.",
+    )
+    parser.add_argument("--aquecimento", type=int, default=AQUECIMENTO_PADRAO)
+    parser.add_argument("--iteracoes", type=int, default=ITERACOES_PADRAO)
+    parser.add_argument(
+        "--pedidos",
+        type=int,
+        default=PEDIDOS_PADRAO,
+        help="Pedidos gravados com e sem $inc para medir o custo de escrita.",
+    )
+    args = parser.parse_args()
+
+    if not args.rollup:
+        compare_q4(args.aquecimento, args.iteracoes, args.pedidos)
+    else:
+        backend = queries.MongoBackend()
+        if not backend.connect():
+            print("Não foi possível conectar ao MongoDB. Encerrando.")
+            sys.exit(1)
+        try:
+            while True:
+                rollup_vendas_produto(backend.db)
+                if args.intervalo is None:
+                    break
+                time.sleep(args.intervalo)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            backend.close()
@@ -0,0 +1,202 @@
+"""Q1–Q6 e população do PostgreSQL com asyncpg.
+
+O backend compartilha um `asyncpg.Pool` entre todas as tarefas; cada consulta
+pega uma conexão, executa e a devolve. O asyncpg prepara e guarda em cache
+cada instrução por conexão, então o texto de `queries.SQL` é analisado uma
+única vez por conexão.
+"""
+
+import asyncpg
+import argparse
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.assincrono import (
+    CONCORRENCIA_PADRAO,
+    AsyncBackend,
+    drain,
+    run_benchmark_async,
+)
+from techmarket.backends import load_module
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    add_benchmark_arguments,
+    print_report,
+)
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+queries = load_module("postgres", "queries")
+conexoes = load_module("postgres", "conexoes")
+populate = load_module("postgres", "populate")
+
+MAX_CONEXOES = conexoes.MAX_CONEXOES
+
+# Tabelas carregadas juntas; cada grupo só começa depois que as tabelas que
+# ele referencia terminaram.
+GRUPOS_CARGA = (("Cliente", "Produto"), ("Pedido",), ("ItemPedido", "Pagamento"))
+
+SQL = {nome: queries.numbered_placeholders(sql) for nome, sql in queries.SQL.items()}
+
+
+async def create_pool(maximo=MAX_CONEXOES):
+    try:
+        return await asyncpg.create_pool(
+            min_size=maximo, max_size=maximo, **conexoes.PARAMETROS_CONEXAO
+        )
+    except (OSError, asyncpg.PostgresError) as e:
+        print(f"Erro ao conectar ao PostgreSQL: {e}")
+        return None
+
+
+class PostgresAsyncBackend(AsyncBackend):
+    nome = "postgres"
+
+    def __init__(self, variante_q4="join", conexoes=MAX_CONEXOES):
+        if variante_q4 not in queries.VARIANTES_Q4:
+            raise ValueError(
+                f"Variante da Q4 inválida: {variante_q4}. Use uma de {queries.VARIANTES_Q4}."
+            )
+        self.variante_q4 = variante_q4
+        self.conexoes = conexoes
+        self.pool = None
+
+    async def connect(self):
+        self.pool = await create_pool(self.conexoes)
+        return self.pool is not None
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+
+    async def sample_params(self, consulta):
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta}")
+        if consulta not in queries.AMOSTRAS:
+            return queries.params_from_row(consulta, None)
+        return queries.params_from_row(
+            consulta, await self.pool.fetchrow(queries.AMOSTRAS[consulta])
+        )
+
+    async def _fetch(self, nome, *params):
+        return await self.pool.fetch(SQL[nome], *params)
+
+    async def q1(self, email):
+        return await self._fetch("q1", email)
+
+    async def q2(self, categoria):
+        return await self._fetch("q2", categoria)
+
+    async def q3(self, id_cliente):
+        return await self._fetch("q3", id_cliente)
+
+    async def q4(self):
+        if self.variante_q4 == "resumo":
+            return await self._fetch("q4_resumo")
+        return await self._fetch("q4")
+
+    async def q5(self, inicio, fim):
+        return await self._fetch("q5", inicio, fim)
+
+    async def q6(self, id_cliente, inicio, fim):
+        return await self._fetch("q6", id_cliente, inicio, fim)
+
+
+def create_backend(**opcoes):
+    return PostgresAsyncBackend(**opcoes)
+
+
+def _registro(linha):
+    # O codec NUMERIC do asyncpg espera Decimal.
+    return tuple(Decimal(str(valor)) if isinstance(valor, float) else valor for valor in linha)
+
+
+async def populate_postgres_async(ds, concorrencia=CONCORRENCIA_PADRAO):
+    """Envia cada bloco do conjunto de dados num COPY binário, com até
+    `concorrencia` blocos em voo (um por conexão do pool)."""
+    pool = await create_pool(min(concorrencia, MAX_CONEXOES))
+    if pool is None:
+        print("Não foi possível conectar ao PostgreSQL. Encerrando população.")
+        return
+
+    async def copiar(bloco):
+        table, lote = bloco
+        columns, _ = populate.TABELAS[table]
+        async with pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                table.lower(),
+                records=[_registro(linha) for linha in zip(*(lote[c] for c in columns))],
+                columns=columns,
+            )
+
+    start_time = time.time()
+    try:
+        for grupo in GRUPOS_CARGA:
+            grupo_inicio = time.time()
+            blocos = (
+                (table, lote)
+                for table in grupo
+                for _, _, lote in ds.lotes(populate.TABELAS_DATASET[table])
+            )
+            await drain(blocos, copiar, concorrencia)
+            print(f"{', '.join(grupo)} inseridos em {time.time() - grupo_inicio:.2f} segundos.")
+        print(
+            f"\nPopulação assíncrona do PostgreSQL concluída em "
+            f"{time.time() - start_time:.2f} segundos."
+        )
+    except (OSError, asyncpg.PostgresError) as e:
+        print(f"Erro ao popular PostgreSQL: {e}")
+    finally:
+        await pool.close()
+
+
+async def run_postgres_queries_async(
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    variante_q4="join",
+):
+    backend = PostgresAsyncBackend(variante_q4)
+    if not await backend.connect():
+        print("Não foi possível conectar ao PostgreSQL. Encerrando consultas.")
+        return []
+    try:
+        resumos = await run_benchmark_async(backend, consultas, aquecimento, iteracoes)
+        print_report(resumos)
+        return resumos
+    finally:
+        await backend.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Executa Q1–Q6 (ou a população, com --popular) no PostgreSQL via asyncpg."
+    )
+    parser.add_argument(
+        "--popular",
+        action="store_true",
+        help="Popula as tabelas com COPY assíncronos em vez de executar as consultas.",
+    )
+    parser.add_argument(
+        "--concorrencia",
+        type=int,
+        default=CONCORRENCIA_PADRAO,
+        help="Blocos de COPY em voo durante a população.",
+    )
+    parser.add_argument("--q4", choices=queries.VARIANTES_Q4, default="join")
+    add_benchmark_arguments(parser)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    if args.popular:
+        asyncio.run(populate_postgres_async(dataset_from_args(args), args.concorrencia))
+    else:
+        asyncio.run(
+            run_postgres_queries_async(args.consultas, args.aquecimento, args.iteracoes, args.q4)
+        )
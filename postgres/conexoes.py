@@ -0,0 +1,136 @@
+"""Conexões ao PostgreSQL compartilhadas pelos scripts de esquema, carga e consultas.
+
+`connect_to_postgres` abre uma conexão avulsa. `ConnectionPool` abre
+`tamanho` conexões na criação e as mantém abertas para clientes
+concorrentes: o `ThreadedConnectionPool` é criado com `minconn == maxconn`,
+porque ele fecha as conexões devolvidas além de `minconn`, e cada consulta
+pagaria uma conexão e autenticação novas. Quem chega com todas em uso espera
+uma ser devolvida (em vez do `PoolError` do `ThreadedConnectionPool`), e
+cada espera é medida, do pedido até a conexão estar em mãos.
+"""
+
+import psycopg2
+from psycopg2 import OperationalError
+from psycopg2.pool import ThreadedConnectionPool
+from contextlib import contextmanager
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.harness import summarize
+
+DB_HOST = "localhost"
+DB_NAME = "postgres"
+DB_USER = "postgres"
+DB_PASSWORD = "mysecretpassword"
+DB_PORT = "5432"
+
+PARAMETROS_CONEXAO = {
+    "host": DB_HOST,
+    "database": DB_NAME,
+    "user": DB_USER,
+    "password": DB_PASSWORD,
+    "port": DB_PORT,
+}
+
+TAMANHO_PADRAO = 8
+# Teto dos pools usados com muitos clientes concorrentes: o PostgreSQL atende
+# uma consulta por conexão e o max_connections padrão do servidor é 100.
+MAX_CONEXOES = 64
+
+
+def connect_to_postgres(verbose=True):
+    """Conecta ao banco de dados PostgreSQL e retorna o objeto de conexão."""
+    try:
+        conn = psycopg2.connect(**PARAMETROS_CONEXAO)
+        if verbose:
+            print("Conexão ao PostgreSQL estabelecida.")
+        return conn
+    except OperationalError as e:
+        print(f"Erro ao conectar ao PostgreSQL: {e}")
+        return None
+
+
+class ConnectionPool:
+    def __init__(self, tamanho=TAMANHO_PADRAO):
+        self.tamanho = tamanho
+        self._pool = ThreadedConnectionPool(tamanho, tamanho, **PARAMETROS_CONEXAO)
+        self._vagas = threading.BoundedSemaphore(tamanho)
+        self._trava = threading.Lock()
+        self.esperas_ns = []
+
+    def acquire(self):
+        """Pega uma conexão, esperando se as `tamanho` estiverem em uso."""
+        inicio = time.perf_counter_ns()
+        self._vagas.acquire()
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._vagas.release()
+            raise
+        espera = time.perf_counter_ns() - inicio
+        with self._trava:
+            self.esperas_ns.append(espera)
+        return conn
+
+    def release(self, conn, descartar=False):
+        """Devolve a conexão; transações abertas são desfeitas pelo pool."""
+        self._pool.putconn(conn, close=descartar)
+        self._vagas.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def wait_summary(self):
+        """Resumo das esperas desde a criação (ou o último `reset_stats`)."""
+        with self._trava:
+            esperas = list(self.esperas_ns)
+        return summarize(esperas) if esperas else None
+
+    def reset_stats(self):
+        with self._trava:
+            self.esperas_ns = []
+
+    def close(self):
+        self._pool.closeall()
+
+
+def enable_gevent():
+    """Faz o psycopg2 ceder aos greenlets enquanto espera o servidor.
+
+    Sem este callback o libpq bloqueia o processo inteiro em cada consulta,
+    mesmo com `gevent.monkey.patch_all()`.
+    """
+    from psycopg2 import extensions
+    from gevent.socket import wait_read, wait_write
+
+    def esperar(conn, timeout=None):
+        while True:
+            estado = conn.poll()
+            if estado == extensions.POLL_OK:
+                return
+            if estado == extensions.POLL_READ:
+                wait_read(conn.fileno(), timeout=timeout)
+            elif estado == extensions.POLL_WRITE:
+                wait_write(conn.fileno(), timeout=timeout)
+            else:
+                raise psycopg2.OperationalError(f"Estado de poll inesperado: {estado}")
+
+    extensions.set_wait_callback(esperar)
+
+
+def create_pool(tamanho=TAMANHO_PADRAO):
+    """Cria o pool já com as `tamanho` conexões abertas; None se o banco não responder."""
+    try:
+        return ConnectionPool(tamanho)
+    except OperationalError as e:
+        print(f"Erro ao conectar ao PostgreSQL: {e}")
+        return None
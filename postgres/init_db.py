@@ -1,162 +1,452 @@
-import psycopg2
 from psycopg2 import OperationalError
+import argparse
+import os
+import sys
 import time
-import uuid
+from datetime import datetime, timedelta
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def create_tables_postgres(conn):
-    cursor = conn.cursor()
-    try:
+from techmarket.backends import load_module
+from techmarket.chaves import CHAVES_PADRAO, add_key_argument
+from techmarket.datas import month_range, next_month
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS Cliente (
-                id UUID PRIMARY KEY,
-                nome VARCHAR(255) NOT NULL,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                telefone VARCHAR(20),
-                data_cadastro TIMESTAMP NOT NULL,
-                cpf VARCHAR(14) UNIQUE NOT NULL
-            );
-        """
-        )
-        print("Tabela 'Cliente' criada ou já existente.")
+connect_to_postgres = load_module("postgres", "conexoes").connect_to_postgres
+
+TIPOS_CHAVE = {"uuid4": "UUID", "uuid7": "UUID", "sequencial": "BIGINT"}
+
+
+# Colunas de cada tabela, na ordem de criação (as referenciadas primeiro).
+# Chaves primárias, restrições UNIQUE, chaves estrangeiras e índices
+# secundários ficam separados para que a carga inicial possa criá-los depois
+# dos dados (`create_tables_postgres(adiar_indices=True)` e
+# `build_indexes_and_constraints`). Os nomes das restrições são os que o
+# PostgreSQL gera quando elas são declaradas junto com a tabela.
+TABELAS = {
+    "Cliente": """
+        id {tipo} NOT NULL,
+        nome VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        telefone VARCHAR(20),
+        data_cadastro TIMESTAMP NOT NULL,
+        cpf VARCHAR(14) NOT NULL
+    """,
+    "Produto": """
+        id {tipo} NOT NULL,
+        nome VARCHAR(255) NOT NULL,
+        categoria VARCHAR(100) NOT NULL,
+        preco DECIMAL(10, 2) NOT NULL,
+        estoque INT NOT NULL
+    """,
+    "Pedido": """
+        id {tipo} NOT NULL,
+        id_cliente {tipo} NOT NULL,
+        data_pedido TIMESTAMP NOT NULL,
+        status VARCHAR(50) NOT NULL,
+        valor_total DECIMAL(10, 2) NOT NULL
+    """,
+    "ItemPedido": """
+        id_pedido {tipo} NOT NULL,
+        id_produto {tipo} NOT NULL,
+        quantidade INT NOT NULL,
+        preco_unitario DECIMAL(10, 2) NOT NULL
+    """,
+    "Pagamento": """
+        id {tipo} NOT NULL,
+        id_pedido {tipo} NOT NULL,
+        tipo VARCHAR(50) NOT NULL,
+        status VARCHAR(50) NOT NULL,
+        data_pagamento TIMESTAMP NOT NULL
+    """,
+}
+
+CHAVES_UNICAS = (
+    ("Cliente", "cliente_pkey", "PRIMARY KEY (id)"),
+    ("Cliente", "cliente_email_key", "UNIQUE (email)"),
+    ("Cliente", "cliente_cpf_key", "UNIQUE (cpf)"),
+    ("Produto", "produto_pkey", "PRIMARY KEY (id)"),
+    ("Pedido", "pedido_pkey", "PRIMARY KEY (id)"),
+    ("ItemPedido", "itempedido_pkey", "PRIMARY KEY (id_pedido, id_produto)"),
+    ("Pagamento", "pagamento_pkey", "PRIMARY KEY (id)"),
+)
+
+CHAVES_ESTRANGEIRAS = (
+    ("Pedido", "pedido_id_cliente_fkey", "FOREIGN KEY (id_cliente) REFERENCES Cliente(id)"),
+    ("ItemPedido", "itempedido_id_pedido_fkey", "FOREIGN KEY (id_pedido) REFERENCES Pedido(id)"),
+    ("ItemPedido", "itempedido_id_produto_fkey", "FOREIGN KEY (id_produto) REFERENCES Produto(id)"),
+    ("Pagamento", "pagamento_id_pedido_fkey", "FOREIGN KEY (id_pedido) REFERENCES Pedido(id)"),
+)
+
+INDICES = (
+    ("idx_cliente_email", "Cliente", "email"),
+    ("idx_produto_categoria", "Produto", "categoria"),
+    ("idx_produto_preco", "Produto", "preco"),
+    ("idx_produto_categoria_preco", "Produto", "categoria, preco"),
+    ("idx_pedido_id_cliente", "Pedido", "id_cliente"),
+    ("idx_pedido_status", "Pedido", "status"),
+    ("idx_pedido_data_pedido", "Pedido", "data_pedido"),
+    ("idx_pagamento_tipo", "Pagamento", "tipo"),
+    ("idx_pagamento_data_pagamento", "Pagamento", "data_pagamento"),
+)
+
+# Esquema opcional (--pagamento-particionado): Pagamento particionada por mês
+# de data_pagamento. A chave primária precisa incluir a coluna de partição, e
+# o índice composto (tipo, data_pagamento) substitui os dois índices simples.
+# Pedido continua plana: particioná-la exigiria incluir data_pedido nas chaves
+# estrangeiras de ItemPedido e Pagamento.
+PARTICAO_PAGAMENTO = "PARTITION BY RANGE (data_pagamento)"
+PK_PAGAMENTO_PARTICIONADA = "PRIMARY KEY (id, data_pagamento)"
+INDICE_PAGAMENTO_PARTICIONADA = ("idx_pagamento_tipo_data", "Pagamento", "tipo, data_pagamento")
+MESES_PARTICOES = 24
 
+
+def _chaves_unicas(particionado):
+    if not particionado:
+        return CHAVES_UNICAS
+    return tuple(
+        (tabela, nome, PK_PAGAMENTO_PARTICIONADA if nome == "pagamento_pkey" else definicao)
+        for tabela, nome, definicao in CHAVES_UNICAS
+    )
+
+
+def _indices(particionado):
+    if not particionado:
+        return INDICES
+    return tuple(i for i in INDICES if i[1] != "Pagamento") + (INDICE_PAGAMENTO_PARTICIONADA,)
+
+
+def pagamento_particionado(cursor):
+    """True se a tabela Pagamento existente for particionada."""
+    cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('pagamento');")
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def create_month_partitions(cursor, tabela, inicio, fim):
+    """Cria uma partição por mês entre `inicio` e `fim`, mais a partição DEFAULT.
+
+    Meses já existentes são mantidos. Um mês novo não pode ser criado se a
+    partição DEFAULT já tiver linhas nele.
+    """
+    mes = month_range(inicio)[0]
+    while mes <= fim:
+        proximo = next_month(mes)
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_cliente_email ON Cliente (email);"
+            f"CREATE TABLE IF NOT EXISTS {tabela}_{mes:%Y_%m} PARTITION OF {tabela} "
+            "FOR VALUES FROM (%s) TO (%s);",
+            (mes, proximo),
         )
-        print("Índice 'idx_cliente_email' criado ou já existente.")
+        mes = proximo
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {tabela}_padrao PARTITION OF {tabela} DEFAULT;")
+
+
+def _add_constraint(cursor, tabela, nome, definicao, not_valid=False):
+    """ALTER TABLE ... ADD CONSTRAINT, ignorado se a restrição já existir."""
+    cursor.execute(
+        "SELECT 1 FROM pg_constraint WHERE conname = %s AND conrelid = %s::regclass;",
+        (nome, tabela.lower()),
+    )
+    if cursor.fetchone():
+        return
+    sufixo = " NOT VALID" if not_valid else ""
+    cursor.execute(f"ALTER TABLE {tabela} ADD CONSTRAINT {nome} {definicao}{sufixo};")
+
+
+def _create_indexes(cursor, particionado=False):
+    for nome, tabela, colunas in _indices(particionado):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({colunas});")
+
+
+def create_tables_postgres(
+    conn,
+    chaves=CHAVES_PADRAO,
+    adiar_indices=False,
+    unlogged=False,
+    particionar_pagamento=False,
+):
+    """Cria as tabelas com suas chaves, restrições e índices.
+
+    Com `adiar_indices`, cria apenas as colunas: chaves primárias, UNIQUE,
+    chaves estrangeiras e índices secundários ficam para
+    `build_indexes_and_constraints`, depois da carga. `unlogged` (só com
+    `adiar_indices`) cria as tabelas sem WAL. `particionar_pagamento` cria
+    Pagamento particionada por mês, com partições para os últimos
+    `MESES_PARTICOES` meses e os três seguintes.
+    """
+    if unlogged and not adiar_indices:
+        raise ValueError("Tabelas UNLOGGED só são usadas com a criação adiada dos índices.")
+    if unlogged and particionar_pagamento:
+        raise ValueError("Tabelas particionadas não podem ser UNLOGGED.")
+    tipo = TIPOS_CHAVE[chaves]
+    criar = "CREATE UNLOGGED TABLE" if unlogged else "CREATE TABLE"
+    cursor = conn.cursor()
+    try:
+        for tabela, colunas in TABELAS.items():
+            particao = (
+                f" {PARTICAO_PAGAMENTO}"
+                if particionar_pagamento and tabela == "Pagamento"
+                else ""
+            )
+            cursor.execute(
+                f"{criar} IF NOT EXISTS {tabela} ({colunas.format(tipo=tipo)}){particao};"
+            )
+            print(f"Tabela '{tabela}' criada ou já existente.")
+
+        if particionar_pagamento:
+            hoje = datetime.now()
+            create_month_partitions(
+                cursor,
+                "Pagamento",
+                hoje - timedelta(days=31 * MESES_PARTICOES),
+                hoje + timedelta(days=92),
+            )
+            print("Partições mensais de 'Pagamento' criadas ou já existentes.")
+
+        if adiar_indices:
+            conn.commit()
+            print("Tabelas do PostgreSQL criadas sem índices nem restrições.")
+            return
+
+        for tabela, nome, definicao in (
+            _chaves_unicas(particionar_pagamento) + CHAVES_ESTRANGEIRAS
+        ):
+            _add_constraint(cursor, tabela, nome, definicao)
+        print("Chaves primárias, únicas e estrangeiras criadas ou já existentes.")
+        _create_indexes(cursor, particionar_pagamento)
+        print("Índices secundários criados ou já existentes.")
+
+        conn.commit()
+        print("Todas as tabelas e índices do PostgreSQL criados com sucesso!")
+
+    except OperationalError as e:
+        print(f"Erro de operação ao criar tabelas no PostgreSQL: {e}")
+        conn.rollback()
+    except Exception as e:
+        print(f"Erro inesperado ao criar tabelas no PostgreSQL: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+
+
+def build_indexes_and_constraints(conn, unlogged=False):
+    """Segunda metade da carga adiada; retorna a duração de cada fase em segundos.
+
+    As tabelas UNLOGGED passam a LOGGED antes dos índices, porque SET LOGGED
+    reescreve a tabela e todos os seus índices. As chaves estrangeiras são
+    criadas NOT VALID e validadas em seguida: a validação faz uma única
+    varredura por restrição, em vez de uma verificação por linha inserida.
+    """
+    cursor = conn.cursor()
+    fases = {}
+
+    def registrar(nome, inicio):
+        conn.commit()
+        fases[nome] = time.perf_counter() - inicio
+        print(f"{nome}: {fases[nome]:.2f} segundos.")
+
+    try:
+        particionado = pagamento_particionado(cursor)
+        if unlogged:
+            inicio = time.perf_counter()
+            for tabela in TABELAS:
+                cursor.execute(f"ALTER TABLE {tabela} SET LOGGED;")
+            registrar("SET LOGGED", inicio)
+
+        inicio = time.perf_counter()
+        for tabela, nome, definicao in _chaves_unicas(particionado):
+            _add_constraint(cursor, tabela, nome, definicao)
+        registrar("Chaves primárias e únicas", inicio)
+
+        inicio = time.perf_counter()
+        _create_indexes(cursor, particionado)
+        registrar("Índices secundários", inicio)
+
+        inicio = time.perf_counter()
+        for tabela, nome, definicao in CHAVES_ESTRANGEIRAS:
+            _add_constraint(cursor, tabela, nome, definicao, not_valid=True)
+        for tabela, nome, _ in CHAVES_ESTRANGEIRAS:
+            cursor.execute(f"ALTER TABLE {tabela} VALIDATE CONSTRAINT {nome};")
+        registrar("Chaves estrangeiras (NOT VALID + VALIDATE)", inicio)
+
+        inicio = time.perf_counter()
+        cursor.execute("ANALYZE;")
+        registrar("ANALYZE", inicio)
+        return fases
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
 
+def create_vendas_produto(conn, chaves=CHAVES_PADRAO):
+    """Extensão opcional: total vendido por produto, mantido por triggers.
+
+    Triggers por comando, com tabelas de transição, somam as quantidades
+    inseridas (ou removidas) de ItemPedido em VendasProduto, inclusive em cargas
+    via COPY. O índice em `total_vendido DESC` permite que a variante "resumo"
+    da Q4 leia o top 5 direto do índice, sem agregar ItemPedido.
+    """
+    cursor = conn.cursor()
+    try:
         cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS Produto (
-                id UUID PRIMARY KEY,
-                nome VARCHAR(255) NOT NULL,
-                categoria VARCHAR(100) NOT NULL,
-                preco DECIMAL(10, 2) NOT NULL,
-                estoque INT NOT NULL
+            f"""
+            CREATE TABLE IF NOT EXISTS VendasProduto (
+                id_produto {TIPOS_CHAVE[chaves]} PRIMARY KEY REFERENCES Produto(id),
+                total_vendido BIGINT NOT NULL
             );
         """
         )
-        print("Tabela 'Produto' criada ou já existente.")
-
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_produto_categoria ON Produto (categoria);"
+            "CREATE INDEX IF NOT EXISTS idx_vendas_produto_total ON VendasProduto (total_vendido DESC);"
         )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_produto_preco ON Produto (preco);"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_produto_categoria_preco ON Produto (categoria, preco);"
-        )
-        print("Índices de 'Produto' criados ou já existentes.")
+        print("Tabela 'VendasProduto' criada ou já existente.")
 
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS Pedido (
-                id UUID PRIMARY KEY,
-                id_cliente UUID NOT NULL,
-                data_pedido TIMESTAMP NOT NULL,
-                status VARCHAR(50) NOT NULL,
-                valor_total DECIMAL(10, 2) NOT NULL,
-                FOREIGN KEY (id_cliente) REFERENCES Cliente(id)
-            );
+            CREATE OR REPLACE FUNCTION vendas_produto_inserir() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO VendasProduto (id_produto, total_vendido)
+                SELECT id_produto, SUM(quantidade) FROM novos GROUP BY id_produto
+                ON CONFLICT (id_produto) DO UPDATE
+                    SET total_vendido = VendasProduto.total_vendido + EXCLUDED.total_vendido;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
         """
         )
-        print("Tabela 'Pedido' criada ou já existente.")
-
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_pedido_id_cliente ON Pedido (id_cliente);"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_pedido_status ON Pedido (status);"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_pedido_data_pedido ON Pedido (data_pedido);"
-        )
-        print("Índices de 'Pedido' criados ou já existentes.")
-
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS ItemPedido (
-                id_pedido UUID NOT NULL,
-                id_produto UUID NOT NULL,
-                quantidade INT NOT NULL,
-                preco_unitario DECIMAL(10, 2) NOT NULL,
-                PRIMARY KEY (id_pedido, id_produto),
-                FOREIGN KEY (id_pedido) REFERENCES Pedido(id),
-                FOREIGN KEY (id_produto) REFERENCES Produto(id)
-            );
+            CREATE OR REPLACE FUNCTION vendas_produto_remover() RETURNS trigger AS $$
+            BEGIN
+                UPDATE VendasProduto v
+                SET total_vendido = v.total_vendido - r.quantidade
+                FROM (
+                    SELECT id_produto, SUM(quantidade) AS quantidade
+                    FROM removidos GROUP BY id_produto
+                ) r
+                WHERE v.id_produto = r.id_produto;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
         """
         )
-        print("Tabela 'ItemPedido' criada ou já existente.")
-
+        cursor.execute(
+            "DROP TRIGGER IF EXISTS trg_vendas_produto_inserir ON ItemPedido;"
+        )
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS Pagamento (
-                id UUID PRIMARY KEY,
-                id_pedido UUID NOT NULL,
-                tipo VARCHAR(50) NOT NULL,
-                status VARCHAR(50) NOT NULL,
-                data_pagamento TIMESTAMP NOT NULL,
-                FOREIGN KEY (id_pedido) REFERENCES Pedido(id)
-            );
+            CREATE TRIGGER trg_vendas_produto_inserir
+            AFTER INSERT ON ItemPedido
+            REFERENCING NEW TABLE AS novos
+            FOR EACH STATEMENT EXECUTE FUNCTION vendas_produto_inserir();
         """
         )
-        print("Tabela 'Pagamento' criada ou já existente.")
-
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_pagamento_tipo ON Pagamento (tipo);"
+            "DROP TRIGGER IF EXISTS trg_vendas_produto_remover ON ItemPedido;"
         )
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_pagamento_data_pagamento ON Pagamento (data_pagamento);"
+            """
+            CREATE TRIGGER trg_vendas_produto_remover
+            AFTER DELETE ON ItemPedido
+            REFERENCING OLD TABLE AS removidos
+            FOR EACH STATEMENT EXECUTE FUNCTION vendas_produto_remover();
+        """
         )
-        print("Índices de 'Pagamento' criados ou já existentes.")
+        print("Triggers de 'VendasProduto' em 'ItemPedido' criados.")
 
+        refresh_vendas_produto(cursor)
         conn.commit()
-        print("Todas as tabelas e índices do PostgreSQL criados com sucesso!")
+        print("Totais de 'VendasProduto' calculados a partir de 'ItemPedido'.")
 
     except OperationalError as e:
-        print(f"Erro de operação ao criar tabelas no PostgreSQL: {e}")
+        print(f"Erro de operação ao criar VendasProduto no PostgreSQL: {e}")
         conn.rollback()
     except Exception as e:
-        print(f"Erro inesperado ao criar tabelas no PostgreSQL: {e}")
+        print(f"Erro inesperado ao criar VendasProduto no PostgreSQL: {e}")
         conn.rollback()
     finally:
         cursor.close()
 
 
-def connect_to_postgres():
-    conn = None
+def refresh_vendas_produto(cursor):
+    """Recalcula VendasProduto inteira a partir de ItemPedido."""
+    cursor.execute("TRUNCATE VendasProduto;")
+    cursor.execute(
+        """
+        INSERT INTO VendasProduto (id_produto, total_vendido)
+        SELECT id_produto, SUM(quantidade) FROM ItemPedido GROUP BY id_produto;
+    """
+    )
+
+
+def drop_tables_postgres(conn):
+    cursor = conn.cursor()
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="postgres",
-            user="postgres",
-            password="mysecretpassword",
-            port="5432",
+        cursor.execute(
+            "DROP TABLE IF EXISTS VendasProduto, Pagamento, ItemPedido, Pedido, Produto, Cliente CASCADE;"
         )
-        print("Conexão ao PostgreSQL estabelecida com sucesso!")
-        return conn
-    except OperationalError as e:
-        print(f"Erro ao conectar ao PostgreSQL: {e}")
-        return None
+        conn.commit()
+        print("Tabelas do PostgreSQL removidas.")
+    finally:
+        cursor.close()
+
+
+def init_database(
+    recriar=False, vendas_produto=False, chaves=CHAVES_PADRAO, particionar_pagamento=False
+):
+    """Cria o esquema; com `recriar`, remove antes as tabelas e seus dados.
+
+    `vendas_produto` adiciona a tabela de resumo da Q4 (`create_vendas_produto`),
+    `chaves` define o tipo das chaves primárias (UUID ou BIGINT) e
+    `particionar_pagamento` particiona Pagamento por mês.
+    Retorna False se não for possível conectar.
+    """
+    conn = connect_to_postgres()
+    if not conn:
+        return False
+    try:
+        if recriar:
+            drop_tables_postgres(conn)
+        create_tables_postgres(conn, chaves, particionar_pagamento=particionar_pagamento)
+        if vendas_produto:
+            create_vendas_produto(conn, chaves)
+    finally:
+        conn.close()
+    return True
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria as tabelas do PostgreSQL.")
+    parser.add_argument(
+        "--recriar",
+        action="store_true",
+        help="Remove as tabelas existentes (e seus dados) antes de criá-las.",
+    )
+    parser.add_argument(
+        "--vendas-produto",
+        action="store_true",
+        help="Cria a tabela VendasProduto, mantida por triggers, usada pela Q4 'resumo'.",
+    )
+    parser.add_argument(
+        "--pagamento-particionado",
+        action="store_true",
+        help="Cria Pagamento particionada por mês de data_pagamento, com índice (tipo, data_pagamento).",
+    )
+    add_key_argument(parser)
+    args = parser.parse_args()
+
     max_retries = 10
     retry_delay = 5
 
     for i in range(max_retries):
         print(f"Tentando conectar ao PostgreSQL... Tentativa {i + 1}/{max_retries}")
-        conn = connect_to_postgres()
-        if conn:
-            create_tables_postgres(conn)
-            conn.close()
+        if init_database(
+            args.recriar, args.vendas_produto, args.chaves, args.pagamento_particionado
+        ):
             print("Conexão ao PostgreSQL fechada.")
             break
-        else:
-            time.sleep(retry_delay)
+        time.sleep(retry_delay)
     else:
         print(
             "Não foi possível conectar ao PostgreSQL após várias tentativas. Verifique se o Docker está rodando."
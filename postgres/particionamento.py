@@ -0,0 +1,208 @@
+"""Q5 em Pagamento plana e particionada por mês, com histórico crescente.
+
+Cada variante é uma tabela própria, sem chaves estrangeiras, com as colunas
+de Pagamento:
+
+- `plana`: índices simples em `tipo` e `data_pagamento`, como no esquema padrão;
+- `composta`: índice composto `(tipo, data_pagamento)`;
+- `particionada`: partições mensais de `data_pagamento` e o índice composto.
+
+O histórico cresce em blocos: o bloco 0 são os pagamentos do conjunto de
+dados; o bloco k repete esses pagamentos, com chaves novas, deslocados
+k × DIAS_PAGAMENTO dias para trás. Depois de cada bloco, o script mede o
+tempo de carga do bloco e a Q5 do mês mais recente, e conta as partições
+que o plano lê.
+"""
+
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.chaves import nova_chave
+from techmarket.dataset import DIAS_PAGAMENTO
+from techmarket.datas import month_range
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    ITERACOES_PADRAO,
+    summarize,
+    time_call,
+)
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+BLOCOS_PADRAO = 4
+
+queries = load_module("postgres", "queries")
+init_db = load_module("postgres", "init_db")
+populate = load_module("postgres", "populate")
+
+VARIANTES = {
+    "plana": ("", "PRIMARY KEY (id)", (("tipo",), ("data_pagamento",))),
+    "composta": ("", "PRIMARY KEY (id)", (("tipo", "data_pagamento"),)),
+    "particionada": (
+        init_db.PARTICAO_PAGAMENTO,
+        init_db.PK_PAGAMENTO_PARTICIONADA,
+        (("tipo", "data_pagamento"),),
+    ),
+}
+
+
+def _tabela(variante):
+    return f"Pagamento_{variante}"
+
+
+def create_variant(cursor, variante, chaves, inicio, fim):
+    """Recria a tabela da variante; a particionada recebe os meses de `inicio` a `fim`."""
+    particao, chave_primaria, indices = VARIANTES[variante]
+    tabela = _tabela(variante)
+    colunas = init_db.TABELAS["Pagamento"].format(tipo=init_db.TIPOS_CHAVE[chaves])
+    cursor.execute(f"DROP TABLE IF EXISTS {tabela} CASCADE;")
+    sufixo = f" {particao}" if particao else ""
+    cursor.execute(f"CREATE TABLE {tabela} ({colunas}, {chave_primaria}){sufixo};")
+    for colunas_indice in indices:
+        cursor.execute(f"CREATE INDEX ON {tabela} ({', '.join(colunas_indice)});")
+    if particao:
+        init_db.create_month_partitions(cursor, tabela, inicio, fim)
+
+
+def history_block(ds, bloco):
+    """Linhas de Pagamento do bloco `bloco`, deslocadas `bloco` períodos para trás."""
+    if bloco == 0:
+        yield from populate.linhas(ds, "Pagamento")
+        return
+    deslocamento = timedelta(days=DIAS_PAGAMENTO * bloco)
+    for _, id_pedido, tipo, status, data_pagamento in populate.linhas(ds, "Pagamento"):
+        yield nova_chave(ds.chaves), id_pedido, tipo, status, data_pagamento - deslocamento
+
+
+def _relations(plano):
+    """Tabelas (ou partições) lidas por um plano em JSON."""
+    nomes = set()
+    if "Relation Name" in plano:
+        nomes.add(plano["Relation Name"])
+    for filho in plano.get("Plans", []):
+        nomes |= _relations(filho)
+    return nomes
+
+
+def q5_sql(tabela):
+    return f"""
+        SELECT id, id_pedido, tipo, status, data_pagamento
+        FROM {tabela}
+        WHERE tipo = 'pix' AND data_pagamento BETWEEN %s AND %s
+        ORDER BY data_pagamento DESC;
+    """
+
+
+def measure_q5(cursor, tabela, params, aquecimento, iteracoes):
+    """Resumo das latências da Q5 e `(partições lidas, partições existentes)`."""
+    sql = q5_sql(tabela)
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    lidas = _relations(cursor.fetchone()[0][0]["Plan"])
+    cursor.execute(
+        "SELECT COUNT(*) FROM pg_inherits WHERE inhparent = %s::regclass;",
+        (tabela.lower(),),
+    )
+    existentes = cursor.fetchone()[0] or 1
+
+    def q5():
+        return queries.execute_query(cursor, sql, params)
+
+    for _ in range(aquecimento):
+        q5()
+    amostras = [time_call(q5)[0] for _ in range(iteracoes)]
+    return summarize(amostras), (len(lidas), existentes)
+
+
+def compare_partitioning(
+    ds, blocos=BLOCOS_PADRAO, aquecimento=AQUECIMENTO_PADRAO, iteracoes=ITERACOES_PADRAO
+):
+    """Carrega o histórico bloco a bloco em cada variante e mede a carga e a Q5."""
+    conn = queries.connect_to_postgres()
+    if not conn:
+        print("Não foi possível conectar ao PostgreSQL. Encerrando.")
+        return None
+
+    cursor = conn.cursor()
+    params = month_range(ds.referencia - timedelta(days=1))
+    inicio = ds.referencia - timedelta(days=DIAS_PAGAMENTO * blocos + 31)
+    resultados = []
+    try:
+        for variante in VARIANTES:
+            tabela = _tabela(variante)
+            create_variant(
+                cursor, variante, ds.chaves, inicio, ds.referencia + timedelta(days=31)
+            )
+            conn.commit()
+            linhas = 0
+            for bloco in range(blocos):
+                print(f"\n--- {tabela}: carregando o bloco {bloco + 1}/{blocos} ---")
+                carga, _ = time_call(
+                    populate.copy_rows,
+                    cursor,
+                    "Pagamento",
+                    history_block(ds, bloco),
+                    True,
+                    tabela,
+                )
+                conn.commit()
+                linhas += ds.num_pedidos
+                cursor.execute(f"ANALYZE {tabela};")
+                conn.commit()
+                resumo, particoes = measure_q5(cursor, tabela, params, aquecimento, iteracoes)
+                resultados.append(
+                    {
+                        "variante": variante,
+                        "meses": round(DIAS_PAGAMENTO * (bloco + 1) / 30.4),
+                        "linhas": linhas,
+                        "carga": carga / 1e9,
+                        "vazao_carga": ds.num_pedidos / (carga / 1e9),
+                        "q5": resumo,
+                        "particoes": particoes,
+                    }
+                )
+            cursor.execute(f"DROP TABLE {tabela} CASCADE;")
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    print_partitioning_report(resultados)
+    return resultados
+
+
+def print_partitioning_report(resultados):
+    cabecalho = (
+        f"{'Variante':<13} {'Meses':>5} {'Linhas':>10} {'Carga (s)':>10} {'linhas/s':>10} "
+        f"{'Q5 p50':>9} {'Q5 p95':>9} {'Partições':>11}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for r in resultados:
+        lidas, existentes = r["particoes"]
+        print(
+            f"{r['variante']:<13} {r['meses']:>5} {r['linhas']:>10} {r['carga']:>10.2f} "
+            f"{r['vazao_carga']:>10.0f} {r['q5']['p50']:>9.3f} {r['q5']['p95']:>9.3f} "
+            f"{f'{lidas}/{existentes}':>11}"
+        )
+    print("(latências em ms; carga e linhas/s referem-se ao bloco; partições lidas/existentes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara a Q5 em Pagamento plana e particionada por mês, com histórico crescente."
+    )
+    parser.add_argument(
+        "--blocos",
+        type=int,
+        default=BLOCOS_PADRAO,
+        help=f"Blocos de {DIAS_PAGAMENTO} dias de pagamentos carregados em sequência.",
+    )
+    parser.add_argument("--aquecimento", type=int, default=AQUECIMENTO_PADRAO)
+    parser.add_argument("--iteracoes", type=int, default=ITERACOES_PADRAO)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+    compare_partitioning(dataset_from_args(args), args.blocos, args.aquecimento, args.iteracoes)
@@ -0,0 +1,138 @@
+import argparse
+from functools import partial
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.harness import CONSULTAS
+from techmarket.loadgen import closed_loop, format_step
+
+TAMANHOS_PADRAO = (1, 2, 4, 8, 16, 32)
+CLIENTES_PADRAO = 32
+DURACAO_PADRAO = 5
+
+queries = load_module("postgres", "queries")
+conexoes = load_module("postgres", "conexoes")
+
+
+class _BackendPorConsulta:
+    """Cliente virtual que pega uma conexão do pool a cada consulta e a devolve em seguida."""
+
+    nome = "postgres"
+
+    def __init__(self, pool, parametros):
+        self.pool = pool
+        self.parametros = parametros
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    def sample_params(self, consulta):
+        return random.choice(self.parametros[consulta]) if self.parametros[consulta] else None
+
+    def run(self, consulta, params):
+        backend = queries.PostgresBackend(conexoes=self.pool)
+        backend.connect()
+        try:
+            return backend.run(consulta, params)
+        finally:
+            backend.close()
+
+
+def compare_pool_sizes(
+    consultas=tuple(CONSULTAS),
+    tamanhos=TAMANHOS_PADRAO,
+    clientes=CLIENTES_PADRAO,
+    duracao=DURACAO_PADRAO,
+):
+    """Executa `clientes` clientes em laço fechado sobre pools de cada tamanho.
+
+    Cada pool abre todas as suas conexões antes da medição, então a tabela
+    mede a disputa pelas conexões, não o custo de abri-las.
+    """
+    amostrador = queries.PostgresBackend(pool=queries.POOL_PADRAO)
+    if not amostrador.connect():
+        print("Não foi possível conectar ao PostgreSQL. Encerrando.")
+        return None
+    try:
+        parametros = amostrador.pool
+    finally:
+        amostrador.close()
+
+    resultados = []
+    for tamanho in tamanhos:
+        pool = conexoes.create_pool(tamanho)
+        if pool is None:
+            break
+        try:
+            for consulta in consultas:
+                print(f"\n=== {consulta}: {CONSULTAS[consulta]} (pool de {tamanho} conexões) ===")
+                pool.reset_stats()
+                resultado = closed_loop(
+                    partial(_BackendPorConsulta, pool, parametros), consulta, clientes, duracao
+                )
+                resultado.update(consulta=consulta, tamanho=tamanho, espera=pool.wait_summary())
+                print(format_step(resultado))
+                resultados.append(resultado)
+        finally:
+            pool.close()
+
+    print_pool_report(resultados)
+    return resultados
+
+
+def print_pool_report(resultados):
+    cabecalho = (
+        f"{'Consulta':<34} {'Pool':>5} {'ops/s':>9} {'p50':>9} {'p99':>9} "
+        f"{'espera p50':>11} {'espera p99':>11} {'erros':>6}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for r in sorted(resultados, key=lambda r: (r["consulta"], r["tamanho"])):
+        rotulo = f"{r['consulta']}: {CONSULTAS[r['consulta']]}"
+        if not r["n"]:
+            vazio = f"{'-':>9} {'-':>9} {'-':>9} {'-':>11} {'-':>11}"
+            print(f"{rotulo:<34} {r['tamanho']:>5} {vazio} {r['erros']:>6}")
+            continue
+        espera = r["espera"]
+        print(
+            f"{rotulo:<34} {r['tamanho']:>5} {r['vazao']:>9.1f} {r['p50']:>9.3f} {r['p99']:>9.3f} "
+            f"{espera['p50']:>11.3f} {espera['p99']:>11.3f} {r['erros']:>6}"
+        )
+    print("(latências em ms, incluindo a espera por uma conexão livre)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mede a vazão de Q1–Q6 no PostgreSQL com clientes concorrentes e pools de tamanhos diferentes."
+    )
+    parser.add_argument(
+        "--consultas", nargs="+", choices=list(CONSULTAS), default=list(CONSULTAS)
+    )
+    parser.add_argument(
+        "--tamanhos",
+        nargs="+",
+        type=int,
+        default=list(TAMANHOS_PADRAO),
+        help="Tamanhos de pool testados.",
+    )
+    parser.add_argument(
+        "--clientes",
+        type=int,
+        default=CLIENTES_PADRAO,
+        help="Clientes virtuais concorrentes em cada medição.",
+    )
+    parser.add_argument(
+        "--duracao",
+        type=float,
+        default=DURACAO_PADRAO,
+        help="Duração de cada medição, em segundos.",
+    )
+    args = parser.parse_args()
+    compare_pool_sizes(args.consultas, args.tamanhos, args.clientes, args.duracao)
@@ -1,173 +1,346 @@
-import psycopg2
 from psycopg2 import OperationalError
-from faker import Faker
-import random
+import argparse
+import os
+import struct
+import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
 
-fake = Faker("pt_BR")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-NUM_CLIENTES = 20000
-NUM_PRODUTOS = 5000
-NUM_PEDIDOS = 30000
-NUM_PAGAMENTOS = 30000
+from techmarket.backends import load_module
+from techmarket.snapshot import add_dataset_arguments, dataset_from_args
+
+MODOS_CARGA = ("insert", "copy-text", "copy-binary")
+COPY_BLOCK_ROWS = 1000
+
+PG_EPOCH = datetime(2000, 1, 1)
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_BINARY_TRAILER = struct.pack(">h", -1)
 
 
 def connect_to_postgres():
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="postgres",
-            user="postgres",
-            password="mysecretpassword",
-            port="5432",
+    return load_module("postgres", "conexoes").connect_to_postgres(verbose=False)
+
+
+def linhas(ds, table):
+    """Percorre a tabela do conjunto de dados em lotes, como tuplas na ordem de TABELAS."""
+    columns, _ = TABELAS[table]
+    for _, _, lote in ds.lotes(TABELAS_DATASET[table]):
+        yield from zip(*(lote[column] for column in columns))
+
+
+def pedidos_com_itens(ds):
+    """Produz `(pedido, itens)` para cada pedido, com os itens já como tuplas."""
+    order_columns, _ = TABELAS["Pedido"]
+    item_columns, _ = TABELAS["ItemPedido"]
+    itens_inicio = ds.itens_inicio
+    for inicio, fim, pedidos in ds.lotes("pedidos"):
+        base = int(itens_inicio[inicio])
+        itens = ds.lote("itens", base, int(itens_inicio[fim]))
+        item_rows = list(zip(*(itens[column] for column in item_columns)))
+        order_rows = zip(*(pedidos[column] for column in order_columns))
+        for i, pedido in enumerate(order_rows, start=inicio):
+            yield pedido, item_rows[itens_inicio[i] - base : itens_inicio[i + 1] - base]
+
+
+# --- Codificação para COPY (formato texto) ---
+
+
+def _copy_text_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_text_blocks(rows):
+    block = []
+    for row in rows:
+        block.append("\t".join(_copy_text_value(value) for value in row))
+        if len(block) >= COPY_BLOCK_ROWS:
+            yield ("\n".join(block) + "\n").encode("utf-8")
+            block = []
+    if block:
+        yield ("\n".join(block) + "\n").encode("utf-8")
+
+
+# --- Codificação para COPY (formato binário) ---
+
+
+def _bin_uuid(value):
+    return value.bytes
+
+
+def _bin_chave(value):
+    # Chaves sequenciais são inteiros (BIGINT); as demais, UUIDs.
+    if isinstance(value, int):
+        return struct.pack(">q", value)
+    return _bin_uuid(value)
+
+
+def _bin_text(value):
+    return value.encode("utf-8")
+
+
+def _bin_int4(value):
+    return struct.pack(">i", value)
+
+
+def _bin_timestamp(value):
+    delta = value - PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return struct.pack(">q", micros)
+
+
+def _bin_numeric(value, scale=2):
+    """Codifica um valor com `scale` casas decimais no formato binário NUMERIC."""
+    units = int(round(value * 10**scale))
+    sign = 0x4000 if units < 0 else 0x0000
+    integer, fraction = divmod(abs(units), 10**scale)
+
+    digits = []
+    while integer:
+        integer, rest = divmod(integer, 10000)
+        digits.insert(0, rest)
+    weight = len(digits) - 1
+    fraction_text = str(fraction).rjust(scale, "0")
+    fraction_text += "0" * (-len(fraction_text) % 4)
+    for i in range(0, len(fraction_text), 4):
+        digits.append(int(fraction_text[i : i + 4]))
+
+    while digits and digits[-1] == 0:
+        digits.pop()
+    while digits and digits[0] == 0:
+        digits.pop(0)
+        weight -= 1
+    if not digits:
+        weight = 0
+        sign = 0x0000
+
+    return struct.pack(
+        f">hhhh{len(digits)}h", len(digits), weight, sign, scale, *digits
+    )
+
+
+def _copy_binary_blocks(rows, encoders):
+    field_count = struct.pack(">h", len(encoders))
+    block = [COPY_BINARY_HEADER]
+    count = 0
+    for row in rows:
+        block.append(field_count)
+        for encode, value in zip(encoders, row):
+            if value is None:
+                block.append(struct.pack(">i", -1))
+            else:
+                data = encode(value)
+                block.append(struct.pack(">i", len(data)))
+                block.append(data)
+        count += 1
+        if count >= COPY_BLOCK_ROWS:
+            yield b"".join(block)
+            block = []
+            count = 0
+    block.append(COPY_BINARY_TRAILER)
+    yield b"".join(block)
+
+
+TABELAS = {
+    "Cliente": (
+        ("id", "nome", "email", "telefone", "data_cadastro", "cpf"),
+        (_bin_chave, _bin_text, _bin_text, _bin_text, _bin_timestamp, _bin_text),
+    ),
+    "Produto": (
+        ("id", "nome", "categoria", "preco", "estoque"),
+        (_bin_chave, _bin_text, _bin_text, _bin_numeric, _bin_int4),
+    ),
+    "Pedido": (
+        ("id", "id_cliente", "data_pedido", "status", "valor_total"),
+        (_bin_chave, _bin_chave, _bin_timestamp, _bin_text, _bin_numeric),
+    ),
+    "ItemPedido": (
+        ("id_pedido", "id_produto", "quantidade", "preco_unitario"),
+        (_bin_chave, _bin_chave, _bin_int4, _bin_numeric),
+    ),
+    "Pagamento": (
+        ("id", "id_pedido", "tipo", "status", "data_pagamento"),
+        (_bin_chave, _bin_chave, _bin_text, _bin_text, _bin_timestamp),
+    ),
+}
+
+TABELAS_DATASET = {
+    "Cliente": "clientes",
+    "Produto": "produtos",
+    "Pedido": "pedidos",
+    "ItemPedido": "itens",
+    "Pagamento": "pagamentos",
+}
+
+
+class _StreamingCopyFile:
+    """Adapta um iterador de blocos de bytes à interface de arquivo lida pelo COPY."""
+
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+        self._buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._blocks)
+            except StopIteration:
+                break
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+
+def copy_rows(cursor, table, rows, binary=False, destino=None):
+    """Envia as linhas de `table` ao servidor via COPY ... FROM STDIN.
+
+    `destino` grava em outra tabela com as mesmas colunas de `table`.
+    """
+    columns, encoders = TABELAS[table]
+    if binary:
+        blocks = _copy_binary_blocks(rows, encoders)
+        options = "(FORMAT binary)"
+    else:
+        blocks = _copy_text_blocks(rows)
+        options = "(FORMAT text)"
+    cursor.copy_expert(
+        f"COPY {destino or table} ({', '.join(columns)}) FROM STDIN WITH {options}",
+        _StreamingCopyFile(blocks),
+    )
+
+
+def insert_rows(cursor, table, rows):
+    columns, _ = TABELAS[table]
+    placeholders = ", ".join(["%s"] * len(columns))
+    query_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    for row in rows:
+        cursor.execute(
+            query_sql,
+            tuple(str(value) if isinstance(value, uuid.UUID) else value for value in row),
         )
-        return conn
-    except OperationalError as e:
-        print(f"Erro ao conectar ao PostgreSQL: {e}")
-        return None
 
 
-def populate_postgres():
+def populate_postgres(ds, modo="insert", adiar_indices=False, unlogged=False):
+    """Popula as tabelas; retorna a duração de cada fase em segundos, ou None se a carga falhou.
+
+    Com `adiar_indices`, recria as tabelas sem índices nem restrições (e sem
+    WAL, com `unlogged`), carrega os dados e só então cria chaves, índices e
+    valida as chaves estrangeiras, como numa importação inicial.
+    """
+    if modo not in MODOS_CARGA:
+        raise ValueError(f"Modo de carga inválido: {modo}. Use um de {MODOS_CARGA}.")
+    if unlogged and not adiar_indices:
+        raise ValueError("--unlogged requer --adiar-indices.")
+
     conn = connect_to_postgres()
     if not conn:
         print("Não foi possível conectar ao PostgreSQL. Encerrando população.")
-        return
+        return None
 
     cursor = conn.cursor()
-    start_time = time.time()
+    binary = modo == "copy-binary"
 
+    def load(table, rows):
+        if modo == "insert":
+            insert_rows(cursor, table, rows)
+        else:
+            copy_rows(cursor, table, rows, binary=binary)
+
+    print(f"Modo de carga: {modo}")
+    fases = {}
     try:
-        print(f"Populando {NUM_CLIENTES} clientes no PostgreSQL...")
-        client_ids = []
-        for _ in range(NUM_CLIENTES):
-            client_id = uuid.uuid4()
-            client_ids.append(client_id)
-            cursor.execute(
-                """
-                INSERT INTO Cliente (id, nome, email, telefone, data_cadastro, cpf)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-                (
-                    str(client_id),
-                    fake.name(),
-                    fake.unique.email(),
-                    fake.phone_number(),
-                    fake.date_time_between(start_date="-2y", end_date="now"),
-                    fake.unique.cpf(),
-                ),
+        if adiar_indices:
+            init_db = load_module("postgres", "init_db")
+            cursor.execute("SELECT to_regclass('vendasproduto') IS NOT NULL;")
+            vendas_produto = cursor.fetchone()[0]
+            particionado = init_db.pagamento_particionado(cursor)
+            # Verificado antes do DROP: create_tables_postgres recusaria a
+            # combinação só depois de as tabelas e os dados terem sumido.
+            if unlogged and particionado:
+                print(
+                    "Pagamento é particionada e tabelas particionadas não podem ser "
+                    "UNLOGGED; rode sem --unlogged. Nenhuma tabela foi alterada."
+                )
+                return None
+            print("Recriando as tabelas sem índices nem restrições...")
+            init_db.drop_tables_postgres(conn)
+            init_db.create_tables_postgres(
+                conn,
+                ds.chaves,
+                adiar_indices=True,
+                unlogged=unlogged,
+                particionar_pagamento=particionado,
             )
+
+        start_time = time.time()
+
+        print(f"Populando {ds.num_clientes} clientes no PostgreSQL...")
+        load("Cliente", linhas(ds, "Cliente"))
         conn.commit()
         print("Clientes inseridos.")
 
-        print(f"Populando {NUM_PRODUTOS} produtos no PostgreSQL...")
-        product_ids = []
-        categories = [
-            "Eletrônicos",
-            "Informática",
-            "Games",
-            "Celulares",
-            "Periféricos",
-            "Acessórios",
-            "Eletrodomésticos",
-            "Casa Inteligente",
-        ]
-        for _ in range(NUM_PRODUTOS):
-            product_id = uuid.uuid4()
-            product_ids.append(product_id)
-            cursor.execute(
-                """
-                INSERT INTO Produto (id, nome, categoria, preco, estoque)
-                VALUES (%s, %s, %s, %s, %s)
-            """,
-                (
-                    str(product_id),
-                    fake.word().capitalize() + " " + fake.word() + " " + fake.word(),
-                    random.choice(categories),
-                    round(random.uniform(10.0, 5000.0), 2),
-                    random.randint(0, 1000),
-                ),
-            )
+        print(f"Populando {ds.num_produtos} produtos no PostgreSQL...")
+        load("Produto", linhas(ds, "Produto"))
         conn.commit()
         print("Produtos inseridos.")
-        print(f"Populando {NUM_PEDIDOS} pedidos e seus itens no PostgreSQL...")
-        order_ids = []
-        for _ in range(NUM_PEDIDOS):
-            order_id = uuid.uuid4()
-            order_ids.append(order_id)
-            client_id = random.choice(client_ids)
-            order_date = fake.date_time_between(start_date="-1y", end_date="now")
-            status_options = ["pendente", "processando", "entregue", "cancelado"]
-            status = random.choice(status_options)
-
-            num_items = random.randint(1, 5)
-            items_for_order = []
-            valor_total = 0
-
-            selected_product_ids = random.sample(
-                product_ids, min(num_items, len(product_ids))
-            )
-            for prod_id in selected_product_ids:
-                quantity = random.randint(1, 3)
-                price_unit = round(random.uniform(10.0, 1000.0), 2)
-                items_for_order.append(
-                    (str(order_id), str(prod_id), quantity, price_unit)
-                )
-                valor_total += quantity * price_unit
-
-            cursor.execute(
-                """
-                INSERT INTO Pedido (id, id_cliente, data_pedido, status, valor_total)
-                VALUES (%s, %s, %s, %s, %s)
-            """,
-                (
-                    str(order_id),
-                    str(client_id),
-                    order_date,
-                    status,
-                    round(valor_total, 2),
-                ),
-            )
-            if items_for_order:
+
+        print(f"Populando {ds.num_pedidos} pedidos e seus itens no PostgreSQL...")
+        if modo == "insert":
+            for pedido, itens in pedidos_com_itens(ds):
+                insert_rows(cursor, "Pedido", [pedido])
                 cursor.executemany(
                     """
                     INSERT INTO ItemPedido (id_pedido, id_produto, quantidade, preco_unitario)
                     VALUES (%s, %s, %s, %s)
                 """,
-                    items_for_order,
+                    [
+                        (str(id_pedido), str(id_produto), quantidade, preco)
+                        for id_pedido, id_produto, quantidade, preco in itens
+                    ],
                 )
+        else:
+            copy_rows(cursor, "Pedido", linhas(ds, "Pedido"), binary=binary)
+            copy_rows(cursor, "ItemPedido", linhas(ds, "ItemPedido"), binary=binary)
         conn.commit()
         print("Pedidos e Itens de Pedido inseridos.")
-        print(f"Populando {NUM_PAGAMENTOS} pagamentos no PostgreSQL...")
-        payment_types = ["cartão", "pix", "boleto"]
-        payment_status = ["aprovado", "pendente", "recusado"]
-        for _ in range(NUM_PAGAMENTOS):
-            payment_id = uuid.uuid4()
-            order_id = random.choice(order_ids)
-            payment_date = fake.date_time_between(start_date="-6m", end_date="now")
-            cursor.execute(
-                """
-                INSERT INTO Pagamento (id, id_pedido, tipo, status, data_pagamento)
-                VALUES (%s, %s, %s, %s, %s)
-            """,
-                (
-                    str(payment_id),
-                    str(order_id),
-                    random.choice(payment_types),
-                    random.choice(payment_status),
-                    payment_date,
-                ),
-            )
+
+        print(f"Populando {ds.num_pedidos} pagamentos no PostgreSQL...")
+        load("Pagamento", linhas(ds, "Pagamento"))
         conn.commit()
         print("Pagamentos inseridos.")
 
         end_time = time.time()
+        fases["Carga dos dados"] = end_time - start_time
         print(
             f"\nPopulação do PostgreSQL concluída em {end_time - start_time:.2f} segundos."
         )
 
+        if adiar_indices:
+            fases.update(init_db.build_indexes_and_constraints(conn, unlogged))
+            if vendas_produto:
+                init_db.create_vendas_produto(conn, ds.chaves)
+            print("\nTempo por fase:")
+            for nome, duracao in fases.items():
+                print(f"  {nome:<44} {duracao:>8.2f} s")
+            print(f"  {'Total':<44} {sum(fases.values()):>8.2f} s")
+        return fases
+
     except OperationalError as e:
         print(f"Erro de operação ao popular PostgreSQL: {e}")
         conn.rollback()
@@ -180,4 +353,27 @@ def populate_postgres():
 
 
 if __name__ == "__main__":
-    populate_postgres()
+    parser = argparse.ArgumentParser(description="Popula o PostgreSQL da TechMarket.")
+    parser.add_argument(
+        "--modo",
+        choices=MODOS_CARGA,
+        default="insert",
+        help="insert (um INSERT por linha), copy-text ou copy-binary (COPY FROM STDIN).",
+    )
+    parser.add_argument(
+        "--adiar-indices",
+        action="store_true",
+        help="Recria as tabelas sem índices e restrições e os cria depois da carga.",
+    )
+    parser.add_argument(
+        "--unlogged",
+        action="store_true",
+        help="Com --adiar-indices, carrega em tabelas UNLOGGED e as torna LOGGED ao final.",
+    )
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    if args.unlogged and not args.adiar_indices:
+        parser.error("--unlogged requer --adiar-indices.")
+    ds = dataset_from_args(args)
+    populate_postgres(ds, args.modo, args.adiar_indices, args.unlogged)
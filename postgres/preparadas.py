@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    add_benchmark_arguments,
+    percentile,
+    summarize,
+    time_call,
+)
+
+queries = load_module("postgres", "queries")
+
+
+def compare_prepared(
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    pool=queries.POOL_PADRAO,
+):
+    """Compara consultas simples e preparadas com os mesmos parâmetros sorteados.
+
+    Para cada consulta, sorteia do pool os parâmetros de todas as execuções,
+    mede a latência das duas formas e, com EXPLAIN ANALYZE, separa o tempo de
+    planejamento do de execução no servidor.
+    """
+    simples = queries.PostgresBackend(pool=pool)
+    preparado = queries.PostgresBackend(preparar=True)
+    if not simples.connect() or not preparado.connect():
+        print("Não foi possível conectar ao PostgreSQL. Encerrando.")
+        simples.close()
+        preparado.close()
+        return None
+    preparado.pool = simples.pool
+
+    resultados = {}
+    try:
+        for consulta in consultas:
+            parametros = [simples.sample_params(consulta) for _ in range(aquecimento + iteracoes)]
+            if any(params is None for params in parametros):
+                print(f"Sem dados para testar {consulta}.")
+                continue
+            medidos = parametros[aquecimento:]
+
+            latencias = {}
+            for nome, backend in (("simples", simples), ("preparada", preparado)):
+                for params in parametros[:aquecimento]:
+                    backend.run(consulta, params)
+                latencias[nome] = summarize(
+                    [time_call(backend.run, consulta, params)[0] for params in medidos]
+                )
+
+            planejamento, execucao = zip(
+                *(simples.planning_times(consulta, params) for params in medidos)
+            )
+            resultados[consulta] = {
+                **latencias,
+                "planejamento": percentile(sorted(planejamento), 50),
+                "execucao": percentile(sorted(execucao), 50),
+            }
+    finally:
+        simples.close()
+        preparado.close()
+
+    print_prepared_report(resultados)
+    return resultados
+
+
+def print_prepared_report(resultados):
+    cabecalho = (
+        f"{'Consulta':<34} {'simples':>9} {'preparada':>10} {'planej.':>9} {'execução':>9}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for consulta, r in resultados.items():
+        rotulo = f"{consulta}: {CONSULTAS[consulta]}"
+        print(
+            f"{rotulo:<34} {r['simples']['p50']:>9.3f} {r['preparada']['p50']:>10.3f} "
+            f"{r['planejamento']:>9.3f} {r['execucao']:>9.3f}"
+        )
+    print(
+        "(p50 em ms; planejamento e execução medidos pelo servidor com EXPLAIN ANALYZE, "
+        "sem a ida e volta ao cliente)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara consultas simples e preparadas no PostgreSQL, com parâmetros variados."
+    )
+    parser.add_argument(
+        "--pool",
+        type=int,
+        default=queries.POOL_PADRAO,
+        help="Parâmetros carregados por consulta com TABLESAMPLE.",
+    )
+    add_benchmark_arguments(parser)
+    args = parser.parse_args()
+    compare_prepared(args.consultas, args.aquecimento, args.iteracoes, args.pool)
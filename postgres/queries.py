@@ -1,300 +1,506 @@
-import psycopg2
 from psycopg2 import OperationalError
-import time
-from datetime import datetime, timedelta
-import uuid
+import argparse
+import os
 import random
+import sys
+from datetime import timedelta
 
-DB_HOST = "localhost"
-DB_NAME = "postgres"
-DB_USER = "postgres"
-DB_PASSWORD = "mysecretpassword"
-DB_PORT = "5432"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-NUM_RUNS = 10
+from techmarket.backends import load_module
+from techmarket.datas import days_before
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    Backend,
+    access_from_args,
+    add_access_arguments,
+    add_benchmark_arguments,
+    add_plans_argument,
+    print_report,
+    run_benchmark,
+)
+from techmarket.planos import print_plans_report, save_plans, walk
 
-def connect_to_postgres():
-    """Conecta ao banco de dados PostgreSQL e retorna o objeto de conexão."""
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            port=DB_PORT,
-        )
-        print("Conexão ao PostgreSQL estabelecida.")
-        return conn
-    except OperationalError as e:
-        print(f"Erro ao conectar ao PostgreSQL: {e}")
+conexoes = load_module("postgres", "conexoes")
+connect_to_postgres = conexoes.connect_to_postgres
+
+# "join" agrega ItemPedido a cada execução; "resumo" lê a tabela VendasProduto
+# mantida por triggers (init_db.py --vendas-produto).
+VARIANTES_Q4 = ("join", "resumo")
+
+# Texto de Q1–Q6 (e da variante "resumo" da Q4), indexado pelo nome usado
+# no PREPARE quando o backend é criado com `preparar=True`.
+SQL = {
+    "q1": """
+        SELECT
+            c.nome, c.email, p.id, p.data_pedido, p.status, p.valor_total
+        FROM
+            Cliente c
+        JOIN
+            Pedido p ON c.id = p.id_cliente
+        WHERE
+            c.email = %s
+        ORDER BY
+            p.data_pedido DESC
+        LIMIT 3;
+    """,
+    "q2": """
+        SELECT
+            nome, categoria, preco, estoque
+        FROM
+            Produto
+        WHERE
+            categoria = %s
+        ORDER BY
+            preco ASC;
+    """,
+    "q3": """
+        SELECT
+            id, data_pedido, status, valor_total
+        FROM
+            Pedido
+        WHERE
+            id_cliente = %s AND status = 'entregue'
+        ORDER BY
+            data_pedido DESC;
+    """,
+    "q4": """
+        SELECT
+            p.nome, p.categoria, SUM(ip.quantidade) AS total_vendido
+        FROM
+            Produto p
+        JOIN
+            ItemPedido ip ON p.id = ip.id_produto
+        GROUP BY
+            p.id, p.nome, p.categoria
+        ORDER BY
+            total_vendido DESC
+        LIMIT 5;
+    """,
+    "q4_resumo": """
+        SELECT
+            p.nome, p.categoria, v.total_vendido
+        FROM
+            VendasProduto v
+        JOIN
+            Produto p ON p.id = v.id_produto
+        ORDER BY
+            v.total_vendido DESC
+        LIMIT 5;
+    """,
+    "q5": """
+        SELECT
+            id, id_pedido, tipo, status, data_pagamento
+        FROM
+            Pagamento
+        WHERE
+            tipo = 'pix' AND data_pagamento BETWEEN %s AND %s
+        ORDER BY
+            data_pagamento DESC;
+    """,
+    "q6": """
+        SELECT
+            SUM(valor_total) AS total_gasto
+        FROM
+            Pedido
+        WHERE
+            id_cliente = %s AND data_pedido BETWEEN %s AND %s;
+    """,
+}
+
+# Sorteio de uma linha que fornece os parâmetros de cada consulta (a Q4 não
+# tem parâmetros). Na Q6, sorteia um pedido, garantindo que o cliente tenha
+# pedidos no período.
+AMOSTRAS = {
+    "Q1": "SELECT email FROM Cliente OFFSET floor(random() * (SELECT COUNT(*) FROM Cliente)) LIMIT 1;",
+    "Q2": "SELECT categoria FROM Produto GROUP BY categoria OFFSET floor(random() * (SELECT COUNT(DISTINCT categoria) FROM Produto)) LIMIT 1;",
+    "Q3": "SELECT id FROM Cliente OFFSET floor(random() * (SELECT COUNT(*) FROM Cliente)) LIMIT 1;",
+    "Q5": "SELECT data_pagamento FROM Pagamento WHERE tipo = 'pix' OFFSET floor(random() * (SELECT COUNT(*) FROM Pagamento WHERE tipo = 'pix')) LIMIT 1;",
+    "Q6": "SELECT id_cliente, data_pedido FROM Pedido OFFSET floor(random() * (SELECT COUNT(*) FROM Pedido)) LIMIT 1;",
+}
+
+
+def params_from_row(consulta, row):
+    """Converte a linha sorteada por `AMOSTRAS[consulta]` nos parâmetros da consulta."""
+    if consulta == "Q4":
+        return ()
+    if not row:
         return None
+    if consulta == "Q5":
+        return days_before(row[0])
+    if consulta == "Q6":
+        client_id, reference_date = row
+        return client_id, reference_date - timedelta(days=90), reference_date
+    return (row[0],)
+
+
+# Tamanho padrão do pool de parâmetros carregado por `load_param_pool`.
+POOL_PADRAO = 1000
+
+
+def numbered_placeholders(sql):
+    """Troca os `%s` do psycopg2 pelos `$1`, `$2`, ... exigidos pelo PREPARE."""
+    partes = sql.split("%s")
+    return partes[0] + "".join(f"${i}{parte}" for i, parte in enumerate(partes[1:], start=1))
 
 
 def execute_query(cursor, query_sql, params=None):
-    """Executa uma consulta SQL e mede o tempo."""
-    start_time = time.time()
+    """Executa uma consulta SQL e retorna todas as linhas."""
     if params:
         cursor.execute(query_sql, params)
     else:
         cursor.execute(query_sql)
+    return cursor.fetchall()
 
-    results = cursor.fetchall()
-    end_time = time.time()
-    return (end_time - start_time) * 1000, results
 
+class PostgresBackend(Backend):
+    nome = "postgres"
 
-def run_postgres_queries():
-    conn = connect_to_postgres()
-    if not conn:
-        print("Não foi possível conectar ao PostgreSQL. Encerrando consultas.")
-        return
+    def __init__(self, variante_q4="join", preparar=False, pool=0, conexoes=None):
+        """`preparar` executa Q1–Q6 como instruções preparadas na conexão.
 
-    cursor = conn.cursor()
+        Com `pool` > 0, `connect` carrega até `pool` parâmetros válidos de cada
+        consulta e `sample_params` passa a sorteá-los em memória. Com
+        `conexoes` (um `ConnectionPool` de conexoes.py), `connect` pega uma
+        conexão do pool e `close` a devolve, em vez de abrir e fechar uma.
+        """
+        if variante_q4 not in VARIANTES_Q4:
+            raise ValueError(f"Variante da Q4 inválida: {variante_q4}. Use uma de {VARIANTES_Q4}.")
+        self.variante_q4 = variante_q4
+        self.preparar = preparar
+        self.tamanho_pool = pool
+        self.pool = None
+        self.conexoes = conexoes
+        self.conn = None
+        self.cursor = None
+        self._preparadas = set()
 
-    try:
+    def connect(self):
+        if self.conexoes is not None:
+            self.conn = self.conexoes.acquire()
+        else:
+            self.conn = connect_to_postgres()
+        if not self.conn:
+            return False
+        self.cursor = self.conn.cursor()
+        self._preparadas = set()
+        if self.tamanho_pool:
+            self.load_param_pool(self.tamanho_pool)
+        return True
 
-        print(
-            "\n--- Executando Q1: Buscar cliente por email e listar seus últimos 3 pedidos ---"
+    def _tablesample(self, tabela, n):
+        """Cláusula TABLESAMPLE que devolve cerca de 2×`n` linhas de `tabela`."""
+        self.cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass;", (tabela.lower(),)
         )
+        linhas = self.cursor.fetchone()[0]
+        # reltuples é -1 (ou 0) antes do primeiro ANALYZE: lê a tabela inteira.
+        percentual = 100 if linhas <= 0 else min(100, 200 * n / linhas)
+        return f"TABLESAMPLE BERNOULLI ({percentual})"
 
-        cursor.execute(
-            "SELECT email, id FROM Cliente OFFSET floor(random() * (SELECT COUNT(*) FROM Cliente)) LIMIT 1;"
-        )
-        sample_client = cursor.fetchone()
-        if sample_client:
-            client_email, client_id = sample_client
-            q1_times = []
-            for _ in range(NUM_RUNS):
-
-                query_sql = """
-                    SELECT
-                        c.nome, c.email, p.id, p.data_pedido, p.status, p.valor_total
-                    FROM
-                        Cliente c
-                    JOIN
-                        Pedido p ON c.id = p.id_cliente
-                    WHERE
-                        c.email = %s
-                    ORDER BY
-                        p.data_pedido DESC
-                    LIMIT 3;
-                """
-                time_taken, results = execute_query(cursor, query_sql, (client_email,))
-                q1_times.append(time_taken)
-            avg_time = sum(q1_times) / NUM_RUNS
-            print(f"Média de tempo (Q1): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q1 - cliente {client_email}): {results[0] if results else 'Nenhum pedido encontrado.'}"
-            )
-        else:
-            print("Nenhum cliente encontrado para testar Q1.")
+    def load_param_pool(self, n=POOL_PADRAO):
+        """Carrega até `n` parâmetros válidos por consulta com TABLESAMPLE."""
+        cursor = self.cursor
 
-        print(
-            "\n--- Executando Q2: Listar produtos de uma categoria ordenados por preço ---"
-        )
+        def amostra(sql, tabela):
+            cursor.execute(sql.format(amostra=self._tablesample(tabela, n)), (n,))
+            return cursor.fetchall()
 
-        cursor.execute(
-            "SELECT categoria FROM Produto GROUP BY categoria OFFSET floor(random() * (SELECT COUNT(DISTINCT categoria) FROM Produto)) LIMIT 1;"
-        )
-        sample_category = cursor.fetchone()
-        if sample_category:
-            product_category = sample_category[0]
-            q2_times = []
-            for _ in range(NUM_RUNS):
-                query_sql = """
-                    SELECT
-                        nome, categoria, preco, estoque
-                    FROM
-                        Produto
-                    WHERE
-                        categoria = %s
-                    ORDER BY
-                        preco ASC;
-                """
-                time_taken, results = execute_query(
-                    cursor, query_sql, (product_category,)
+        self.pool = {
+            "Q1": amostra("SELECT email FROM Cliente {amostra} LIMIT %s;", "Cliente"),
+            "Q3": amostra("SELECT id FROM Cliente {amostra} LIMIT %s;", "Cliente"),
+            "Q4": [()],
+            "Q5": [
+                days_before(data)
+                for (data,) in amostra(
+                    "SELECT data_pagamento FROM Pagamento {amostra} WHERE tipo = 'pix' LIMIT %s;",
+                    "Pagamento",
                 )
-                q2_times.append(time_taken)
-            avg_time = sum(q2_times) / NUM_RUNS
-            print(f"Média de tempo (Q2): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q2 - categoria {product_category}): {results[0] if results else 'Nenhum produto encontrado.'}"
-            )
-        else:
-            print("Nenhuma categoria encontrada para testar Q2.")
+            ],
+            "Q6": [
+                (id_cliente, data - timedelta(days=90), data)
+                for id_cliente, data in amostra(
+                    "SELECT id_cliente, data_pedido FROM Pedido {amostra} LIMIT %s;", "Pedido"
+                )
+            ],
+        }
+        cursor.execute("SELECT DISTINCT categoria FROM Produto;")
+        self.pool["Q2"] = cursor.fetchall()
+        self.conn.commit()
 
-        print(
-            "\n--- Executando Q3: Listar pedidos de um cliente com status 'entregue' ---"
-        )
+    def close(self):
+        if self.cursor:
+            self.cursor.close()
+        if not self.conn:
+            return
+        if self.conexoes is None:
+            self.conn.close()
+            return
+        if self._preparadas:
+            # As instruções preparadas pertencem à sessão, que volta ao pool.
+            self.conn.rollback()
+            with self.conn.cursor() as cursor:
+                cursor.execute("DEALLOCATE ALL;")
+            self.conn.commit()
+        self.conexoes.release(self.conn)
+
+    def sample_params(self, consulta):
+        if self.pool is not None:
+            if consulta not in self.pool:
+                raise ValueError(f"Consulta desconhecida: {consulta}")
+            return random.choice(self.pool[consulta]) if self.pool[consulta] else None
+
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta}")
+        if consulta not in AMOSTRAS:
+            return params_from_row(consulta, None)
+        self.cursor.execute(AMOSTRAS[consulta])
+        return params_from_row(consulta, self.cursor.fetchone())
+
+    def _sql_name(self, consulta):
+        if consulta == "Q4" and self.variante_q4 == "resumo":
+            return "q4_resumo"
+        return consulta.lower()
+
+    def _execute(self, nome, params=()):
+        """Executa `SQL[nome]`; com `preparar`, via PREPARE (uma vez) e EXECUTE."""
+        if not self.preparar:
+            return execute_query(self.cursor, SQL[nome], params)
+        if nome not in self._preparadas:
+            self.cursor.execute(f"PREPARE {nome} AS {numbered_placeholders(SQL[nome])}")
+            self._preparadas.add(nome)
+        argumentos = f"({', '.join(['%s'] * len(params))})" if params else ""
+        return execute_query(self.cursor, f"EXECUTE {nome}{argumentos};", params)
+
+    def q1(self, email):
+        return self._execute("q1", (email,))
+
+    def q2(self, categoria):
+        return self._execute("q2", (categoria,))
 
-        cursor.execute(
-            "SELECT id FROM Cliente OFFSET floor(random() * (SELECT COUNT(*) FROM Cliente)) LIMIT 1;"
+    def q3(self, id_cliente):
+        return self._execute("q3", (id_cliente,))
+
+    def q4(self):
+        if self.variante_q4 == "resumo":
+            return self.q4_resumo()
+        return self._execute("q4")
+
+    def q4_resumo(self):
+        return self._execute("q4_resumo")
+
+    def q5(self, inicio, fim):
+        return self._execute("q5", (inicio, fim))
+
+    def q6(self, id_cliente, inicio, fim):
+        return self._execute("q6", (id_cliente, inicio, fim))
+
+    def reset_cache(self):
+        """DISCARD ALL: descarta os planos em cache e as instruções preparadas da sessão.
+
+        Os buffers compartilhados e o cache de páginas do sistema operacional
+        continuam quentes; só reiniciar o servidor os esvazia.
+        """
+        self.conn.rollback()
+        self.conn.autocommit = True
+        try:
+            self.cursor.execute("DISCARD ALL;")
+        finally:
+            self.conn.autocommit = False
+        self._preparadas = set()
+        return True
+
+    def planning_times(self, consulta, params):
+        """`(planejamento, execução)` em ms medidos pelo servidor com EXPLAIN ANALYZE."""
+        self.cursor.execute(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {SQL[self._sql_name(consulta)]}", params or None
         )
-        sample_client_id_q3 = cursor.fetchone()
-        if sample_client_id_q3:
-            client_id_q3 = sample_client_id_q3[0]
-            q3_times = []
-            for _ in range(NUM_RUNS):
-                query_sql = """
-                    SELECT
-                        id, data_pedido, status, valor_total
-                    FROM
-                        Pedido
-                    WHERE
-                        id_cliente = %s AND status = 'entregue'
-                    ORDER BY
-                        data_pedido DESC;
-                """
-                time_taken, results = execute_query(cursor, query_sql, (client_id_q3,))
-                q3_times.append(time_taken)
-            avg_time = sum(q3_times) / NUM_RUNS
-            print(f"Média de tempo (Q3): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q3 - cliente {client_id_q3}): {results[0] if results else 'Nenhum pedido entregue encontrado.'}"
-            )
+        plano = self.cursor.fetchone()[0][0]
+        return plano["Planning Time"], plano["Execution Time"]
+
+    def explain(self, consulta, params):
+        """EXPLAIN (ANALYZE, BUFFERS); com `preparar`, da instrução preparada."""
+        nome = self._sql_name(consulta)
+        if nome in self._preparadas:
+            argumentos = f"({', '.join(['%s'] * len(params))})" if params else ""
+            alvo = f"EXECUTE {nome}{argumentos}"
         else:
-            print("Nenhum cliente encontrado para testar Q3.")
-
-        print("\n--- Executando Q4: Obter os 5 produtos mais vendidos ---")
-        q4_times = []
-        for _ in range(NUM_RUNS):
-            query_sql = """
-                SELECT
-                    p.nome, p.categoria, SUM(ip.quantidade) AS total_vendido
-                FROM
-                    Produto p
-                JOIN
-                    ItemPedido ip ON p.id = ip.id_produto
-                GROUP BY
-                    p.id, p.nome, p.categoria
-                ORDER BY
-                    total_vendido DESC
-                LIMIT 5;
-            """
-            time_taken, results = execute_query(cursor, query_sql)
-            q4_times.append(time_taken)
-        avg_time = sum(q4_times) / NUM_RUNS
-        print(f"Média de tempo (Q4): {avg_time:.2f} ms")
-        print(
-            f"Exemplo de resultado (Q4): {results[0] if results else 'Nenhum produto vendido encontrado.'}"
-        )
+            alvo = SQL[nome]
+        self.cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {alvo}", params or None)
+        plano = self.cursor.fetchone()[0][0]
+        raiz = plano["Plan"]
+
+        examinados = 0
+        indices = set()
+        for no in walk(raiz):
+            if "Index Name" in no:
+                indices.add(no["Index Name"])
+            # Varreduras de tabela: linhas devolvidas mais as descartadas pelo filtro.
+            if "Relation Name" in no:
+                lidas = (
+                    no.get("Actual Rows", 0)
+                    + no.get("Rows Removed by Filter", 0)
+                    + no.get("Rows Removed by Index Recheck", 0)
+                )
+                examinados += lidas * no.get("Actual Loops", 1)
+        return {
+            "servidor_ms": plano["Planning Time"] + plano["Execution Time"],
+            "examinados": examinados,
+            "retornados": raiz["Actual Rows"] * raiz["Actual Loops"],
+            "indices": sorted(indices),
+            "buffers": {
+                "em_cache": raiz.get("Shared Hit Blocks", 0),
+                "lidos": raiz.get("Shared Read Blocks", 0),
+            },
+            "plano": plano,
+        }
 
-        print(
-            "\n--- Executando Q5: Consultar pagamentos feitos via PIX no último mês ---"
+    def sample_refs(self, n):
+        self.cursor.execute("SELECT id FROM Cliente ORDER BY random() LIMIT %s;", (n,))
+        client_ids = [row[0] for row in self.cursor.fetchall()]
+        self.cursor.execute(
+            "SELECT id, preco FROM Produto ORDER BY random() LIMIT %s;", (n,)
         )
+        return client_ids, self.cursor.fetchall()
 
-        cursor.execute(
-            "SELECT data_pagamento FROM Pagamento WHERE tipo = 'pix' OFFSET floor(random() * (SELECT COUNT(*) FROM Pagamento WHERE tipo = 'pix')) LIMIT 1;"
+    def index_sizes(self):
+        self.cursor.execute(
+            "SELECT indexrelname, pg_relation_size(indexrelid) FROM pg_stat_user_indexes;"
         )
-        sample_payment_date = cursor.fetchone()
-        if sample_payment_date:
-            reference_date = sample_payment_date[0]
+        return dict(self.cursor.fetchall())
 
-            start_date_q5 = reference_date.replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
+    def place_order(self, pedido):
+        """Pedido, itens e pagamento numa única transação."""
+        cursor = self.cursor
+        id_pedido = str(pedido["id_pedido"])
+        pagamento = pedido["pagamento"]
+        try:
+            cursor.execute(
+                """
+                INSERT INTO Pedido (id, id_cliente, data_pedido, status, valor_total)
+                VALUES (%s, %s, %s, %s, %s);
+            """,
+                (
+                    id_pedido,
+                    str(pedido["id_cliente"]),
+                    pedido["data_pedido"],
+                    pedido["status"],
+                    pedido["valor_total"],
+                ),
             )
-            if reference_date.month == 12:
-                end_date_q5 = reference_date.replace(
-                    year=reference_date.year + 1,
-                    month=1,
-                    day=1,
-                    hour=0,
-                    minute=0,
-                    second=0,
-                    microsecond=0,
-                ) - timedelta(microseconds=1)
-            else:
-                end_date_q5 = reference_date.replace(
-                    month=reference_date.month + 1,
-                    day=1,
-                    hour=0,
-                    minute=0,
-                    second=0,
-                    microsecond=0,
-                ) - timedelta(microseconds=1)
-
-            q5_times = []
-            for _ in range(NUM_RUNS):
-                query_sql = """
-                    SELECT
-                        id, id_pedido, tipo, status, data_pagamento
-                    FROM
-                        Pagamento
-                    WHERE
-                        tipo = 'pix' AND data_pagamento BETWEEN %s AND %s
-                    ORDER BY
-                        data_pagamento DESC;
+            cursor.executemany(
                 """
-                time_taken, results = execute_query(
-                    cursor, query_sql, (start_date_q5, end_date_q5)
-                )
-                q5_times.append(time_taken)
-            avg_time = sum(q5_times) / NUM_RUNS
-            print(f"Média de tempo (Q5): {avg_time:.2f} ms")
-            print(
-                f"Exemplo de resultado (Q5 - PIX no período {start_date_q5.strftime('%Y-%m')}): {results[0] if results else 'Nenhum pagamento PIX encontrado neste período.'}"
+                INSERT INTO ItemPedido (id_pedido, id_produto, quantidade, preco_unitario)
+                VALUES (%s, %s, %s, %s);
+            """,
+                [
+                    (id_pedido, str(item["id_produto"]), item["quantidade"], item["preco_unitario"])
+                    for item in pedido["itens"]
+                ],
             )
-        else:
-            print("Nenhum pagamento PIX encontrado para testar Q5.")
+            cursor.execute(
+                """
+                INSERT INTO Pagamento (id, id_pedido, tipo, status, data_pagamento)
+                VALUES (%s, %s, %s, %s, %s);
+            """,
+                (
+                    str(pagamento["id_pagamento"]),
+                    id_pedido,
+                    pagamento["tipo"],
+                    pagamento["status"],
+                    pagamento["data_pagamento"],
+                ),
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
 
-        print(
-            "\n--- Executando Q6: Obter o valor total gasto por um cliente em pedidos em um período ---"
-        )
 
-        cursor.execute(
-            "SELECT id FROM Cliente OFFSET floor(random() * (SELECT COUNT(*) FROM Cliente)) LIMIT 1;"
-        )
-        sample_client_id_q6 = cursor.fetchone()
-        if sample_client_id_q6:
-            client_id_q6 = sample_client_id_q6[0]
+def create_backend(**opcoes):
+    return PostgresBackend(**opcoes)
 
-            cursor.execute(
-                "SELECT data_pedido FROM Pedido WHERE id_cliente = %s OFFSET floor(random() * (SELECT COUNT(*) FROM Pedido WHERE id_cliente = %s)) LIMIT 1;",
-                (client_id_q6, client_id_q6),
-            )
-            sample_order_date = cursor.fetchone()
-
-            if sample_order_date:
-                reference_date_q6 = sample_order_date[0]
-                end_date_q6 = reference_date_q6
-                start_date_q6 = end_date_q6 - timedelta(days=90)
-
-                q6_times = []
-                for _ in range(NUM_RUNS):
-                    query_sql = """
-                        SELECT
-                            SUM(valor_total) AS total_gasto
-                        FROM
-                            Pedido
-                        WHERE
-                            id_cliente = %s AND data_pedido BETWEEN %s AND %s;
-                    """
-                    time_taken, results = execute_query(
-                        cursor, query_sql, (client_id_q6, start_date_q6, end_date_q6)
-                    )
-                    q6_times.append(time_taken)
-                avg_time = sum(q6_times) / NUM_RUNS
-                print(f"Média de tempo (Q6): {avg_time:.2f} ms")
-                print(
-                    f"Exemplo de resultado (Q6 - cliente {client_id_q6} no período {start_date_q6.strftime('%Y-%m-%d')} a {end_date_q6.strftime('%Y-%m-%d')}): {results[0] if results else 'Nenhum gasto encontrado para o cliente no período.'}"
-                )
-            else:
-                print(
-                    f"Nenhum pedido encontrado para o cliente {client_id_q6} para definir o período em Q6."
-                )
-        else:
-            print("Nenhum cliente encontrado para testar Q6.")
 
+def run_postgres_queries(
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    variante_q4="join",
+    preparar=False,
+    pool=0,
+    variar_parametros=False,
+    acesso=None,
+    arquivo_planos=None,
+):
+    backend = PostgresBackend(variante_q4, preparar, pool)
+    if not backend.connect():
+        print("Não foi possível conectar ao PostgreSQL. Encerrando consultas.")
+        return []
+
+    planos = [] if arquivo_planos else None
+    try:
+        resumos = run_benchmark(
+            backend,
+            consultas,
+            aquecimento,
+            iteracoes,
+            variar_parametros=variar_parametros,
+            acesso=acesso,
+            planos=planos,
+        )
+        print_report(resumos)
+        if planos is not None:
+            print_plans_report(planos)
+            save_plans(planos, arquivo_planos)
+        return resumos
     except OperationalError as e:
         print(f"Erro de operação ao executar consultas no PostgreSQL: {e}")
     except Exception as e:
         print(f"Erro inesperado ao executar consultas no PostgreSQL: {e}")
     finally:
-        cursor.close()
-        conn.close()
+        backend.close()
         print("\nConexão ao PostgreSQL fechada.")
+    return []
 
 
 if __name__ == "__main__":
-    run_postgres_queries()
+    parser = argparse.ArgumentParser(description="Executa Q1–Q6 no PostgreSQL.")
+    parser.add_argument(
+        "--q4",
+        choices=VARIANTES_Q4,
+        default="join",
+        help="join (agrega ItemPedido) ou resumo (lê VendasProduto).",
+    )
+    parser.add_argument(
+        "--preparar",
+        action="store_true",
+        help="Executa as consultas como instruções preparadas (PREPARE/EXECUTE).",
+    )
+    parser.add_argument(
+        "--pool",
+        type=int,
+        default=0,
+        help=f"Carrega N parâmetros por consulta com TABLESAMPLE e os sorteia em memória (ex.: {POOL_PADRAO}).",
+    )
+    parser.add_argument(
+        "--variar-parametros",
+        action="store_true",
+        help="Sorteia parâmetros novos a cada execução, fora da medição.",
+    )
+    add_benchmark_arguments(parser)
+    add_access_arguments(parser)
+    add_plans_argument(parser)
+    args = parser.parse_args()
+    run_postgres_queries(
+        args.consultas,
+        args.aquecimento,
+        args.iteracoes,
+        args.q4,
+        args.preparar,
+        args.pool,
+        args.variar_parametros,
+        access_from_args(args),
+        args.planos,
+    )
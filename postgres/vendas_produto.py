@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from techmarket.backends import load_module
+from techmarket.harness import AQUECIMENTO_PADRAO, ITERACOES_PADRAO
+from techmarket.workload import PEDIDOS_PADRAO, compare_q4_strategies
+
+queries = load_module("postgres", "queries")
+init_db = load_module("postgres", "init_db")
+
+
+def set_triggers(backend, habilitados):
+    acao = "ENABLE" if habilitados else "DISABLE"
+    for trigger in ("trg_vendas_produto_inserir", "trg_vendas_produto_remover"):
+        backend.cursor.execute(f"ALTER TABLE ItemPedido {acao} TRIGGER {trigger};")
+    backend.conn.commit()
+
+
+def compare_q4(aquecimento=AQUECIMENTO_PADRAO, iteracoes=ITERACOES_PADRAO, pedidos=PEDIDOS_PADRAO):
+    """Compara a Q4 agregada com a lida de VendasProduto e mede o custo dos triggers."""
+    backend = queries.PostgresBackend()
+    if not backend.connect():
+        print("Não foi possível conectar ao PostgreSQL. Encerrando.")
+        return None
+
+    def reativar(itens):
+        set_triggers(backend, True)
+        # Os pedidos gravados sem trigger não entraram nos totais.
+        init_db.refresh_vendas_produto(backend.cursor)
+        backend.conn.commit()
+
+    try:
+        backend.cursor.execute("SELECT to_regclass('vendasproduto') IS NULL;")
+        if backend.cursor.fetchone()[0]:
+            print("Tabela VendasProduto inexistente. Execute 'python postgres/init_db.py --vendas-produto'.")
+            return None
+
+        return compare_q4_strategies(
+            backend,
+            queries.VARIANTES_Q4,
+            aquecimento,
+            iteracoes,
+            pedidos,
+            lambda: set_triggers(backend, False),
+            reativar,
+            "trigger",
+        )
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara a Q4 agregada com a tabela VendasProduto no PostgreSQL."
+    )
+    parser.add_argument("--aquecimento", type=int, default=AQUECIMENTO_PADRAO)
+    parser.add_argument("--iteracoes", type=int, default=ITERACOES_PADRAO)
+    parser.add_argument(
+        "--pedidos",
+        type=int,
+        default=PEDIDOS_PADRAO,
+        help="Pedidos gravados com e sem trigger para medir o custo de escrita.",
+    )
+    args = parser.parse_args()
+    compare_q4(args.aquecimento, args.iteracoes, args.pedidos)
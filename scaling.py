@@ -0,0 +1,133 @@
+import argparse
+import time
+
+from techmarket.backends import BACKENDS, create_backend, load_module
+from techmarket.dataset import DEFAULT_SEED
+from techmarket.harness import CONSULTAS, add_benchmark_arguments, run_benchmark
+from techmarket.snapshot import load_or_generate
+
+ESCALAS_PADRAO = (1, 10, 100)
+
+# Função de população de cada banco e o modo de carga usado na varredura: os
+# modos em lote, para que as escalas maiores terminem em tempo razoável.
+CARGA = {
+    "postgres": ("populate_postgres", {"modo": "copy-binary"}),
+    "mongo": ("populate_mongodb", {"escritores": 4}),
+    "cassandra": ("populate_cassandra", {"modo": "concorrente"}),
+}
+
+
+def run_scale(nome, ds, consultas, aquecimento, iteracoes):
+    """Recria o esquema, popula com `ds` e mede Q1–Q6 num banco; None se algo falhou."""
+    if not load_module(nome, "init_db").init_database(recriar=True, chaves=ds.chaves):
+        print(f"Não foi possível conectar ao banco '{nome}'. Pulando.")
+        return None
+
+    funcao, opcoes = CARGA[nome]
+    inicio = time.perf_counter()
+    carregado = getattr(load_module(nome, "populate"), funcao)(ds, **opcoes)
+    carga = time.perf_counter() - inicio
+    # As funções de população tratam os próprios erros e retornam None se a
+    # carga falhou; um banco parcialmente carregado não é medido.
+    if carregado is None:
+        print(f"A população de '{nome}' falhou. Pulando.")
+        return None
+
+    backend = create_backend(nome)
+    if not backend.connect():
+        print(f"Não foi possível conectar ao banco '{nome}'. Pulando.")
+        return None
+    try:
+        resumos = run_benchmark(backend, consultas, aquecimento, iteracoes, verbose=False)
+        indices = backend.index_sizes()
+    finally:
+        backend.close()
+    return {
+        "carga": carga,
+        "consultas": {r["consulta"]: r for r in resumos},
+        "indices": indices,
+    }
+
+
+def run_sweep(backends, escalas, seed, consultas, aquecimento, iteracoes, usar_snapshot=True):
+    """Carrega e consulta cada banco em cada escala; retorna `{(banco, escala): resultado}`."""
+    resultados = {}
+    for escala in escalas:
+        ds = load_or_generate(seed, escala, usar_snapshot)
+        for nome in backends:
+            print(f"\n=== {nome}, escala {escala:g} ===")
+            resultado = run_scale(nome, ds, consultas, aquecimento, iteracoes)
+            if resultado is not None:
+                resultados[(nome, escala)] = resultado
+    print_sweep_report(resultados, backends, escalas, consultas)
+    return resultados
+
+
+def _crescimento(valores):
+    medidos = [v for v in valores if v is not None]
+    if len(medidos) < 2 or not medidos[0]:
+        return "-"
+    return f"{medidos[-1] / medidos[0]:.1f}x"
+
+
+def print_sweep_report(resultados, backends, escalas, consultas):
+    """Tempo de carga e p50 de cada consulta por escala, com o crescimento total."""
+    colunas = "".join(f"{f'{escala:g}x':>12}" for escala in escalas)
+    cabecalho = f"{'Banco':<10} {'Medida':<42}{colunas} {'cresc.':>8}"
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for nome in backends:
+        medidos = [resultados.get((nome, escala)) for escala in escalas]
+        linhas = [("Carga (s)", [r and r["carga"] for r in medidos])]
+        for consulta in consultas:
+            linhas.append(
+                (
+                    f"{consulta}: {CONSULTAS[consulta]} p50 (ms)",
+                    [
+                        r["consultas"][consulta]["p50"]
+                        if r and consulta in r["consultas"]
+                        else None
+                        for r in medidos
+                    ],
+                )
+            )
+        for rotulo, valores in linhas:
+            celulas = "".join(
+                f"{'-':>12}" if v is None else f"{v:>12.3f}" for v in valores
+            )
+            print(f"{nome:<10} {rotulo:<42}{celulas} {_crescimento(valores):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Carrega e consulta cada banco em escalas crescentes do conjunto de dados."
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--escalas",
+        nargs="+",
+        type=float,
+        default=list(ESCALAS_PADRAO),
+        help="Fatores de escala a varrer.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED, help="Semente do gerador de dados."
+    )
+    parser.add_argument(
+        "--sem-snapshot",
+        action="store_true",
+        help="Regenera o conjunto de dados sem ler nem gravar snapshots em disco.",
+    )
+    add_benchmark_arguments(parser)
+    args = parser.parse_args()
+    run_sweep(
+        args.backends,
+        args.escalas,
+        args.seed,
+        args.consultas,
+        args.aquecimento,
+        args.iteracoes,
+        not args.sem_snapshot,
+    )
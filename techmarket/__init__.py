@@ -0,0 +1 @@
+"""Código compartilhado pelos scripts de PostgreSQL, MongoDB e Cassandra."""
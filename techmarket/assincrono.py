@@ -0,0 +1,183 @@
+"""Harness assíncrono (asyncio) das consultas Q1–Q6.
+
+`AsyncBackend` espelha `techmarket.harness.Backend` com corrotinas. Um único
+backend conectado é compartilhado por todas as tarefas: cada driver mantém
+seu próprio pool de conexões (ou multiplexa as requisições numa conexão),
+então centenas de consultas ficam em voo num único processo e thread.
+"""
+
+from abc import ABC, abstractmethod
+import asyncio
+import time
+
+from techmarket.harness import (
+    AQUECIMENTO_PADRAO,
+    Acesso,
+    CONSULTAS,
+    ITERACOES_PADRAO,
+    format_summary,
+    summarize,
+)
+
+CONCORRENCIA_PADRAO = 100
+
+
+class AsyncBackend(ABC):
+    nome = None
+
+    @abstractmethod
+    async def connect(self):
+        """Abre a conexão (ou o pool); retorna False se o banco não estiver disponível."""
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def sample_params(self, consulta):
+        pass
+
+    @abstractmethod
+    async def q1(self, email):
+        pass
+
+    @abstractmethod
+    async def q2(self, categoria):
+        pass
+
+    @abstractmethod
+    async def q3(self, id_cliente):
+        pass
+
+    @abstractmethod
+    async def q4(self):
+        pass
+
+    @abstractmethod
+    async def q5(self, inicio, fim):
+        pass
+
+    @abstractmethod
+    async def q6(self, id_cliente, inicio, fim):
+        pass
+
+    async def run(self, consulta, params):
+        return await getattr(self, consulta.lower())(*params)
+
+
+async def benchmark_query_async(
+    backend, consulta, aquecimento=AQUECIMENTO_PADRAO, iteracoes=ITERACOES_PADRAO
+):
+    """Equivalente a `harness.benchmark_query`, uma execução por vez."""
+    params = await backend.sample_params(consulta)
+    if params is None:
+        return None
+
+    for _ in range(aquecimento):
+        await backend.run(consulta, params)
+
+    amostras = []
+    resultados = None
+    for _ in range(iteracoes):
+        inicio = time.perf_counter_ns()
+        resultados = await backend.run(consulta, params)
+        amostras.append(time.perf_counter_ns() - inicio)
+
+    resumo = summarize(amostras)
+    resumo.update(
+        backend=backend.nome,
+        consulta=consulta,
+        params=params,
+        exemplo=resultados[0] if resultados else None,
+    )
+    return resumo
+
+
+async def run_benchmark_async(
+    backend, consultas=tuple(CONSULTAS), aquecimento=AQUECIMENTO_PADRAO, iteracoes=ITERACOES_PADRAO
+):
+    """Equivalente a `harness.run_benchmark` para um backend assíncrono já conectado."""
+    resumos = []
+    for consulta in consultas:
+        print(f"\n--- Executando {consulta}: {CONSULTAS[consulta]} ({backend.nome}, asyncio) ---")
+        try:
+            resumo = await benchmark_query_async(backend, consulta, aquecimento, iteracoes)
+        except Exception as e:
+            print(f"Erro ao executar {consulta} ({backend.nome}): {e}")
+            continue
+        if resumo is None:
+            print(f"Sem dados para testar {consulta}.")
+            continue
+        resumos.append(resumo)
+        print(format_summary(resumo))
+        print(f"Exemplo de resultado ({consulta}): {resumo['exemplo']}")
+    return resumos
+
+
+async def async_samplers(backend, consulta, clientes, acesso=None):
+    """Equivalente a `Acesso.samplers` sobre um backend assíncrono compartilhado.
+
+    Retorna um `proximos()` por cliente (None onde não há dados): no modo
+    `fixo`, cada cliente sorteia os próprios parâmetros; nos outros, todos
+    escolhem entre os mesmos `acesso.candidatos` sorteados.
+    """
+    acesso = acesso or Acesso()
+    if acesso.distribuicao == "fixo":
+        return [
+            acesso.chooser([await backend.sample_params(consulta)]) for _ in range(clientes)
+        ]
+    candidatos = [await backend.sample_params(consulta) for _ in range(acesso.candidatos)]
+    return [acesso.chooser(candidatos)] * clientes
+
+
+async def async_closed_loop(backend, consulta, clientes, duracao, acesso=None):
+    """`clientes` tarefas em laço fechado sobre o mesmo backend por `duracao` segundos.
+
+    Cada tarefa pede a `acesso` os parâmetros de cada execução e emite a
+    próxima consulta assim que a anterior termina, como
+    `techmarket.loadgen.closed_loop`, mas com corrotinas em vez de threads.
+    """
+    sorteios = await async_samplers(backend, consulta, clientes, acesso)
+    latencias = []
+    erros = [0]
+    fim = time.perf_counter() + duracao
+
+    async def cliente(proximos):
+        if proximos is None:
+            erros[0] += 1
+            return
+        while time.perf_counter() < fim:
+            params = proximos()
+            inicio = time.perf_counter_ns()
+            try:
+                await backend.run(consulta, params)
+            except Exception:
+                erros[0] += 1
+                continue
+            latencias.append(time.perf_counter_ns() - inicio)
+
+    inicio = time.perf_counter_ns()
+    await asyncio.gather(*(cliente(proximos) for proximos in sorteios))
+    decorrido = time.perf_counter_ns() - inicio
+
+    resultado = summarize(latencias, decorrido) if latencias else {"n": 0, "vazao": 0.0}
+    resultado.update(erros=erros[0], clientes=clientes)
+    return resultado
+
+
+async def drain(itens, processar, concorrencia=CONCORRENCIA_PADRAO):
+    """Aplica a corrotina `processar` a cada item, com até `concorrencia` em voo.
+
+    Os itens são consumidos sob demanda por `concorrencia` tarefas, sem criar
+    uma tarefa por item. Retorna quantos itens foram processados.
+    """
+    iterador = iter(itens)
+    contagem = [0]
+
+    async def trabalhador():
+        for item in iterador:
+            await processar(item)
+            contagem[0] += 1
+
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    return contagem[0]
@@ -0,0 +1,40 @@
+"""Carregamento dos módulos de cada banco a partir dos seus diretórios.
+
+Os diretórios `postgres/`, `mongo/` e `cassandra/` contêm scripts, não pacotes
+(e `cassandra` colidiria com o driver de mesmo nome), então os módulos são
+carregados pelo caminho do arquivo sob um nome único, como
+`techmarket_postgres_queries`.
+"""
+
+import importlib.util
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = ("postgres", "mongo", "cassandra")
+
+
+def load_module(backend, nome):
+    """Importa `<backend>/<nome>.py` e retorna o módulo."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Banco desconhecido: {backend}. Use um de {BACKENDS}.")
+    module_name = f"techmarket_{backend}_{nome}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(RAIZ, backend, f"{nome}.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def create_backend(backend, **opcoes):
+    """Instancia a implementação de Q1–Q6 definida em `<backend>/queries.py`."""
+    return load_module(backend, "queries").create_backend(**opcoes)
@@ -0,0 +1,82 @@
+"""Estratégias de chave primária comuns aos três bancos.
+
+- `uuid4`: UUID aleatório (padrão). As inserções se espalham por todo o
+  índice B-tree, com divisões de página e pouca localidade de cache.
+- `uuid7`: UUID ordenado por tempo (RFC 9562). Os 48 bits iniciais são um
+  instante em milissegundos, então chaves geradas em sequência caem no fim do
+  índice.
+- `sequencial`: inteiro crescente, gravado como BIGINT no PostgreSQL e
+  `bigint` no Cassandra, e convertido em ObjectId no MongoDB.
+
+No conjunto de dados, o instante dos UUIDv7 e o valor das chaves sequenciais
+seguem a ordem das linhas, que é a ordem de inserção da população.
+"""
+
+import itertools
+import os
+import time
+import uuid
+
+import numpy as np
+
+ESTRATEGIAS = ("uuid4", "uuid7", "sequencial")
+CHAVES_PADRAO = "uuid4"
+
+# Chaves novas (pedidos gravados durante a carga) no modo sequencial partem do
+# instante atual em microssegundos: ficam acima das chaves da população e
+# crescem entre execuções sem precisar consultar o banco.
+_sequencia = itertools.count(time.time_ns() // 1000)
+
+
+def uuid7_bytes(aleatorios, instantes_ms):
+    """Converte a matriz `(n, 16)` de bytes aleatórios em UUIDv7 com os instantes dados."""
+    dados = np.array(aleatorios, dtype=np.uint8, copy=True)
+    instantes = np.asarray(instantes_ms, dtype=np.int64)
+    for k in range(6):
+        dados[:, k] = (instantes >> (8 * (5 - k))) & 0xFF
+    dados[:, 6] = (dados[:, 6] & 0x0F) | 0x70
+    dados[:, 8] = (dados[:, 8] & 0x3F) | 0x80
+    return dados
+
+
+def uuid7():
+    instante = time.time_ns() // 10**6
+    aleatorio = bytearray(os.urandom(10))
+    aleatorio[0] = (aleatorio[0] & 0x0F) | 0x70
+    aleatorio[2] = (aleatorio[2] & 0x3F) | 0x80
+    return uuid.UUID(bytes=instante.to_bytes(6, "big") + bytes(aleatorio))
+
+
+def nova_chave(estrategia):
+    if estrategia == "uuid4":
+        return uuid.uuid4()
+    if estrategia == "uuid7":
+        return uuid7()
+    if estrategia == "sequencial":
+        return next(_sequencia)
+    raise ValueError(f"Estratégia de chave inválida: {estrategia}. Use uma de {ESTRATEGIAS}.")
+
+
+def detectar_estrategia(chave):
+    """Deduz a estratégia a partir de uma chave já gravada no banco.
+
+    A chave pode vir como `uuid.UUID` ou como texto (o psycopg2 devolve
+    colunas UUID como `str`); inteiros e ObjectIds são chaves sequenciais.
+    """
+    if isinstance(chave, str):
+        try:
+            chave = uuid.UUID(chave)
+        except ValueError:
+            return "sequencial"
+    if isinstance(chave, uuid.UUID):
+        return "uuid7" if chave.version == 7 else "uuid4"
+    return "sequencial"
+
+
+def add_key_argument(parser):
+    parser.add_argument(
+        "--chaves",
+        choices=ESTRATEGIAS,
+        default=CHAVES_PADRAO,
+        help="Estratégia de chave primária: uuid4 (aleatória), uuid7 (ordenada por tempo) ou sequencial.",
+    )
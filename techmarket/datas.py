@@ -0,0 +1,30 @@
+"""Janelas de datas usadas pelas consultas (Q5) e pelas partições mensais."""
+
+from datetime import timedelta
+
+# A Q5 cobre os 30 dias que terminam num pagamento pix existente; quase
+# sempre a janela cruza uma virada de mês.
+DIAS_Q5 = 30
+
+
+def month_range(reference_date):
+    """Primeiro e último instante do mês de `reference_date`."""
+    start_date = reference_date.replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    return start_date, next_month(start_date) - timedelta(microseconds=1)
+
+
+def next_month(reference_date):
+    """Primeiro instante do mês seguinte ao de `reference_date`."""
+    start_date = reference_date.replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    if reference_date.month == 12:
+        return start_date.replace(year=reference_date.year + 1, month=1)
+    return start_date.replace(month=reference_date.month + 1)
+
+
+def days_before(reference_date, dias=DIAS_Q5):
+    """`(reference_date - dias, reference_date)`: a janela de `dias` dias até `reference_date`."""
+    return reference_date - timedelta(days=dias), reference_date
@@ -0,0 +1,468 @@
+"""Gerador do conjunto de dados sintético da TechMarket.
+
+O conjunto é gerado uma única vez a partir de uma semente e guardado em forma
+colunar, com uma matriz NumPy por coluna. Os scripts de população dos três
+bancos consomem o mesmo `Dataset`, então todos recebem exatamente os mesmos
+dados e o tempo de geração fica fora das medições de inserção.
+
+Com `distribuicao="zipf"`, os pedidos se concentram em poucos clientes e os
+itens em poucos produtos: a linha de rank k (numa ordem embaralhada) é
+sorteada com probabilidade ∝ 1/k^`expoente`, como nos clientes e produtos
+"quentes" do tráfego real. O padrão é o sorteio uniforme.
+
+Toda a geração é vetorizada: UUIDs, preços, estoques, status, datas e itens
+saem de sorteios em bloco do NumPy. O Faker só é usado para pré-sortear
+pequenos conjuntos (nomes, sobrenomes e palavras), e colunas de texto guardam
+apenas índices nesses conjuntos. Emails e CPFs únicos são derivados de um
+contador, sem o custo crescente de `fake.unique`.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import os
+import unicodedata
+import uuid
+
+import numpy as np
+from faker import Faker
+
+from techmarket.chaves import CHAVES_PADRAO, uuid7_bytes
+
+DEFAULT_SEED = 42
+
+NUM_CLIENTES = 20000
+NUM_PRODUTOS = 5000
+NUM_PEDIDOS = 30000
+
+# Fator único de escala dos volumes acima. A variável de ambiente vale para
+# todos os scripts (população, consultas e varredura); `--escala` a sobrepõe.
+ESCALA_PADRAO = float(os.environ.get("TECHMARKET_ESCALA", "1"))
+
+CATEGORIAS = [
+    "Eletrônicos",
+    "Informática",
+    "Games",
+    "Celulares",
+    "Periféricos",
+    "Acessórios",
+    "Eletrodomésticos",
+    "Casa Inteligente",
+]
+STATUS_PEDIDO = ["pendente", "processando", "entregue", "cancelado"]
+TIPOS_PAGAMENTO = ["cartão", "pix", "boleto"]
+STATUS_PAGAMENTO = ["aprovado", "pendente", "recusado"]
+DOMINIOS_EMAIL = ["example.com", "example.net", "example.org"]
+
+DISTRIBUICOES = ("uniforme", "zipf")
+DISTRIBUICAO_PADRAO = "uniforme"
+EXPOENTE_PADRAO = 1.0
+
+DIAS_CADASTRO = 2 * 365
+DIAS_PEDIDO = 365
+DIAS_PAGAMENTO = 182
+
+TAMANHO_POOL_NOMES = 1000
+TAMANHO_POOL_PALAVRAS = 2000
+TAMANHO_LOTE = 5000
+
+# Multiplicador coprimo com 10**9: gera a base do CPF a partir do contador do
+# cliente sem repetições enquanto houver menos de 10**9 clientes.
+_CPF_MULTIPLICADOR = 387420489
+_CPF_DESLOCAMENTO = 123456789
+_MICROS_POR_DIA = 86400 * 1000000
+
+
+@dataclass
+class Dataset:
+    """Conjunto de dados em forma colunar.
+
+    Cada tabela é um dicionário `coluna -> numpy.ndarray`. IDs são matrizes
+    `(n, 16)` de bytes de UUID, datas são `datetime64[us]`, valores monetários
+    são inteiros em centavos e colunas de texto são códigos em `pools` (ou em
+    listas fixas como `CATEGORIAS`). Referências entre tabelas são índices de
+    linha (`pedidos["cliente"]`, `itens["produto"]`, ...), e os itens do pedido
+    `i` ocupam as linhas `itens_inicio[i]` até `itens_inicio[i + 1]` de `itens`.
+    Há exatamente um pagamento por pedido, na mesma posição do pedido.
+
+    `lote()` e `lotes()` convertem intervalos de linhas em listas Python com
+    os valores prontos para os drivers. As chaves saem no formato de `chaves`
+    (techmarket.chaves), escolhido na materialização e não gravado no snapshot.
+    """
+
+    seed: int
+    referencia: datetime
+    clientes: dict
+    produtos: dict
+    pedidos: dict
+    itens: dict
+    pagamentos: dict
+    pools: dict = field(default_factory=dict)
+    escala: float = 1
+    chaves: str = CHAVES_PADRAO
+    distribuicao: str = DISTRIBUICAO_PADRAO
+    expoente: float = EXPOENTE_PADRAO
+
+    @property
+    def num_clientes(self):
+        return len(self.clientes["id"])
+
+    @property
+    def num_produtos(self):
+        return len(self.produtos["id"])
+
+    @property
+    def num_pedidos(self):
+        return len(self.pedidos["id"])
+
+    @property
+    def num_itens(self):
+        return len(self.itens["pedido"])
+
+    @property
+    def itens_inicio(self):
+        return self.pedidos["itens_inicio"]
+
+    def tamanho(self, tabela):
+        if tabela == "itens":
+            return self.num_itens
+        return len(getattr(self, tabela)["id"])
+
+    def vendas_por_produto(self):
+        """Quantidade total vendida de cada produto, indexada pela linha do produto."""
+        return np.bincount(
+            self.itens["produto"],
+            weights=self.itens["quantidade"],
+            minlength=self.num_produtos,
+        ).astype(np.int64)
+
+    def lote(self, tabela, inicio, fim):
+        """Materializa as linhas `[inicio, fim)` de `tabela` como listas Python."""
+        return getattr(self, f"_lote_{tabela}")(slice(inicio, fim))
+
+    def lotes(self, tabela, tamanho=TAMANHO_LOTE, inicio=0, fim=None):
+        """Percorre as linhas `[inicio, fim)` de `tabela` em blocos de `(inicio, fim, lote)`."""
+        total = self.tamanho(tabela) if fim is None else fim
+        for bloco in range(inicio, total, tamanho):
+            bloco_fim = min(bloco + tamanho, total)
+            yield bloco, bloco_fim, self.lote(tabela, bloco, bloco_fim)
+
+    def _chaves(self, tabela, linhas):
+        """Chaves das linhas `linhas` (fatia ou vetor de índices) de `tabela`."""
+        if isinstance(linhas, slice):
+            indices = np.arange(linhas.start, linhas.stop, dtype=np.int64)
+        else:
+            indices = np.asarray(linhas, dtype=np.int64)
+        if self.chaves == "sequencial":
+            return (indices + 1).tolist()
+        brutos = getattr(self, tabela)["id"][indices]
+        if self.chaves == "uuid7":
+            # Um milissegundo por linha, terminando no instante de referência.
+            fim = int(self.referencia.timestamp() * 1000)
+            brutos = uuid7_bytes(brutos, fim - self.tamanho(tabela) + indices)
+        return _uuids(brutos)
+
+    def _lote_clientes(self, linhas):
+        c = self.clientes
+        primeiros = self.pools["primeiro_nome"]
+        sobrenomes = self.pools["sobrenome"]
+        slugs_primeiros = self.pools["primeiro_nome_slug"]
+        slugs_sobrenomes = self.pools["sobrenome_slug"]
+        contadores = range(linhas.start, linhas.stop)
+        codigos = list(
+            zip(
+                c["primeiro_nome"][linhas].tolist(),
+                c["sobrenome"][linhas].tolist(),
+                c["dominio"][linhas].tolist(),
+            )
+        )
+        return {
+            "id": self._chaves("clientes", linhas),
+            "nome": [f"{primeiros[p]} {sobrenomes[s]}" for p, s, _ in codigos],
+            "email": [
+                f"{slugs_primeiros[p]}.{slugs_sobrenomes[s]}{n}@{DOMINIOS_EMAIL[d]}"
+                for n, (p, s, d) in zip(contadores, codigos)
+            ],
+            "telefone": [_formatar_telefone(t) for t in c["telefone"][linhas].tolist()],
+            "data_cadastro": _datas(c["data_cadastro"][linhas]),
+            "cpf": [_formatar_cpf(v) for v in c["cpf"][linhas].tolist()],
+        }
+
+    def _lote_produtos(self, linhas):
+        p = self.produtos
+        palavras = self.pools["palavra"]
+        return {
+            "id": self._chaves("produtos", linhas),
+            "nome": [
+                f"{palavras[a].capitalize()} {palavras[b]} {palavras[c]}"
+                for a, b, c in p["nome"][linhas].tolist()
+            ],
+            "categoria": [CATEGORIAS[i] for i in p["categoria"][linhas].tolist()],
+            "preco": _valores(p["preco"][linhas]),
+            "estoque": p["estoque"][linhas].tolist(),
+        }
+
+    def _lote_pedidos(self, linhas):
+        p = self.pedidos
+        return {
+            "id": self._chaves("pedidos", linhas),
+            "id_cliente": self._chaves("clientes", p["cliente"][linhas]),
+            "data_pedido": _datas(p["data_pedido"][linhas]),
+            "status": [STATUS_PEDIDO[i] for i in p["status"][linhas].tolist()],
+            "valor_total": _valores(p["valor_total"][linhas]),
+        }
+
+    def _lote_itens(self, linhas):
+        it = self.itens
+        return {
+            "id_pedido": self._chaves("pedidos", it["pedido"][linhas]),
+            "id_produto": self._chaves("produtos", it["produto"][linhas]),
+            "quantidade": it["quantidade"][linhas].tolist(),
+            "preco_unitario": _valores(it["preco_unitario"][linhas]),
+        }
+
+    def _lote_pagamentos(self, linhas):
+        pg = self.pagamentos
+        return {
+            "id": self._chaves("pagamentos", linhas),
+            "id_pedido": self._chaves("pedidos", pg["pedido"][linhas]),
+            "tipo": [TIPOS_PAGAMENTO[i] for i in pg["tipo"][linhas].tolist()],
+            "status": [STATUS_PAGAMENTO[i] for i in pg["status"][linhas].tolist()],
+            "data_pagamento": _datas(pg["data_pagamento"][linhas]),
+        }
+
+
+def _uuids(matriz):
+    dados = np.ascontiguousarray(matriz).tobytes()
+    return [uuid.UUID(bytes=dados[k : k + 16]) for k in range(0, len(dados), 16)]
+
+
+def _datas(valores):
+    return valores.astype("datetime64[us]").tolist()
+
+
+def _valores(centavos):
+    return (centavos / 100).tolist()
+
+
+def _formatar_telefone(numero):
+    return f"({numero // 10**9:02d}) {numero // 10**4 % 10**5:05d}-{numero % 10**4:04d}"
+
+
+def _formatar_cpf(numero):
+    texto = f"{numero:011d}"
+    return f"{texto[:3]}.{texto[3:6]}.{texto[6:9]}-{texto[9:]}"
+
+
+def _slug(texto):
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return "".join(ch for ch in texto.lower() if ch.isalnum())
+
+
+def _gerar_uuids(rng, n):
+    dados = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    dados[:, 6] = (dados[:, 6] & 0x0F) | 0x40
+    dados[:, 8] = (dados[:, 8] & 0x3F) | 0x80
+    return dados
+
+
+def _gerar_datas(rng, referencia, dias, n):
+    fim = np.datetime64(referencia, "us")
+    deslocamentos = rng.integers(0, dias * _MICROS_POR_DIA, size=n, dtype=np.int64)
+    return fim - deslocamentos.astype("timedelta64[us]")
+
+
+def _gerar_cpfs(n):
+    """Deriva CPFs válidos e distintos do contador de clientes."""
+    base = (
+        np.arange(n, dtype=np.int64) * _CPF_MULTIPLICADOR + _CPF_DESLOCAMENTO
+    ) % 10**9
+    digitos = (base[:, None] // 10 ** np.arange(8, -1, -1, dtype=np.int64)) % 10
+
+    resto = (digitos * np.arange(10, 1, -1)).sum(axis=1) % 11
+    dv1 = np.where(resto < 2, 0, 11 - resto)
+    resto = ((digitos * np.arange(11, 2, -1)).sum(axis=1) + dv1 * 2) % 11
+    dv2 = np.where(resto < 2, 0, 11 - resto)
+    return base * 100 + dv1 * 10 + dv2
+
+
+def _pesos_zipf(rng, n, expoente):
+    """Probabilidade de cada uma das `n` linhas, ∝ 1/rank^`expoente`, com os ranks embaralhados."""
+    pesos = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** expoente
+    pesos /= pesos.sum()
+    return pesos[rng.permutation(n)]
+
+
+def _sortear_produtos_distintos(rng, pedido_por_item, num_produtos, pesos=None):
+    """Sorteia um produto por item sem repetir produtos dentro do mesmo pedido.
+
+    Com `pesos`, cada produto é sorteado com a probabilidade dada.
+    """
+
+    def sortear(n):
+        if pesos is None:
+            return rng.integers(0, num_produtos, size=n, dtype=np.int64)
+        return rng.choice(num_produtos, size=n, p=pesos)
+
+    produtos = sortear(len(pedido_por_item))
+    while True:
+        chaves = pedido_por_item.astype(np.int64) * num_produtos + produtos
+        _, primeiros = np.unique(chaves, return_index=True)
+        repetidos = np.ones(len(chaves), dtype=bool)
+        repetidos[primeiros] = False
+        if not repetidos.any():
+            return produtos
+        produtos[repetidos] = sortear(int(repetidos.sum()))
+
+
+def _gerar_pools(seed):
+    fake = Faker("pt_BR")
+    fake.seed_instance(seed)
+    primeiros = [fake.first_name() for _ in range(TAMANHO_POOL_NOMES)]
+    sobrenomes = [fake.last_name() for _ in range(TAMANHO_POOL_NOMES)]
+    return {
+        "primeiro_nome": primeiros,
+        "sobrenome": sobrenomes,
+        "primeiro_nome_slug": [_slug(nome) for nome in primeiros],
+        "sobrenome_slug": [_slug(nome) for nome in sobrenomes],
+        "palavra": [fake.word() for _ in range(TAMANHO_POOL_PALAVRAS)],
+    }
+
+
+def default_reference():
+    """Meia-noite do dia corrente: o "agora" padrão dos conjuntos gerados."""
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def generate_dataset(
+    seed=DEFAULT_SEED,
+    escala=1,
+    num_clientes=None,
+    num_produtos=None,
+    num_pedidos=None,
+    referencia=None,
+    distribuicao=DISTRIBUICAO_PADRAO,
+    expoente=EXPOENTE_PADRAO,
+):
+    """Gera o conjunto de dados da TechMarket de forma determinística.
+
+    Os volumes padrão são multiplicados por `escala`, a menos que sejam
+    informados explicitamente. `referencia` é o instante tratado como "agora"
+    ao sortear datas; por padrão, a meia-noite do dia corrente.
+    `distribuicao` define como pedidos são distribuídos entre clientes e
+    itens entre produtos (ver o início do módulo).
+    """
+    if distribuicao not in DISTRIBUICOES:
+        raise ValueError(
+            f"Distribuição inválida: {distribuicao}. Use uma de {DISTRIBUICOES}."
+        )
+    if num_clientes is None:
+        num_clientes = max(1, round(NUM_CLIENTES * escala))
+    if num_produtos is None:
+        num_produtos = max(1, round(NUM_PRODUTOS * escala))
+    if num_pedidos is None:
+        num_pedidos = max(1, round(NUM_PEDIDOS * escala))
+    if referencia is None:
+        referencia = default_reference()
+
+    rng = np.random.default_rng(seed)
+    pools = _gerar_pools(seed)
+
+    clientes = {
+        "id": _gerar_uuids(rng, num_clientes),
+        "primeiro_nome": rng.integers(
+            0, TAMANHO_POOL_NOMES, size=num_clientes, dtype=np.uint16
+        ),
+        "sobrenome": rng.integers(
+            0, TAMANHO_POOL_NOMES, size=num_clientes, dtype=np.uint16
+        ),
+        "dominio": rng.integers(
+            0, len(DOMINIOS_EMAIL), size=num_clientes, dtype=np.uint8
+        ),
+        "telefone": rng.integers(11, 100, size=num_clientes, dtype=np.int64) * 10**9
+        + 900000000
+        + rng.integers(0, 10**8, size=num_clientes, dtype=np.int64),
+        "data_cadastro": _gerar_datas(rng, referencia, DIAS_CADASTRO, num_clientes),
+        "cpf": _gerar_cpfs(num_clientes),
+    }
+
+    produtos = {
+        "id": _gerar_uuids(rng, num_produtos),
+        "nome": rng.integers(
+            0, TAMANHO_POOL_PALAVRAS, size=(num_produtos, 3), dtype=np.uint16
+        ),
+        "categoria": rng.integers(
+            0, len(CATEGORIAS), size=num_produtos, dtype=np.uint8
+        ),
+        "preco": rng.integers(1000, 500001, size=num_produtos, dtype=np.int64),
+        "estoque": rng.integers(0, 1001, size=num_produtos, dtype=np.int32),
+    }
+
+    num_itens_por_pedido = np.minimum(
+        rng.integers(1, 6, size=num_pedidos), num_produtos
+    )
+    itens_inicio = np.zeros(num_pedidos + 1, dtype=np.int64)
+    np.cumsum(num_itens_por_pedido, out=itens_inicio[1:])
+    pedido_por_item = np.repeat(
+        np.arange(num_pedidos, dtype=np.int32), num_itens_por_pedido
+    )
+    num_itens = len(pedido_por_item)
+
+    # No modo uniforme nenhum sorteio extra é feito, então os dados de uma
+    # mesma semente não mudam.
+    zipf = distribuicao == "zipf"
+    pesos_produtos = _pesos_zipf(rng, num_produtos, expoente) if zipf else None
+    itens = {
+        "pedido": pedido_por_item,
+        "produto": _sortear_produtos_distintos(
+            rng, pedido_por_item, num_produtos, pesos_produtos
+        ).astype(np.int32),
+        "quantidade": rng.integers(1, 4, size=num_itens, dtype=np.int32),
+        "preco_unitario": rng.integers(1000, 100001, size=num_itens, dtype=np.int64),
+    }
+
+    subtotais = itens["quantidade"].astype(np.int64) * itens["preco_unitario"]
+    valor_total = np.zeros(num_pedidos, dtype=np.int64)
+    if num_itens:
+        valor_total = np.add.reduceat(subtotais, itens_inicio[:-1])
+
+    ids_pedidos = _gerar_uuids(rng, num_pedidos)
+    if zipf:
+        pesos_clientes = _pesos_zipf(rng, num_clientes, expoente)
+        cliente_por_pedido = rng.choice(num_clientes, size=num_pedidos, p=pesos_clientes)
+        cliente_por_pedido = cliente_por_pedido.astype(np.int32)
+    else:
+        cliente_por_pedido = rng.integers(0, num_clientes, size=num_pedidos, dtype=np.int32)
+    pedidos = {
+        "id": ids_pedidos,
+        "cliente": cliente_por_pedido,
+        "data_pedido": _gerar_datas(rng, referencia, DIAS_PEDIDO, num_pedidos),
+        "status": rng.integers(0, len(STATUS_PEDIDO), size=num_pedidos, dtype=np.uint8),
+        "valor_total": valor_total,
+        "itens_inicio": itens_inicio,
+    }
+
+    pagamentos = {
+        "id": _gerar_uuids(rng, num_pedidos),
+        "pedido": np.arange(num_pedidos, dtype=np.int32),
+        "tipo": rng.integers(
+            0, len(TIPOS_PAGAMENTO), size=num_pedidos, dtype=np.uint8
+        ),
+        "status": rng.integers(
+            0, len(STATUS_PAGAMENTO), size=num_pedidos, dtype=np.uint8
+        ),
+        "data_pagamento": _gerar_datas(rng, referencia, DIAS_PAGAMENTO, num_pedidos),
+    }
+
+    return Dataset(
+        seed=seed,
+        referencia=referencia,
+        clientes=clientes,
+        produtos=produtos,
+        pedidos=pedidos,
+        itens=itens,
+        pagamentos=pagamentos,
+        pools=pools,
+        escala=escala,
+        distribuicao=distribuicao,
+        expoente=expoente,
+    )
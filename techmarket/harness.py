@@ -0,0 +1,450 @@
+"""Harness de benchmark das consultas Q1–Q6, comum aos três bancos.
+
+Cada banco implementa `Backend` no seu `queries.py`. O harness sorteia os
+parâmetros de cada consulta, executa as iterações de aquecimento (descartadas)
+e as de medição cronometradas com `time.perf_counter_ns`, e resume as amostras
+em mínimo, p50, p95, p99, máximo e vazão.
+
+`Acesso` define como os parâmetros variam entre as execuções: sempre os
+mesmos (`fixo`, o padrão), ou sorteados a cada execução de um conjunto de
+candidatos, de modo uniforme ou com pesos de Zipf (poucas chaves quentes
+recebem a maior parte das execuções).
+
+`benchmark_cold` mede o outro extremo: cada execução usa parâmetros ainda
+não tocados na sessão de medição, opcionalmente depois de descartar os
+caches do banco, e não há aquecimento.
+"""
+
+from abc import ABC, abstractmethod
+from itertools import accumulate, cycle, islice
+import random
+import time
+
+CONSULTAS = {
+    "Q1": "Cliente + Últimos Pedidos",
+    "Q2": "Produtos por Categoria",
+    "Q3": "Pedidos Entregues Cliente",
+    "Q4": "Top 5 Produtos Vendidos",
+    "Q5": "Pagamentos via PIX (30d)",
+    "Q6": "Total Gasto por Cliente",
+}
+
+AQUECIMENTO_PADRAO = 3
+ITERACOES_PADRAO = 10
+
+ACESSOS = ("fixo", "uniforme", "zipf")
+ACESSO_PADRAO = "fixo"
+EXPOENTE_ACESSO_PADRAO = 1.0
+CANDIDATOS_PADRAO = 200
+
+# Sorteios tentados por parâmetro novo antes de `fresh_params` desistir.
+TENTATIVAS_POR_PARAMETRO = 10
+
+
+class Backend(ABC):
+    """Implementação de Q1–Q6 para um banco.
+
+    `sample_params(consulta)` devolve a tupla de argumentos da consulta (ou
+    None quando não há dados para testá-la) e `q1` a `q6` executam a consulta
+    e devolvem os resultados já materializados numa lista, para que o tempo
+    medido inclua a leitura completa do cursor.
+    """
+
+    nome = None
+
+    @abstractmethod
+    def connect(self):
+        """Abre a conexão; retorna False se o banco não estiver disponível."""
+
+    @abstractmethod
+    def close(self):
+        pass
+
+    @abstractmethod
+    def sample_params(self, consulta):
+        pass
+
+    @abstractmethod
+    def q1(self, email):
+        pass
+
+    @abstractmethod
+    def q2(self, categoria):
+        pass
+
+    @abstractmethod
+    def q3(self, id_cliente):
+        pass
+
+    @abstractmethod
+    def q4(self):
+        pass
+
+    @abstractmethod
+    def q5(self, inicio, fim):
+        pass
+
+    @abstractmethod
+    def q6(self, id_cliente, inicio, fim):
+        pass
+
+    def run(self, consulta, params):
+        return getattr(self, consulta.lower())(*params)
+
+    # Escrita usada pela carga mista (techmarket.workload).
+
+    def sample_refs(self, n):
+        """Até `n` ids de clientes e `(id, preço)` de produtos já gravados."""
+        raise NotImplementedError(f"{self.nome} não implementa sample_refs.")
+
+    def place_order(self, pedido):
+        """Grava um pedido novo, com itens e pagamento, montado por `OrderFactory`."""
+        raise NotImplementedError(f"{self.nome} não implementa place_order.")
+
+    def index_sizes(self):
+        """Tamanho em bytes de cada índice, ou None se o banco não o expõe."""
+        return None
+
+    def reset_cache(self):
+        """Descarta os caches do servidor ligados à sessão; False se o banco não tem como."""
+        return False
+
+    def explain(self, consulta, params):
+        """Executa a consulta com o plano do servidor; retorna o registro de techmarket.planos."""
+        raise NotImplementedError(f"{self.nome} não implementa explain.")
+
+
+def percentile(sorted_values, p):
+    """Percentil `p` (0–100) por interpolação linear sobre valores já ordenados."""
+    if not sorted_values:
+        return None
+    posicao = (len(sorted_values) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(sorted_values) - 1)
+    return sorted_values[baixo] + (sorted_values[alto] - sorted_values[baixo]) * (
+        posicao - baixo
+    )
+
+
+def summarize(amostras_ns, duracao_ns=None):
+    """Resume latências em nanossegundos como milissegundos e vazão em ops/s."""
+    ordenadas = sorted(amostras_ns)
+    if duracao_ns is None:
+        duracao_ns = sum(ordenadas)
+
+    def ms(valor):
+        return valor / 1e6
+
+    return {
+        "n": len(ordenadas),
+        "min": ms(ordenadas[0]),
+        "p50": ms(percentile(ordenadas, 50)),
+        "p95": ms(percentile(ordenadas, 95)),
+        "p99": ms(percentile(ordenadas, 99)),
+        "max": ms(ordenadas[-1]),
+        "media": ms(sum(ordenadas) / len(ordenadas)),
+        "vazao": len(ordenadas) / (duracao_ns / 1e9) if duracao_ns else 0.0,
+    }
+
+
+def time_call(funcao, *args):
+    """Executa `funcao(*args)` e retorna `(duracao_ns, resultado)`."""
+    inicio = time.perf_counter_ns()
+    resultado = funcao(*args)
+    return time.perf_counter_ns() - inicio, resultado
+
+
+class Acesso:
+    """Distribuição dos parâmetros entre as execuções de uma consulta."""
+
+    def __init__(
+        self,
+        distribuicao=ACESSO_PADRAO,
+        expoente=EXPOENTE_ACESSO_PADRAO,
+        candidatos=CANDIDATOS_PADRAO,
+        seed=None,
+    ):
+        if distribuicao not in ACESSOS:
+            raise ValueError(f"Acesso inválido: {distribuicao}. Use um de {ACESSOS}.")
+        self.distribuicao = distribuicao
+        self.expoente = expoente
+        self.candidatos = candidatos
+        self.rng = random.Random(seed)
+
+    def sampler(self, backend, consulta):
+        """Retorna `(params, proximos)`, ou None se não houver dados.
+
+        `params` são os primeiros parâmetros sorteados e `proximos()` devolve
+        os da próxima execução. Fora do modo `fixo`, até `candidatos`
+        parâmetros distintos são sorteados antes da medição; no modo `zipf`,
+        o k-ésimo deles é escolhido com probabilidade ∝ 1/k^`expoente`.
+        """
+        params = backend.sample_params(consulta)
+        if params is None:
+            return None
+        if self.distribuicao == "fixo":
+            return params, lambda: params
+
+        sorteados = (backend.sample_params(consulta) for _ in range(self.candidatos - 1))
+        return params, self.chooser([params, *sorteados])
+
+    def chooser(self, sorteados):
+        """`proximos()` sobre os parâmetros distintos de `sorteados`, ou None se não há nenhum.
+
+        Para quem já sorteou os candidatos (por exemplo, com um backend
+        assíncrono); no modo `fixo`, devolve sempre o primeiro.
+        """
+        candidatos = list(dict.fromkeys(params for params in sorteados if params is not None))
+        if not candidatos:
+            return None
+        if self.distribuicao == "fixo":
+            return lambda: candidatos[0]
+        pesos = None
+        if self.distribuicao == "zipf":
+            pesos = list(
+                accumulate(1 / (k + 1) ** self.expoente for k in range(len(candidatos)))
+            )
+        return lambda: self.rng.choices(candidatos, cum_weights=pesos)[0]
+
+    def samplers(self, backends, consulta):
+        """Um `proximos()` por backend, ou None onde não há dados ou o sorteio falhou.
+
+        No modo `fixo`, cada backend sorteia os próprios parâmetros. Nos
+        outros, os candidatos são sorteados uma vez e compartilhados, para que
+        a distribuição (e as chaves quentes do zipf) valha para a carga inteira.
+        """
+
+        def sortear(backend):
+            try:
+                sorteio = self.sampler(backend, consulta)
+            except Exception:
+                return None
+            return sorteio[1] if sorteio else None
+
+        if self.distribuicao == "fixo":
+            return [sortear(backend) for backend in backends]
+        return [sortear(backends[0])] * len(backends)
+
+
+def benchmark_query(
+    backend,
+    consulta,
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    variar_parametros=False,
+    acesso=None,
+    planos=None,
+):
+    """Mede `consulta` com os parâmetros de cada execução dados por `acesso`.
+
+    O sorteio fica fora da medição. Com `variar_parametros`, cada execução
+    chama `sample_params` de novo; sem ele e sem `acesso`, todas as
+    execuções usam os mesmos parâmetros. Com a lista `planos`, depois de
+    todas as execuções medidas, uma segunda passada chama `backend.explain`
+    com os parâmetros de cada uma, na mesma ordem, e acrescenta os registros
+    à lista; assim o explain não aquece o cache entre execuções medidas.
+    """
+    sorteio = (acesso or Acesso()).sampler(backend, consulta)
+    if sorteio is None:
+        return None
+    params, proximos = sorteio
+    if variar_parametros:
+
+        def proximos():
+            return backend.sample_params(consulta)
+
+    for _ in range(aquecimento):
+        backend.run(consulta, proximos())
+
+    amostras = []
+    executados = []
+    resultados = None
+    for _ in range(iteracoes):
+        parametros = proximos()
+        duracao, resultados = time_call(backend.run, consulta, parametros)
+        amostras.append(duracao)
+        executados.append(parametros)
+
+    if planos is not None:
+        for parametros, duracao in zip(executados, amostras):
+            registro = backend.explain(consulta, parametros)
+            registro.update(
+                backend=backend.nome,
+                consulta=consulta,
+                params=parametros,
+                cliente_ms=duracao / 1e6,
+            )
+            planos.append(registro)
+
+    resumo = summarize(amostras)
+    resumo.update(
+        backend=backend.nome,
+        consulta=consulta,
+        params=params,
+        exemplo=resultados[0] if resultados else None,
+    )
+    return resumo
+
+
+def fresh_params(backend, consulta, n, vistos):
+    """Até `n` parâmetros distintos de `consulta` fora de `vistos`, que passa a incluí-los."""
+    novos = []
+    for _ in range(n * TENTATIVAS_POR_PARAMETRO):
+        if len(novos) == n:
+            break
+        params = backend.sample_params(consulta)
+        if params is None:
+            break
+        if params not in vistos:
+            vistos.add(params)
+            novos.append(params)
+    return novos
+
+
+def benchmark_cold(backend, consulta, execucoes, vistos, descartar=None):
+    """Mede `execucoes` execuções frias de `consulta`, sem aquecimento.
+
+    Os parâmetros são sorteados antes da primeira execução, entre os que não
+    estão em `vistos` (compartilhado pelas medições de um backend). Consultas
+    com poucos parâmetros distintos, como a Q4, repetem os que houver; o
+    resumo informa em `novos` quantos eram inéditos. Antes de cada execução,
+    fora da medição, `descartar()` limpa os caches do banco.
+    """
+    novos = fresh_params(backend, consulta, execucoes, vistos)
+    if not novos:
+        return None
+
+    amostras = []
+    resultados = None
+    for params in islice(cycle(novos), execucoes):
+        if descartar:
+            descartar()
+        duracao, resultados = time_call(backend.run, consulta, params)
+        amostras.append(duracao)
+
+    resumo = summarize(amostras)
+    resumo.update(
+        backend=backend.nome,
+        consulta=consulta,
+        params=novos[0],
+        novos=len(novos),
+        exemplo=resultados[0] if resultados else None,
+    )
+    return resumo
+
+
+def run_benchmark(
+    backend,
+    consultas=tuple(CONSULTAS),
+    aquecimento=AQUECIMENTO_PADRAO,
+    iteracoes=ITERACOES_PADRAO,
+    verbose=True,
+    variar_parametros=False,
+    acesso=None,
+    planos=None,
+):
+    """Executa as consultas num backend já conectado e retorna os resumos."""
+    resumos = []
+    for consulta in consultas:
+        if verbose:
+            print(f"\n--- Executando {consulta}: {CONSULTAS[consulta]} ({backend.nome}) ---")
+        try:
+            resumo = benchmark_query(
+                backend, consulta, aquecimento, iteracoes, variar_parametros, acesso, planos
+            )
+        except Exception as e:
+            print(f"Erro ao executar {consulta} ({backend.nome}): {e}")
+            continue
+        if resumo is None:
+            if verbose:
+                print(f"Sem dados para testar {consulta}.")
+            continue
+        resumos.append(resumo)
+        if verbose:
+            print(format_summary(resumo))
+            print(f"Exemplo de resultado ({consulta}): {resumo['exemplo']}")
+    return resumos
+
+
+def format_summary(resumo):
+    return (
+        f"min {resumo['min']:.3f} ms | p50 {resumo['p50']:.3f} ms | "
+        f"p95 {resumo['p95']:.3f} ms | p99 {resumo['p99']:.3f} ms | "
+        f"max {resumo['max']:.3f} ms | {resumo['vazao']:.1f} consultas/s"
+    )
+
+
+def print_report(resumos):
+    """Imprime uma tabela com uma linha por consulta e banco."""
+    cabecalho = (
+        f"{'Consulta':<34} {'Banco':<10} {'n':>5} {'min':>9} {'p50':>9} "
+        f"{'p95':>9} {'p99':>9} {'max':>9} {'ops/s':>9}"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for resumo in sorted(resumos, key=lambda r: (r["consulta"], r["backend"])):
+        rotulo = f"{resumo['consulta']}: {CONSULTAS[resumo['consulta']]}"
+        print(
+            f"{rotulo:<34} {resumo['backend']:<10} {resumo['n']:>5} "
+            f"{resumo['min']:>9.3f} {resumo['p50']:>9.3f} {resumo['p95']:>9.3f} "
+            f"{resumo['p99']:>9.3f} {resumo['max']:>9.3f} {resumo['vazao']:>9.1f}"
+        )
+    print("(latências em ms)")
+
+
+def add_benchmark_arguments(parser):
+    parser.add_argument(
+        "--aquecimento",
+        type=int,
+        default=AQUECIMENTO_PADRAO,
+        help="Execuções descartadas antes das medições de cada consulta.",
+    )
+    parser.add_argument(
+        "--iteracoes",
+        type=int,
+        default=ITERACOES_PADRAO,
+        help="Execuções medidas por consulta.",
+    )
+    parser.add_argument(
+        "--consultas",
+        nargs="+",
+        choices=list(CONSULTAS),
+        default=list(CONSULTAS),
+        help="Subconjunto de consultas a executar.",
+    )
+
+
+def add_access_arguments(parser, padrao=ACESSO_PADRAO):
+    """Opções de `Acesso`, para os scripts que medem com `benchmark_query` ou sob carga."""
+    parser.add_argument(
+        "--acesso",
+        choices=ACESSOS,
+        default=padrao,
+        help="fixo (os mesmos parâmetros em todas as execuções), uniforme ou zipf "
+        "(sorteados a cada execução entre --candidatos parâmetros).",
+    )
+    parser.add_argument(
+        "--expoente-acesso",
+        type=float,
+        default=EXPOENTE_ACESSO_PADRAO,
+        help="Expoente s do acesso zipf (probabilidade ∝ 1/rank^s).",
+    )
+    parser.add_argument(
+        "--candidatos",
+        type=int,
+        default=CANDIDATOS_PADRAO,
+        help="Parâmetros sorteados antes da medição nos acessos uniforme e zipf.",
+    )
+
+
+def add_plans_argument(parser):
+    parser.add_argument(
+        "--planos",
+        metavar="ARQUIVO",
+        help="Grava em ARQUIVO (JSON, um por linha) o tempo no servidor e o plano "
+        "de cada execução medida.",
+    )
+
+
+def access_from_args(args):
+    return Acesso(args.acesso, args.expoente_acesso, args.candidatos)
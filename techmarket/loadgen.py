@@ -0,0 +1,228 @@
+"""Geração de carga concorrente sobre as consultas Q1–Q6.
+
+Dois modelos de carga:
+
+- Laço fechado (`closed_loop`): N clientes virtuais, cada um numa thread com
+  a própria conexão, emitem a próxima consulta assim que a anterior termina. A
+  vazão é consequência da latência.
+- Laço aberto (`open_loop`): as consultas chegam numa taxa alvo (chegadas de
+  Poisson), independentemente de quanto o banco demora a responder. A latência
+  é medida a partir do instante programado de chegada, e não do instante em
+  que uma thread ficou livre, para que a fila de espera apareça nos percentis.
+
+Nos dois, os parâmetros de cada execução vêm de um `Acesso`
+(techmarket.harness): sorteados uma vez por cliente no acesso fixo, ou
+escolhidos a cada execução entre os mesmos candidatos nos acessos uniforme e
+zipf.
+
+`ramp_closed_loop` e `ramp_open_loop` aumentam a carga degrau a degrau até o
+banco saturar.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import random
+import threading
+import time
+
+from techmarket.harness import Acesso, summarize
+
+DURACAO_PADRAO = 10
+CLIENTES_PADRAO = (1, 2, 4, 8, 16, 32, 64)
+TAXAS_PADRAO = (10, 25, 50, 100, 200, 400, 800, 1600)
+WORKERS_PADRAO = 32
+
+# Um degrau é considerado saturado quando dobrar a concorrência rende menos de
+# 10% de vazão a mais, ou quando o laço aberto entrega menos de 90% da taxa alvo.
+GANHO_MINIMO = 0.10
+ENTREGA_MINIMA = 0.90
+
+
+def _connect(backend_factory):
+    backend = backend_factory()
+    if not backend.connect():
+        raise ConnectionError(f"Não foi possível conectar ao banco '{backend.nome}'.")
+    return backend
+
+
+def closed_loop(backend_factory, consulta, clientes, duracao=DURACAO_PADRAO, acesso=None):
+    """Executa `clientes` clientes virtuais em laço fechado por `duracao` segundos.
+
+    Cada cliente pede a `acesso` os parâmetros de cada execução, fora da medição.
+    """
+    backends = []
+    latencias = [[] for _ in range(clientes)]
+    erros = [0] * clientes
+    janela = {}
+
+    def iniciar_janela():
+        # Executada uma única vez, quando todos os clientes estão prontos, para
+        # que a medição comece com todos ao mesmo tempo.
+        janela["inicio"] = time.perf_counter_ns()
+        janela["fim"] = time.perf_counter() + duracao
+
+    pronto = threading.Barrier(clientes + 1, action=iniciar_janela)
+
+    def cliente(indice, proximos):
+        backend = backends[indice]
+        pronto.wait()
+        if proximos is None:
+            erros[indice] += 1
+            return
+        while time.perf_counter() < janela["fim"]:
+            params = proximos()
+            inicio = time.perf_counter_ns()
+            try:
+                backend.run(consulta, params)
+            except Exception:
+                erros[indice] += 1
+                continue
+            latencias[indice].append(time.perf_counter_ns() - inicio)
+
+    try:
+        for _ in range(clientes):
+            backends.append(_connect(backend_factory))
+        sorteios = (acesso or Acesso()).samplers(backends, consulta)
+        threads = [
+            threading.Thread(target=cliente, args=(i, proximos))
+            for i, proximos in enumerate(sorteios)
+        ]
+        for thread in threads:
+            thread.start()
+        pronto.wait()
+        for thread in threads:
+            thread.join()
+        decorrido = time.perf_counter_ns() - janela["inicio"]
+    finally:
+        for backend in backends:
+            backend.close()
+
+    amostras = [amostra for lista in latencias for amostra in lista]
+    return _resultado(amostras, decorrido, sum(erros), clientes=clientes)
+
+
+def open_loop(
+    backend_factory,
+    consulta,
+    taxa,
+    duracao=DURACAO_PADRAO,
+    max_workers=WORKERS_PADRAO,
+    seed=None,
+    acesso=None,
+):
+    """Emite consultas com chegadas de Poisson a `taxa` consultas/s por `duracao` segundos.
+
+    As `max_workers` conexões são abertas (e seus candidatos a parâmetro
+    sorteados) antes da primeira chegada; cada chegada pega uma conexão
+    livre, pede a `acesso` os próprios parâmetros e devolve a conexão ao
+    terminar.
+    """
+    livres = queue.Queue()
+    abertos = []
+    try:
+        for _ in range(max_workers):
+            abertos.append(_connect(backend_factory))
+        sorteios = (acesso or Acesso()).samplers(abertos, consulta)
+        for backend, proximos in zip(abertos, sorteios):
+            livres.put((backend, proximos))
+    except BaseException:
+        for backend in abertos:
+            backend.close()
+        raise
+
+    trava = threading.Lock()
+    latencias = []
+    erros = [0]
+
+    def executar(chegada_ns):
+        backend, proximos = livres.get()
+        try:
+            backend.run(consulta, proximos())
+        except Exception:
+            with trava:
+                erros[0] += 1
+            return
+        finally:
+            livres.put((backend, proximos))
+        latencia = time.perf_counter_ns() - chegada_ns
+        with trava:
+            latencias.append(latencia)
+
+    rng = random.Random(seed)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    inicio = time.perf_counter_ns()
+    try:
+        proxima = inicio
+        limite = inicio + int(duracao * 1e9)
+        while proxima < limite:
+            espera = (proxima - time.perf_counter_ns()) / 1e9
+            if espera > 0:
+                time.sleep(espera)
+            executor.submit(executar, proxima)
+            proxima += int(rng.expovariate(taxa) * 1e9)
+    finally:
+        executor.shutdown(wait=True)
+        decorrido = time.perf_counter_ns() - inicio
+        for backend in abertos:
+            backend.close()
+
+    return _resultado(latencias, decorrido, erros[0], taxa_alvo=taxa)
+
+
+def _resultado(amostras, decorrido_ns, erros, **extra):
+    resultado = summarize(amostras, decorrido_ns) if amostras else {"n": 0, "vazao": 0.0}
+    resultado.update(erros=erros, **extra)
+    return resultado
+
+
+def ramp_closed_loop(
+    backend_factory, consulta, clientes=CLIENTES_PADRAO, duracao=DURACAO_PADRAO, acesso=None
+):
+    """Aumenta o número de clientes até a vazão parar de crescer."""
+    degraus = []
+    for n in clientes:
+        resultado = closed_loop(backend_factory, consulta, n, duracao, acesso)
+        degraus.append(resultado)
+        print(format_step(resultado))
+        if len(degraus) > 1:
+            anterior = degraus[-2]["vazao"]
+            if anterior and resultado["vazao"] < anterior * (1 + GANHO_MINIMO):
+                print("Saturação atingida: a vazão parou de crescer.")
+                break
+    return degraus
+
+
+def ramp_open_loop(
+    backend_factory,
+    consulta,
+    taxas=TAXAS_PADRAO,
+    duracao=DURACAO_PADRAO,
+    max_workers=WORKERS_PADRAO,
+    acesso=None,
+):
+    """Aumenta a taxa de chegada até o banco deixar de acompanhá-la."""
+    degraus = []
+    for taxa in taxas:
+        resultado = open_loop(
+            backend_factory, consulta, taxa, duracao, max_workers, acesso=acesso
+        )
+        degraus.append(resultado)
+        print(format_step(resultado))
+        if resultado["vazao"] < taxa * ENTREGA_MINIMA:
+            print("Saturação atingida: a vazão ficou abaixo da taxa alvo.")
+            break
+    return degraus
+
+
+def format_step(resultado):
+    if "clientes" in resultado:
+        rotulo = f"{resultado['clientes']:>4} clientes"
+    else:
+        rotulo = f"{resultado['taxa_alvo']:>6} consultas/s alvo"
+    if not resultado["n"]:
+        return f"{rotulo}: nenhuma consulta concluída ({resultado['erros']} erros)"
+    return (
+        f"{rotulo}: {resultado['vazao']:.1f} consultas/s | p50 {resultado['p50']:.3f} ms | "
+        f"p95 {resultado['p95']:.3f} ms | p99 {resultado['p99']:.3f} ms | "
+        f"max {resultado['max']:.3f} ms | {resultado['erros']} erros"
+    )
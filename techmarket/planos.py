@@ -0,0 +1,72 @@
+"""Tempo no servidor e plano de execução de cada execução medida de Q1–Q6.
+
+Com `--planos ARQUIVO`, o harness chama `Backend.explain(consulta, params)`
+numa segunda passada, depois de todas as execuções medidas de uma consulta,
+com os parâmetros de cada uma, e guarda um registro por execução com:
+
+- `cliente_ms`: a ida e volta medida pelo harness;
+- `servidor_ms`: o tempo informado pelo próprio banco (planejamento mais
+  execução no PostgreSQL, `executionTimeMillis` no MongoDB, a soma das
+  durações no coordenador com tracing no Cassandra);
+- `examinados` e `retornados`: linhas ou documentos lidos e devolvidos;
+- `indices`: os índices (ou tabelas, no Cassandra) usados pelo plano;
+- `plano`: o plano ou o trace completo, como o banco o devolveu.
+
+O `explain` executa a consulta de novo; fazê-lo só depois da medição evita
+que ele aqueça o cache para as execuções medidas seguintes. Em troca, o
+tempo no servidor vem dessa segunda passada, com o cache no estado em que a
+medição o deixou. Os registros são gravados em JSON, um por linha.
+"""
+
+import json
+from collections import defaultdict
+
+from techmarket.harness import CONSULTAS, percentile
+
+
+def walk(no):
+    """Todos os dicionários aninhados em `no`, inclusive o próprio."""
+    if isinstance(no, dict):
+        yield no
+        for valor in no.values():
+            yield from walk(valor)
+    elif isinstance(no, list):
+        for valor in no:
+            yield from walk(valor)
+
+
+def save_plans(planos, caminho):
+    with open(caminho, "w", encoding="utf-8") as f:
+        for registro in planos:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    print(f"{len(planos)} planos gravados em {caminho}.")
+
+
+def print_plans_report(planos):
+    """p50 no cliente e no servidor, examinados/retornados e índices por consulta e banco."""
+    grupos = defaultdict(list)
+    for registro in planos:
+        grupos[(registro["consulta"], registro["backend"])].append(registro)
+
+    cabecalho = (
+        f"{'Consulta':<34} {'Banco':<10} {'cliente':>9} {'servidor':>9} "
+        f"{'examin.':>9} {'retorn.':>8}  Índices"
+    )
+    print("\n" + cabecalho)
+    print("-" * len(cabecalho))
+    for (consulta, nome), registros in sorted(grupos.items()):
+
+        def p50(campo):
+            return percentile(sorted(r[campo] for r in registros), 50)
+
+        indices = sorted({indice for r in registros for indice in r["indices"]})
+        print(
+            f"{f'{consulta}: {CONSULTAS[consulta]}':<34} {nome:<10} "
+            f"{p50('cliente_ms'):>9.3f} {p50('servidor_ms'):>9.3f} "
+            f"{p50('examinados'):>9.0f} {p50('retornados'):>8.0f}  "
+            f"{', '.join(indices) or '-'}"
+        )
+    print(
+        "(p50 das execuções; latências em ms; servidor medido numa segunda passada, "
+        "depois da medição no cliente; examinados/retornados em linhas ou documentos)"
+    )
@@ -0,0 +1,211 @@
+"""Snapshots em disco do conjunto de dados gerado.
+
+Cada snapshot é um diretório com um arquivo `.npy` por coluna e um
+`manifest.json` com a semente, a escala, a distribuição, o instante de
+referência e os pools de texto. O nome do diretório inclui a versão do
+formato, a semente, a escala, o dia de referência e, fora do modo uniforme,
+a distribuição. As datas geradas são relativas à referência, e as janelas,
+partições e buckets dos bancos, ao dia corrente; por isso um snapshot de
+outro dia não é reaproveitado, e o conjunto é gerado de novo. As
+colunas são recarregadas com `numpy.load(mmap_mode="r")`: o sistema
+operacional lê as páginas sob demanda enquanto os scripts percorrem os lotes,
+sem regenerar nem copiar o conjunto inteiro para a memória.
+"""
+
+from datetime import datetime
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from techmarket.chaves import add_key_argument
+from techmarket.dataset import (
+    DEFAULT_SEED,
+    DISTRIBUICAO_PADRAO,
+    DISTRIBUICOES,
+    ESCALA_PADRAO,
+    EXPOENTE_PADRAO,
+    Dataset,
+    default_reference,
+    generate_dataset,
+)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshots"
+)
+TABELAS = ("clientes", "produtos", "pedidos", "itens", "pagamentos")
+
+
+def snapshot_path(
+    seed,
+    escala,
+    diretorio=SNAPSHOT_DIR,
+    distribuicao=DISTRIBUICAO_PADRAO,
+    expoente=EXPOENTE_PADRAO,
+    referencia=None,
+):
+    referencia = referencia or default_reference()
+    nome = f"v{SNAPSHOT_VERSION}-seed{seed}-escala{escala:g}-ref{referencia:%Y%m%d}"
+    if distribuicao != DISTRIBUICAO_PADRAO:
+        nome += f"-{distribuicao}{expoente:g}"
+    return os.path.join(diretorio, nome)
+
+
+def save_snapshot(ds, diretorio=SNAPSHOT_DIR):
+    """Grava `ds` em disco e retorna o caminho do snapshot."""
+    destino = snapshot_path(
+        ds.seed, ds.escala, diretorio, ds.distribuicao, ds.expoente, ds.referencia
+    )
+    temporario = f"{destino}.tmp-{os.getpid()}"
+    os.makedirs(temporario, exist_ok=True)
+
+    for tabela in TABELAS:
+        for coluna, valores in getattr(ds, tabela).items():
+            np.save(os.path.join(temporario, f"{tabela}.{coluna}.npy"), valores)
+
+    manifest = {
+        "versao": SNAPSHOT_VERSION,
+        "seed": ds.seed,
+        "escala": ds.escala,
+        "distribuicao": ds.distribuicao,
+        "expoente": ds.expoente,
+        "referencia": ds.referencia.isoformat(),
+        "colunas": {tabela: list(getattr(ds, tabela)) for tabela in TABELAS},
+        "pools": ds.pools,
+    }
+    with open(os.path.join(temporario, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    # O diretório final só aparece depois de completo, então uma execução
+    # interrompida nunca deixa um snapshot pela metade.
+    if os.path.exists(destino):
+        shutil.rmtree(destino)
+    os.replace(temporario, destino)
+    return destino
+
+
+def load_snapshot(
+    seed,
+    escala,
+    diretorio=SNAPSHOT_DIR,
+    distribuicao=DISTRIBUICAO_PADRAO,
+    expoente=EXPOENTE_PADRAO,
+    referencia=None,
+):
+    """Mapeia em memória um snapshot existente, ou retorna None se não houver."""
+    origem = snapshot_path(seed, escala, diretorio, distribuicao, expoente, referencia)
+    caminho_manifest = os.path.join(origem, "manifest.json")
+    if not os.path.exists(caminho_manifest):
+        return None
+
+    with open(caminho_manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("versao") != SNAPSHOT_VERSION:
+        return None
+
+    tabelas = {
+        tabela: {
+            coluna: np.load(
+                os.path.join(origem, f"{tabela}.{coluna}.npy"), mmap_mode="r"
+            )
+            for coluna in colunas
+        }
+        for tabela, colunas in manifest["colunas"].items()
+    }
+    return Dataset(
+        seed=manifest["seed"],
+        referencia=datetime.fromisoformat(manifest["referencia"]),
+        pools=manifest["pools"],
+        escala=manifest["escala"],
+        distribuicao=manifest.get("distribuicao", DISTRIBUICAO_PADRAO),
+        expoente=manifest.get("expoente", EXPOENTE_PADRAO),
+        **tabelas,
+    )
+
+
+def load_or_generate(
+    seed=DEFAULT_SEED,
+    escala=ESCALA_PADRAO,
+    usar_snapshot=True,
+    diretorio=SNAPSHOT_DIR,
+    distribuicao=DISTRIBUICAO_PADRAO,
+    expoente=EXPOENTE_PADRAO,
+):
+    """Retorna o conjunto de dados, reaproveitando o snapshot quando existir."""
+    inicio = time.time()
+    referencia = default_reference()
+    if usar_snapshot:
+        ds = load_snapshot(seed, escala, diretorio, distribuicao, expoente, referencia)
+        if ds is not None:
+            caminho = snapshot_path(
+                seed, escala, diretorio, distribuicao, expoente, referencia
+            )
+            print(f"Snapshot {caminho} mapeado em {time.time() - inicio:.2f} segundos.")
+            return ds
+
+    print(
+        f"Gerando conjunto de dados (seed={seed}, escala={escala:g}, "
+        f"distribuição={distribuicao})..."
+    )
+    ds = generate_dataset(
+        seed=seed,
+        escala=escala,
+        referencia=referencia,
+        distribuicao=distribuicao,
+        expoente=expoente,
+    )
+    print(f"Conjunto de dados gerado em {time.time() - inicio:.2f} segundos.")
+    if usar_snapshot:
+        destino = save_snapshot(ds, diretorio)
+        print(f"Snapshot gravado em {destino}.")
+        # Recarrega a partir do disco para que a carga trabalhe sobre as
+        # colunas mapeadas e a memória dos arrays gerados possa ser liberada.
+        ds = load_snapshot(seed, escala, diretorio, distribuicao, expoente, referencia)
+    return ds
+
+
+def add_dataset_arguments(parser):
+    """Adiciona as opções de conjunto de dados comuns aos scripts de população."""
+    parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED, help="Semente do gerador de dados."
+    )
+    parser.add_argument(
+        "--escala",
+        type=float,
+        default=ESCALA_PADRAO,
+        help="Fator de escala aplicado aos volumes de clientes, produtos e pedidos "
+        "(padrão: TECHMARKET_ESCALA ou 1).",
+    )
+    parser.add_argument(
+        "--distribuicao",
+        choices=DISTRIBUICOES,
+        default=DISTRIBUICAO_PADRAO,
+        help="uniforme, ou zipf: pedidos concentrados em poucos clientes e vendas em poucos produtos.",
+    )
+    parser.add_argument(
+        "--expoente",
+        type=float,
+        default=EXPOENTE_PADRAO,
+        help="Expoente s da distribuição zipf (probabilidade ∝ 1/rank^s).",
+    )
+    parser.add_argument(
+        "--sem-snapshot",
+        action="store_true",
+        help="Regenera o conjunto de dados sem ler nem gravar snapshots em disco.",
+    )
+    add_key_argument(parser)
+
+
+def dataset_from_args(args):
+    ds = load_or_generate(
+        seed=args.seed,
+        escala=args.escala,
+        usar_snapshot=not args.sem_snapshot,
+        distribuicao=args.distribuicao,
+        expoente=args.expoente,
+    )
+    ds.chaves = args.chaves
+    return ds
@@ -0,0 +1,258 @@
+"""Carga mista de leitura e escrita (estilo OLTP).
+
+Clientes virtuais em laço fechado sorteiam, a cada operação, entre a escrita
+"fazer pedido" (`Backend.place_order`) e as leituras Q1–Q6, conforme os pesos
+de `mix`. Cada banco escreve o pedido no seu modelo: transação multi-tabela no
+PostgreSQL, um documento com itens e pagamento embutidos no MongoDB e as quatro
+tabelas denormalizadas no Cassandra.
+"""
+
+from datetime import datetime
+import random
+import threading
+import time
+
+from techmarket.chaves import detectar_estrategia, nova_chave
+from techmarket.dataset import STATUS_PAGAMENTO, STATUS_PEDIDO, TIPOS_PAGAMENTO
+from techmarket.harness import Acesso, CONSULTAS, benchmark_query, format_summary, summarize
+
+PLACE_ORDER = "place_order"
+MIX_PADRAO = {PLACE_ORDER: 20, "Q1": 20, "Q2": 15, "Q3": 15, "Q4": 5, "Q5": 10, "Q6": 15}
+DURACAO_PADRAO = 30
+CLIENTES_PADRAO = 8
+AMOSTRA_REFERENCIAS = 1000
+PEDIDOS_PADRAO = 200
+# Na carga mista, cada leitura escolhe os próprios parâmetros entre candidatos
+# compartilhados, em vez de repetir os de um cliente (ver techmarket.harness.Acesso).
+ACESSO_CARGA = "uniforme"
+
+
+class OrderFactory:
+    """Monta novos pedidos sobre clientes e produtos já existentes no banco.
+
+    `produtos` é uma sequência de `(id_produto, preco)`; o preço é usado como
+    veio do banco (Decimal ou float), para que cada backend grave os valores no
+    próprio tipo nativo. As chaves novas seguem a estratégia (techmarket.chaves)
+    das chaves já gravadas.
+    """
+
+    def __init__(self, client_ids, produtos, seed=None):
+        if not client_ids or not produtos:
+            raise ValueError("É preciso ao menos um cliente e um produto para criar pedidos.")
+        self.client_ids = list(client_ids)
+        self.produtos = list(produtos)
+        self.chaves = detectar_estrategia(self.client_ids[0])
+        self.rng = random.Random(seed)
+
+    def new_order(self):
+        rng = self.rng
+        agora = datetime.now().replace(microsecond=0)
+        num_itens = min(rng.randint(1, 5), len(self.produtos))
+        itens = [
+            {
+                "id_produto": id_produto,
+                "quantidade": rng.randint(1, 3),
+                "preco_unitario": preco,
+            }
+            for id_produto, preco in rng.sample(self.produtos, num_itens)
+        ]
+        return {
+            "id_pedido": nova_chave(self.chaves),
+            "id_cliente": rng.choice(self.client_ids),
+            "data_pedido": agora,
+            "status": rng.choice(STATUS_PEDIDO),
+            "valor_total": round(
+                sum(item["quantidade"] * item["preco_unitario"] for item in itens), 2
+            ),
+            "itens": itens,
+            "pagamento": {
+                "id_pagamento": nova_chave(self.chaves),
+                "tipo": rng.choice(TIPOS_PAGAMENTO),
+                "status": rng.choice(STATUS_PAGAMENTO),
+                "data_pagamento": agora,
+            },
+        }
+
+
+def time_orders(backend, fabrica, pedidos, itens=None):
+    """Grava `pedidos` pedidos novos e retorna o resumo das latências.
+
+    Se `itens` for uma lista, os itens de cada pedido gravado são anexados a ela.
+    """
+    amostras = []
+    for _ in range(pedidos):
+        pedido = fabrica.new_order()
+        inicio = time.perf_counter_ns()
+        backend.place_order(pedido)
+        amostras.append(time.perf_counter_ns() - inicio)
+        if itens is not None:
+            itens.extend(pedido["itens"])
+    return summarize(amostras)
+
+
+def compare_q4_strategies(
+    backend, variantes, aquecimento, iteracoes, pedidos, desativar, reativar, manutencao
+):
+    """Mede cada variante da Q4 e o custo por pedido de manter a agregação pronta.
+
+    `desativar()` desliga a manutenção da agregação na escrita (`manutencao`
+    nomeia o mecanismo no relatório); `reativar(itens)` a religa e corrige,
+    fora da medição, o que os pedidos gravados sem ela deixaram de somar.
+    Retorna `(leitura_por_variante, sem_manutencao, com_manutencao)`.
+    """
+    leitura = {}
+    for variante in variantes:
+        backend.variante_q4 = variante
+        leitura[variante] = benchmark_query(backend, "Q4", aquecimento, iteracoes)
+        print(f"Q4 ({variante}): {format_summary(leitura[variante])}")
+        print(f"  Exemplo: {leitura[variante]['exemplo']}")
+
+    client_ids, produtos = backend.sample_refs(AMOSTRA_REFERENCIAS)
+    fabrica = OrderFactory(client_ids, produtos)
+    itens = []
+    desativar()
+    try:
+        sem = time_orders(backend, fabrica, pedidos, itens)
+    finally:
+        reativar(itens)
+    com = time_orders(backend, fabrica, pedidos)
+
+    print(f"\nplace_order sem {manutencao}: {format_summary(sem)}")
+    print(f"place_order com {manutencao}: {format_summary(com)}")
+    print(
+        f"Custo extra de escrita por pedido: {com['media'] - sem['media']:.3f} ms "
+        f"na média, {com['p95'] - sem['p95']:.3f} ms no p95."
+    )
+    return leitura, sem, com
+
+
+def run_mixed_workload(
+    backend_factory,
+    mix=MIX_PADRAO,
+    clientes=CLIENTES_PADRAO,
+    duracao=DURACAO_PADRAO,
+    seed=None,
+    acesso=None,
+):
+    """Executa a carga mista e retorna `(resumos_por_operacao, resumo_geral)`.
+
+    Os parâmetros de cada leitura vêm de `acesso` (por padrão, uniforme entre
+    os candidatos), sorteados a cada operação, fora da medição.
+    """
+    operacoes = [op for op, peso in mix.items() if peso > 0]
+    pesos = [mix[op] for op in operacoes]
+
+    backends = []
+    for _ in range(clientes):
+        backend = backend_factory()
+        if not backend.connect():
+            for aberto in backends:
+                aberto.close()
+            raise ConnectionError(f"Não foi possível conectar ao banco '{backend.nome}'.")
+        backends.append(backend)
+
+    acesso = acesso or Acesso(ACESSO_CARGA, seed=seed)
+    sorteios = {op: acesso.samplers(backends, op) for op in operacoes if op in CONSULTAS}
+
+    latencias = [{op: [] for op in operacoes} for _ in range(clientes)]
+    erros = [{op: 0 for op in operacoes} for _ in range(clientes)]
+    janela = {}
+
+    def iniciar_janela():
+        janela["inicio"] = time.perf_counter_ns()
+        janela["fim"] = time.perf_counter() + duracao
+
+    pronto = threading.Barrier(clientes + 1, action=iniciar_janela)
+
+    def cliente(indice):
+        backend = backends[indice]
+        rng = random.Random(None if seed is None else seed + indice)
+        proximos = {op: sorteio[indice] for op, sorteio in sorteios.items()}
+        try:
+            fabrica = None
+            if PLACE_ORDER in operacoes:
+                client_ids, produtos = backend.sample_refs(AMOSTRA_REFERENCIAS)
+                fabrica = OrderFactory(client_ids, produtos, rng.random())
+        except Exception as e:
+            print(f"Cliente {indice}: falha ao preparar a carga: {e}")
+            pronto.wait()
+            return
+        pronto.wait()
+
+        while time.perf_counter() < janela["fim"]:
+            op = rng.choices(operacoes, weights=pesos)[0]
+            if op == PLACE_ORDER:
+                funcao, args = backend.place_order, (fabrica.new_order(),)
+            elif proximos[op] is None:
+                continue
+            else:
+                funcao, args = backend.run, (op, proximos[op]())
+            inicio = time.perf_counter_ns()
+            try:
+                funcao(*args)
+            except Exception:
+                erros[indice][op] += 1
+                continue
+            latencias[indice][op].append(time.perf_counter_ns() - inicio)
+
+    threads = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    try:
+        pronto.wait()
+        for thread in threads:
+            thread.join()
+        decorrido = time.perf_counter_ns() - janela["inicio"]
+    finally:
+        for backend in backends:
+            backend.close()
+
+    resumos = {}
+    todas = []
+    for op in operacoes:
+        amostras = [a for lista in latencias for a in lista[op]]
+        todas.extend(amostras)
+        total_erros = sum(e[op] for e in erros)
+        if amostras:
+            resumo = summarize(amostras, decorrido)
+        else:
+            resumo = {"n": 0, "vazao": 0.0}
+        resumo["erros"] = total_erros
+        resumos[op] = resumo
+
+    geral = summarize(todas, decorrido) if todas else {"n": 0, "vazao": 0.0}
+    geral["erros"] = sum(sum(e.values()) for e in erros)
+    return resumos, geral
+
+
+def print_workload_report(nome, resumos, geral):
+    print(f"\nCarga mista em {nome}:")
+    cabecalho = (
+        f"{'Operação':<14} {'n':>7} {'ops/s':>9} {'p50':>9} {'p95':>9} "
+        f"{'p99':>9} {'max':>9} {'erros':>6}"
+    )
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for op, resumo in list(resumos.items()) + [("total", geral)]:
+        if not resumo["n"]:
+            vazio = f"{'-':>9} " * 4
+            print(f"{op:<14} {0:>7} {0:>9.1f} {vazio}{resumo['erros']:>6}")
+            continue
+        print(
+            f"{op:<14} {resumo['n']:>7} {resumo['vazao']:>9.1f} {resumo['p50']:>9.3f} "
+            f"{resumo['p95']:>9.3f} {resumo['p99']:>9.3f} {resumo['max']:>9.3f} "
+            f"{resumo['erros']:>6}"
+        )
+    print("(latências em ms)")
+
+
+def parse_mix(texto):
+    """Converte "place_order=20,Q1=30,Q4=5" no dicionário de pesos."""
+    mix = {}
+    for parte in texto.split(","):
+        op, _, peso = parte.partition("=")
+        op = op.strip()
+        if op != PLACE_ORDER and op not in CONSULTAS:
+            raise ValueError(f"Operação desconhecida no mix: {op}")
+        mix[op] = float(peso)
+    return mix